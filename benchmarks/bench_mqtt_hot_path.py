@@ -0,0 +1,380 @@
+"""Offline benchmark of the MQTT to entity hot path.
+
+Drives the real pipeline (MultiManager.on_message -> XTIOTDeviceManager
+_on_device_report -> report processing and virtual states -> MultiDeviceListener
+-> dispatcher -> entity state handler) on synthetic XTDevice fleets, without
+any network access. Home Assistant is replaced by a minimal synchronous stub,
+the integration requirements and homeassistant still need to be importable.
+
+Usage:
+    python benchmarks/bench_mqtt_hot_path.py
+    python benchmarks/bench_mqtt_hot_path.py --sizes 10 100 --messages 20000
+    python benchmarks/bench_mqtt_hot_path.py --record stream.jsonl --sizes 100
+    python benchmarks/bench_mqtt_hot_path.py --replay stream.jsonl
+    python benchmarks/bench_mqtt_hot_path.py --json results.json
+    python benchmarks/bench_mqtt_hot_path.py --baseline results.json --tolerance 0.2
+    python benchmarks/bench_mqtt_hot_path.py --update-window 0.1 --flush-every 50
+
+The entity updates use the coalescing window of the entry option default
+unless --update-window is given. With a window, the scheduled updates are
+sent every --flush-every messages, as if that many arrived within a window.
+
+A recorded stream is one JSON object per line: {"source": ..., "msg": ...}.
+With --baseline, the run fails (exit code 1) when the throughput of a fleet
+size drops, or its p99 latency grows, by more than the tolerance.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from typing import Any
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tuya_iot.device import PROTOCOL_DEVICE_REPORT  # noqa: E402
+from homeassistant.helpers.dispatcher import async_dispatcher_connect  # noqa: E402
+
+from custom_components.xtend_tuya.const import (  # noqa: E402
+    MESSAGE_SOURCE_TUYA_IOT,
+    TUYA_HA_SIGNAL_UPDATE_ENTITY,
+    DEVICE_UPDATE_COALESCING_WINDOW,
+)
+import custom_components.xtend_tuya.multi_manager.shared.multi_device_listener as multi_device_listener_module  # noqa: E402
+from custom_components.xtend_tuya.multi_manager.multi_manager import (  # noqa: E402
+    MultiManager,
+)
+from custom_components.xtend_tuya.multi_manager.shared.device import (  # noqa: E402
+    XTDevice,
+    XTDeviceFunction,
+    XTDeviceStatusRange,
+)
+from custom_components.xtend_tuya.multi_manager.tuya_iot.init import (  # noqa: E402
+    XTTuyaIOTDeviceManagerInterface,
+)
+from custom_components.xtend_tuya.multi_manager.tuya_iot.xt_tuya_iot_data import (  # noqa: E402
+    TuyaIOTData,
+)
+from custom_components.xtend_tuya.multi_manager.tuya_iot.xt_tuya_iot_manager import (  # noqa: E402
+    XTIOTDeviceManager,
+)
+from custom_components.xtend_tuya.sensor import SENSORS  # noqa: E402
+
+DEFAULT_SIZES = (10, 100, 1000)
+DEFAULT_MESSAGES = 10000
+DEFAULT_FLUSH_EVERY = 50
+WARMUP_MESSAGES = 200
+
+#dpId, code, type, values, aliases of a metering smart plug
+PLUG_DATA_POINTS: tuple[tuple[int, str, str, str, list[str]], ...] = (
+    (1, "switch_1", "Boolean", "{}", []),
+    (9, "countdown_1", "Integer", '{"unit":"s","min":0,"max":86400,"scale":0,"step":1}', []),
+    (17, "add_ele", "Integer", '{"min":0,"max":50000,"scale":3,"step":100}', ["add_ele_total"]),
+    (18, "cur_current", "Integer", '{"unit":"mA","min":0,"max":30000,"scale":0,"step":1}', []),
+    (19, "cur_power", "Integer", '{"unit":"W","min":0,"max":50000,"scale":1,"step":1}', []),
+    (20, "cur_voltage", "Integer", '{"unit":"V","min":0,"max":5000,"scale":1,"step":1}', []),
+    (26, "fault", "Bitmap", '{"label":["ov_cr","ov_vol","ov_pwr","ls_cr","ls_vol","ls_pow"]}', []),
+)
+REPORTED_CODES = ("add_ele", "cur_current", "cur_power", "cur_voltage", "switch_1")
+
+
+class StubLoop:
+    """Runs the thread safe callbacks immediately."""
+
+    def call_soon_threadsafe(self, callback, *args):
+        callback(*args)
+
+
+class StubHass:
+    """Just enough of HomeAssistant for the dispatcher and the listener."""
+
+    def __init__(self) -> None:
+        self.data: dict[str, Any] = {}
+        self.loop = StubLoop()
+        self.timers: list[Any] = []
+
+    def add_job(self, target, *args):
+        target(*args)
+
+    def async_run_hass_job(self, job, *args):
+        job.target(*args)
+
+    def async_add_hass_job(self, job, *args):
+        job.target(*args)
+
+    def flush_timers(self) -> None:
+        timers, self.timers = self.timers, []
+        for action in timers:
+            action(None)
+
+
+def stub_async_call_later(hass: StubHass, delay: float, action: Any) -> None:
+    hass.timers.append(action)
+
+
+@dataclass
+class StubEntity:
+    """Counts the state writes the way TuyaEntity._handle_state_update does."""
+
+    key: str
+    writes: int = 0
+
+    def handle_state_update(self, updated_status_codes: set[str] | None = None) -> None:
+        if updated_status_codes is not None and self.key not in updated_status_codes:
+            return
+        self.writes += 1
+
+
+def make_device(index: int) -> XTDevice:
+    device = XTDevice(
+        id=f"benchdevice{index:05d}",
+        name=f"Plug {index}",
+        category="cz",
+        product_id="benchproduct",
+        product_name="Bench plug",
+        online=True,
+        update_time=0,
+    )
+    for dpId, code, dp_type, values, aliases in PLUG_DATA_POINTS:
+        device.local_strategy[dpId] = {
+            "value_convert": "default",
+            "status_code": code,
+            "config_item": {
+                "statusFormat": f'{{"{code}":"$"}}',
+                "valueDesc": values,
+                "valueType": dp_type,
+                "pid": device.product_id,
+            },
+            "status_code_alias": list(aliases),
+        }
+        device.status_range[code] = XTDeviceStatusRange(code=code, type=dp_type, values=values, dp_id=dpId)
+        if code in ("switch_1", "countdown_1"):
+            device.function[code] = XTDeviceFunction(code=code, type=dp_type, values=values, dp_id=dpId)
+        device.status[code] = False if dp_type == "Boolean" else 0
+    return device
+
+
+class StubMQ:
+    def add_message_listener(self, listener: Any) -> None:
+        pass
+
+    def remove_message_listener(self, listener: Any) -> None:
+        pass
+
+
+def make_multi_manager(size: int, update_window: float) -> tuple[MultiManager, list[StubEntity]]:
+    hass = StubHass()
+    multi_manager = MultiManager(hass)
+    multi_manager.multi_device_listener.update_coalescing_window = update_window
+    multi_manager.register_device_descriptors("sensors", SENSORS)
+
+    #Build the account without its network side (OpenAPI, MQTT and IPC)
+    device_manager: XTIOTDeviceManager = XTIOTDeviceManager.__new__(XTIOTDeviceManager)
+    device_manager.multi_manager = multi_manager
+    device_manager.device_map = {}
+    device_manager.device_listeners = {multi_manager.multi_device_listener}
+    device_manager.mq = StubMQ()
+    account = XTTuyaIOTDeviceManagerInterface()
+    account.multi_manager = multi_manager
+    account.hass = hass
+    account.iot_account = TuyaIOTData(
+        device_manager=device_manager,
+        mq=None,
+        device_ids=[],
+        home_manager=None,
+    )
+    multi_manager.accounts[MESSAGE_SOURCE_TUYA_IOT] = account
+
+    entities: list[StubEntity] = []
+    for index in range(size):
+        device = make_device(index)
+        device_manager.device_map[device.id] = device
+        account.iot_account.device_ids.append(device.id)
+        multi_manager.master_device_map[device.id] = device
+        multi_manager.virtual_state_handler.apply_init_virtual_states(device)
+        for description in SENSORS.get(device.category, ()):
+            if description.key in device.status:
+                entity = StubEntity(key=description.key)
+                async_dispatcher_connect(hass, f"{TUYA_HA_SIGNAL_UPDATE_ENTITY}_{device.id}", entity.handle_state_update)
+                entities.append(entity)
+    multi_manager.is_ready_for_messages = True
+    return multi_manager, entities
+
+
+def make_message(rng: random.Random, device_id: str, timestamp: int) -> dict[str, Any]:
+    status: list[dict[str, Any]] = []
+    for code in rng.sample(REPORTED_CODES, rng.randint(1, 4)):
+        if code == "switch_1":
+            value: Any = rng.random() < 0.5
+        else:
+            value = rng.randint(0, 5000)
+        status.append({"code": code, "value": value, "t": timestamp})
+    if rng.random() < 0.2:
+        #Some reports only carry the raw dpId
+        status.append({"17": rng.randint(0, 50)})
+    return {
+        "protocol": PROTOCOL_DEVICE_REPORT,
+        "data": {"devId": device_id, "dataId": f"{timestamp}", "status": status},
+        "t": timestamp,
+    }
+
+
+def make_stream(size: int, count: int, seed: int) -> list[tuple[str, dict[str, Any]]]:
+    rng = random.Random(seed)
+    device_ids = [make_device(index).id for index in range(size)]
+    timestamp = 1700000000
+    stream: list[tuple[str, dict[str, Any]]] = []
+    for _ in range(count):
+        timestamp += 1
+        stream.append((MESSAGE_SOURCE_TUYA_IOT, make_message(rng, rng.choice(device_ids), timestamp)))
+    return stream
+
+
+def load_stream(path: str) -> list[tuple[str, dict[str, Any]]]:
+    stream: list[tuple[str, dict[str, Any]]] = []
+    with open(path, encoding="utf-8") as file:
+        for line in file:
+            if line := line.strip():
+                item = json.loads(line)
+                stream.append((item["source"], item["msg"]))
+    return stream
+
+
+def save_stream(path: str, stream: list[tuple[str, dict[str, Any]]]) -> None:
+    with open(path, "w", encoding="utf-8") as file:
+        for source, msg in stream:
+            file.write(json.dumps({"source": source, "msg": msg}) + "\n")
+
+
+def copy_message(msg: dict[str, Any]) -> dict[str, Any]:
+    #The pipeline may modify the report in place, like a fresh MQTT payload would be
+    data = dict(msg["data"])
+    data["status"] = [dict(item) for item in data.get("status", [])]
+    return {**msg, "data": data}
+
+
+def run(size: int, stream: list[tuple[str, dict[str, Any]]], update_window: float, flush_every: int) -> dict[str, Any]:
+    multi_manager, entities = make_multi_manager(size, update_window)
+    hass: StubHass = multi_manager.hass
+    messages = [(source, copy_message(msg)) for source, msg in stream]
+    for source, msg in messages[:WARMUP_MESSAGES]:
+        multi_manager.on_message(source, copy_message(msg))
+    hass.flush_timers()
+    warmup_writes = sum(entity.writes for entity in entities)
+
+    latencies: list[int] = []
+    perf_counter_ns = time.perf_counter_ns
+    start = perf_counter_ns()
+    for index, (source, msg) in enumerate(messages, 1):
+        before = perf_counter_ns()
+        multi_manager.on_message(source, msg)
+        latencies.append(perf_counter_ns() - before)
+        if index % flush_every == 0:
+            hass.flush_timers()
+    hass.flush_timers()
+    elapsed = (perf_counter_ns() - start) / 1e9
+    writes = sum(entity.writes for entity in entities) - warmup_writes
+
+    #Separate pass, tracing allocations skews the timings
+    sample = [(source, copy_message(msg)) for source, msg in stream[:min(len(stream), 2000)]]
+    tracemalloc.start()
+    peaks: list[int] = []
+    blocks_before = sys.getallocatedblocks()
+    for source, msg in sample:
+        tracemalloc.reset_peak()
+        base, _ = tracemalloc.get_traced_memory()
+        multi_manager.on_message(source, msg)
+        _, peak = tracemalloc.get_traced_memory()
+        peaks.append(peak - base)
+    retained_blocks = sys.getallocatedblocks() - blocks_before
+    tracemalloc.stop()
+
+    latencies.sort()
+    hass.flush_timers()
+    return {
+        "devices": size,
+        "update_window": update_window,
+        "messages": len(messages),
+        "messages_per_second": len(messages) / elapsed if elapsed else 0.0,
+        "p50_us": latencies[len(latencies) // 2] / 1000 if latencies else 0.0,
+        "p99_us": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] / 1000 if latencies else 0.0,
+        "peak_bytes_per_message": statistics.mean(peaks) if peaks else 0.0,
+        "retained_blocks_per_message": retained_blocks / len(sample) if sample else 0.0,
+        "entity_writes_per_message": writes / len(messages) if messages else 0.0,
+    }
+
+
+def compare(results: list[dict[str, Any]], baseline_path: str, tolerance: float) -> list[str]:
+    with open(baseline_path, encoding="utf-8") as file:
+        baseline = {result["devices"]: result for result in json.load(file)}
+    regressions: list[str] = []
+    for result in results:
+        if (reference := baseline.get(result["devices"])) is None:
+            continue
+        if result["messages_per_second"] < reference["messages_per_second"] * (1 - tolerance):
+            regressions.append(
+                f"{result['devices']} devices: {result['messages_per_second']:.0f} msg/s "
+                f"vs {reference['messages_per_second']:.0f} msg/s"
+            )
+        if result["p99_us"] > reference["p99_us"] * (1 + tolerance):
+            regressions.append(
+                f"{result['devices']} devices: p99 {result['p99_us']:.1f} us vs {reference['p99_us']:.1f} us"
+            )
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES), help="fleet sizes to benchmark")
+    parser.add_argument("--messages", type=int, default=DEFAULT_MESSAGES, help="synthetic messages per fleet size")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the synthetic stream")
+    parser.add_argument("--replay", help="replay a recorded stream instead of a synthetic one")
+    parser.add_argument("--record", help="save the synthetic stream of the first size to this file")
+    parser.add_argument("--json", dest="json_path", help="write the results to this file")
+    parser.add_argument("--baseline", help="results file of a previous run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative regression")
+    parser.add_argument("--update-window", type=float, default=DEVICE_UPDATE_COALESCING_WINDOW, help="coalescing window of the entity updates in seconds")
+    parser.add_argument("--flush-every", type=int, default=DEFAULT_FLUSH_EVERY, help="messages received within a coalescing window")
+    args = parser.parse_args()
+    #The updates are scheduled on the stub, a single pass sends them
+    multi_device_listener_module.async_call_later = stub_async_call_later
+
+    results: list[dict[str, Any]] = []
+    print(f"Entity update coalescing window: {args.update_window} s")
+    print(f"{'devices':>8} {'msg/s':>10} {'p50 us':>8} {'p99 us':>8} {'peak B/msg':>11} {'blocks/msg':>10} {'writes/msg':>10}")
+    for size in args.sizes:
+        if args.replay:
+            stream = load_stream(args.replay)
+        else:
+            stream = make_stream(size, args.messages, args.seed)
+            if args.record:
+                save_stream(args.record, stream)
+                args.record = None
+        result = run(size, stream, args.update_window, max(1, args.flush_every))
+        results.append(result)
+        print(
+            f"{result['devices']:>8} {result['messages_per_second']:>10.0f} {result['p50_us']:>8.1f} "
+            f"{result['p99_us']:>8.1f} {result['peak_bytes_per_message']:>11.0f} "
+            f"{result['retained_blocks_per_message']:>10.2f} {result['entity_writes_per_message']:>10.2f}"
+        )
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+    if args.baseline:
+        if regressions := compare(results, args.baseline, args.tolerance):
+            print("Regressions:")
+            for regression in regressions:
+                print(f"  {regression}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,346 @@
+"""Offline benchmark of the integration cold start.
+
+Replays a cloud fixture (the OpenAPI responses, keyed by request) through a
+local fake API and times the device cache build of a tuya_iot account with the
+startup profiler of the integration: device list, specifications, thing models
+and shadow properties, merging, cloud fixes and initial virtual states. Each
+fleet size runs cold (empty product cache) then warm (product cache filled by
+the cold run). Home Assistant is replaced by a minimal synchronous stub, the
+device registry and the platforms are not part of this benchmark.
+
+Usage:
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --sizes 100 1000 --products 20 --latency 0.05
+    python benchmarks/bench_startup.py --record fixture.json --sizes 500
+    python benchmarks/bench_startup.py --replay fixture.json
+    python benchmarks/bench_startup.py --json results.json
+    python benchmarks/bench_startup.py --baseline results.json --tolerance 0.2
+
+A fixture is a JSON object: {"uid": ..., "responses": {"GET /path?query": response}},
+requests missing from it are answered with an unsuccessful response. --latency
+adds a simulated network delay (in seconds) to every request.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from threading import Lock
+from types import SimpleNamespace
+from typing import Any
+from urllib.parse import urlencode
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARKS_DIR))
+sys.path.insert(0, BENCHMARKS_DIR)
+
+from tuya_iot import AuthType, TuyaDeviceManager  # noqa: E402
+
+from bench_mqtt_hot_path import (  # noqa: E402
+    PLUG_DATA_POINTS,
+    StubHass,
+    StubMQ,
+)
+from custom_components.xtend_tuya.const import (  # noqa: E402
+    MESSAGE_SOURCE_TUYA_IOT,
+)
+from custom_components.xtend_tuya.multi_manager.multi_manager import (  # noqa: E402
+    MultiManager,
+)
+from custom_components.xtend_tuya.multi_manager.shared.startup_profiler import (  # noqa: E402
+    XTStartupProfiler,
+)
+from custom_components.xtend_tuya.multi_manager.tuya_iot.init import (  # noqa: E402
+    XTTuyaIOTDeviceManagerInterface,
+)
+from custom_components.xtend_tuya.multi_manager.tuya_iot.xt_tuya_iot_data import (  # noqa: E402
+    TuyaIOTData,
+)
+from custom_components.xtend_tuya.multi_manager.tuya_iot.xt_tuya_iot_home_manager import (  # noqa: E402
+    XTIOTHomeManager,
+)
+from custom_components.xtend_tuya.multi_manager.tuya_iot.xt_tuya_iot_manager import (  # noqa: E402
+    XTIOTDeviceManager,
+)
+
+DEFAULT_SIZES = (10, 100, 1000)
+DEFAULT_PRODUCTS = 10
+FIXTURE_UID = "benchuser"
+
+#OpenAPI thing model types of the fixture data point types
+MODEL_TYPES = {
+    "Boolean": "bool",
+    "Integer": "value",
+    "Bitmap": "bitmap",
+}
+WRITABLE_CODES = ("switch_1", "countdown_1")
+
+
+class FakeOpenAPI:
+    """Answers the OpenAPI requests from a fixture, like a TuyaOpenAPI would."""
+
+    def __init__(self, fixture: dict[str, Any], latency: float = 0.0) -> None:
+        self.auth_type = AuthType.SMART_HOME
+        self.token_info = SimpleNamespace(uid=fixture["uid"])
+        self.latency = latency
+        #Kept serialized so that every request pays the decoding of a real response
+        self.responses = {key: json.dumps(response) for key, response in fixture["responses"].items()}
+        self.requests = 0
+        self.lock = Lock()
+
+    def get(self, path: str, params: dict[str, Any] | None = None, low_priority: bool = False) -> dict[str, Any]:
+        return self._request("GET", path, params)
+
+    def post(self, path: str, body: dict[str, Any] | None = None, low_priority: bool = False) -> dict[str, Any]:
+        return self._request("POST", path, body)
+
+    def _request(self, method: str, path: str, params: dict[str, Any] | None) -> dict[str, Any]:
+        with self.lock:
+            self.requests += 1
+        if self.latency:
+            time.sleep(self.latency)
+        key = request_key(method, path, params)
+        if (response := self.responses.get(key)) is None:
+            return {"success": False, "code": 1004, "msg": f"{key} is not in the fixture"}
+        return json.loads(response)
+
+
+class StubProductCache:
+    """In memory stand-in of XTProductCache."""
+
+    def __init__(self, products: dict[str, dict[str, Any]] | None = None) -> None:
+        self.products: dict[str, dict[str, Any]] = products if products is not None else {}
+
+    def register_revalidator(self, kind: str, fetcher: Any) -> None:
+        pass
+
+    def get(self, kind: str, product_id: str, device_id: str) -> Any | None:
+        return self.products.get(kind, {}).get(product_id)
+
+    def set(self, kind: str, product_id: str, value: Any) -> None:
+        if product_id and value is not None:
+            self.products.setdefault(kind, {})[product_id] = value
+
+
+def request_key(method: str, path: str, params: dict[str, Any] | None = None) -> str:
+    if params:
+        return f"{method} {path}?{urlencode(sorted(params.items()))}"
+    return f"{method} {path}"
+
+
+def make_status_value(rng: random.Random, dp_type: str) -> Any:
+    if dp_type == "Boolean":
+        return rng.random() < 0.5
+    return rng.randint(0, 5000)
+
+
+def make_fixture(size: int, products: int, seed: int) -> dict[str, Any]:
+    rng = random.Random(seed)
+    responses: dict[str, Any] = {}
+    devices: list[dict[str, Any]] = []
+    for index in range(size):
+        device_id = f"benchdevice{index:05d}"
+        product_id = f"benchproduct{index % max(1, products):03d}"
+        status = [
+            {"code": code, "value": make_status_value(rng, dp_type)}
+            for _, code, dp_type, _, _ in PLUG_DATA_POINTS
+        ]
+        devices.append({
+            "id": device_id,
+            "uuid": device_id,
+            "name": f"Plug {index}",
+            "category": "cz",
+            "product_id": product_id,
+            "product_name": "Bench plug",
+            "online": True,
+            "sub": False,
+            "ip": "",
+            "local_key": "",
+            "time_zone": "+01:00",
+            "active_time": 1700000000,
+            "create_time": 1700000000,
+            "update_time": 1700000000,
+            "status": status,
+        })
+        responses[request_key("GET", f"/v1.0/devices/{device_id}/specifications")] = {
+            "success": True,
+            "result": {
+                "category": "cz",
+                "functions": [
+                    {"code": code, "type": dp_type, "values": values}
+                    for _, code, dp_type, values, _ in PLUG_DATA_POINTS
+                    if code in WRITABLE_CODES
+                ],
+                "status": [
+                    {"code": code, "type": dp_type, "values": values}
+                    for _, code, dp_type, values, _ in PLUG_DATA_POINTS
+                ],
+            },
+        }
+        responses[request_key("GET", f"/v2.0/cloud/thing/{device_id}/shadow/properties")] = {
+            "success": True,
+            "result": {
+                "properties": [
+                    {
+                        "code": item["code"],
+                        "dp_id": dp_id,
+                        "type": MODEL_TYPES[dp_type],
+                        "value": item["value"],
+                        "time": 1700000000000,
+                    }
+                    for (dp_id, _, dp_type, _, _), item in zip(PLUG_DATA_POINTS, status)
+                ],
+            },
+        }
+        model = {
+            "modelId": product_id,
+            "services": [{
+                "code": "",
+                "properties": [
+                    {
+                        "abilityId": dp_id,
+                        "code": code,
+                        "accessMode": "rw" if code in WRITABLE_CODES else "ro",
+                        "typeSpec": {"type": MODEL_TYPES[dp_type], **json.loads(values)},
+                    }
+                    for dp_id, code, dp_type, values, _ in PLUG_DATA_POINTS
+                ],
+            }],
+        }
+        responses[request_key("GET", f"/v2.0/cloud/thing/{device_id}/model")] = {
+            "success": True,
+            "result": {"model": json.dumps(model)},
+        }
+    responses[request_key("GET", f"/v1.0/users/{FIXTURE_UID}/devices")] = {
+        "success": True,
+        "result": devices,
+    }
+    return {"uid": FIXTURE_UID, "responses": responses}
+
+
+def load_fixture(path: str) -> dict[str, Any]:
+    with open(path, encoding="utf-8") as file:
+        return json.load(file)
+
+
+def save_fixture(path: str, fixture: dict[str, Any]) -> None:
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(fixture, file)
+
+
+def make_multi_manager(api: FakeOpenAPI, product_cache: StubProductCache) -> MultiManager:
+    hass = StubHass()
+    multi_manager = MultiManager(hass)
+    multi_manager.startup_profiler = XTStartupProfiler(enabled=True)
+    multi_manager.product_cache = product_cache
+
+    #Build the account without its network side (MQTT and IPC)
+    mq = StubMQ()
+    device_manager: XTIOTDeviceManager = XTIOTDeviceManager.__new__(XTIOTDeviceManager)
+    TuyaDeviceManager.__init__(device_manager, api, mq)
+    device_manager.multi_manager = multi_manager
+    device_manager.add_device_listener(multi_manager.multi_device_listener)
+    account = XTTuyaIOTDeviceManagerInterface()
+    account.multi_manager = multi_manager
+    account.hass = hass
+    account.iot_account = TuyaIOTData(
+        device_manager=device_manager,
+        mq=mq,
+        device_ids=[],
+        home_manager=XTIOTHomeManager(api, mq, device_manager, multi_manager),
+    )
+    multi_manager.accounts[MESSAGE_SOURCE_TUYA_IOT] = account
+    return multi_manager
+
+
+def run(fixture: dict[str, Any], latency: float, product_cache: StubProductCache, mode: str) -> dict[str, Any]:
+    api = FakeOpenAPI(fixture, latency)
+    multi_manager = make_multi_manager(api, product_cache)
+    profiler = multi_manager.startup_profiler
+    with profiler.phase("update_device_cache"):
+        multi_manager.update_device_cache()
+    with profiler.phase("apply_init_virtual_states"):
+        for device in multi_manager.device_map.values():
+            multi_manager.virtual_state_handler.apply_init_virtual_states(device)
+    profiler.finish()
+    profile = profiler.get_diagnostics()
+    return {
+        "devices": len(multi_manager.device_map),
+        "mode": mode,
+        "requests": api.requests,
+        "total_wall_ms": profile["total"]["wall_ms"],
+        "total_cpu_ms": profile["total"]["cpu_ms"],
+        "phases": profile["phases"],
+    }
+
+
+def compare(results: list[dict[str, Any]], baseline_path: str, tolerance: float) -> list[str]:
+    with open(baseline_path, encoding="utf-8") as file:
+        baseline = {(result["devices"], result["mode"]): result for result in json.load(file)}
+    regressions: list[str] = []
+    for result in results:
+        if (reference := baseline.get((result["devices"], result["mode"]))) is None:
+            continue
+        if result["total_wall_ms"] > reference["total_wall_ms"] * (1 + tolerance):
+            regressions.append(
+                f"{result['devices']} devices ({result['mode']}): {result['total_wall_ms']:.1f} ms "
+                f"vs {reference['total_wall_ms']:.1f} ms"
+            )
+    return regressions
+
+
+def print_result(result: dict[str, Any]) -> None:
+    print(
+        f"{result['devices']} devices, {result['mode']}: {result['total_wall_ms']:.1f} ms wall, "
+        f"{result['total_cpu_ms']:.1f} ms CPU, {result['requests']} requests"
+    )
+    for phase in result["phases"]:
+        print(f"  {phase['name']:<40} {phase['wall_ms']:>10.1f} {phase['cpu_ms']:>10.1f}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES), help="fleet sizes to benchmark")
+    parser.add_argument("--products", type=int, default=DEFAULT_PRODUCTS, help="distinct products of the synthetic fleets")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the synthetic fixtures")
+    parser.add_argument("--latency", type=float, default=0.0, help="simulated delay of every request in seconds")
+    parser.add_argument("--replay", help="replay a recorded fixture instead of synthetic ones")
+    parser.add_argument("--record", help="save the synthetic fixture of the first size to this file")
+    parser.add_argument("--json", dest="json_path", help="write the results to this file")
+    parser.add_argument("--baseline", help="results file of a previous run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative regression")
+    args = parser.parse_args()
+
+    if args.replay:
+        fixtures = [load_fixture(args.replay)]
+    else:
+        fixtures = [make_fixture(size, args.products, args.seed) for size in args.sizes]
+        if args.record:
+            save_fixture(args.record, fixtures[0])
+
+    results: list[dict[str, Any]] = []
+    print(f"{'phase':<42} {'wall ms':>10} {'cpu ms':>10}")
+    for fixture in fixtures:
+        product_cache = StubProductCache()
+        for mode in ("cold", "warm"):
+            result = run(fixture, args.latency, product_cache, mode)
+            results.append(result)
+            print_result(result)
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+    if args.baseline:
+        if regressions := compare(results, args.baseline, args.tolerance):
+            print("Regressions:")
+            for regression in regressions:
+                print(f"  {regression}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,246 @@
+"""Offline benchmark of concurrent WebRTC SDP negotiations.
+
+Replays camera negotiations through the real IPC manager, IPC listener and
+WebRTC manager against a fake IPC MQTT broker. The broker acknowledges every
+publish after a delay and, from its own threads like the MQTT client does,
+answers each offer with an SDP answer, a few candidates and the end of
+candidates. The WebRTC configurations are served by a fake OpenAPI. Home
+Assistant is replaced by a minimal asyncio stub, the integration requirements
+and homeassistant still need to be importable.
+
+Usage:
+    python benchmarks/bench_webrtc_negotiation.py
+    python benchmarks/bench_webrtc_negotiation.py --negotiations 32 --cameras 8
+    python benchmarks/bench_webrtc_negotiation.py --ack-latency 0.05 --answer-latency 0.1 0.5
+    python benchmarks/bench_webrtc_negotiation.py --negotiations 32 --max-sessions 8
+
+Exits with code 1 when a negotiation doesn't get its complete answer.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import sys
+import threading
+import time
+from types import SimpleNamespace
+from typing import Any, Callable
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+#The IPC manager module must be imported before the WebRTC one
+import custom_components.xtend_tuya.multi_manager.tuya_iot.ipc.xt_tuya_iot_ipc_manager as ipc_manager_module  # noqa: E402
+from custom_components.xtend_tuya.multi_manager.tuya_iot.ipc.xt_tuya_iot_ipc_manager import (  # noqa: E402
+    XTIOTIPCManager,
+)
+from custom_components.xtend_tuya.multi_manager.tuya_iot.const import (  # noqa: E402
+    WEBRTC_MAX_SESSIONS,
+)
+
+DEFAULT_NEGOTIATIONS = 16
+DEFAULT_ANSWER_CANDIDATES = 3
+SINK_TOPIC = "/av/moto/moto_id/u/{device_id}"
+END_OF_CANDIDATES = "a=end-of-candidates\r\n"
+
+
+class FakeMessageInfo:
+    def __init__(self, mid: int) -> None:
+        self.mid = mid
+        self.published = threading.Event()
+
+    def wait_for_publish(self, timeout: float | None = None) -> None:
+        self.published.wait(timeout)
+
+    def is_published(self) -> bool:
+        return self.published.is_set()
+
+
+class FakeIPCBroker:
+    """Acknowledges the publishes and answers the SDP offers, from timer threads."""
+
+    def __init__(self, ipc_mq: FakeIPCMQ, ack_latency: float, answer_latency: tuple[float, float], answer_candidates: int, seed: int) -> None:
+        self.ipc_mq = ipc_mq
+        self.ack_latency = ack_latency
+        self.answer_latency = answer_latency
+        self.answer_candidates = answer_candidates
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.mids = itertools.count(1)
+        self.timers: list[threading.Timer] = []
+
+    def publish(self, topic: str, payload: str) -> FakeMessageInfo:
+        message_info = FakeMessageInfo(next(self.mids))
+        self._start_timer(self.ack_latency, self._acknowledge, message_info)
+        message = json.loads(payload)
+        header = message["data"]["header"]
+        if header["type"] == "offer":
+            with self.lock:
+                answer_delay = self.rng.uniform(*self.answer_latency)
+            self._start_timer(answer_delay, self._answer, header["sessionid"])
+        return message_info
+
+    def _start_timer(self, delay: float, function: Callable, *function_args: Any) -> None:
+        timer = threading.Timer(delay, function, function_args)
+        with self.lock:
+            self.timers.append(timer)
+        timer.start()
+
+    def join(self) -> None:
+        #Late answers of timed out negotiations still reach the event loop
+        with self.lock:
+            timers = list(self.timers)
+        for timer in timers:
+            timer.join()
+
+    def _acknowledge(self, message_info: FakeMessageInfo) -> None:
+        self.ipc_mq.on_publish(message_info.mid)
+        message_info.published.set()
+
+    def _answer(self, session_id: str) -> None:
+        self.ipc_mq.receive(FakeIPCBroker._get_message("answer", session_id, {"sdp": f"v=0\r\no=- {session_id} 2 IN IP4 127.0.0.1\r\n"}))
+        for index in range(self.answer_candidates):
+            candidate = f"a=candidate:{index} 1 udp 2122260223 192.0.2.{index + 1} 5000{index} typ host\r\n"
+            self.ipc_mq.receive(FakeIPCBroker._get_message("candidate", session_id, {"candidate": candidate}))
+        self.ipc_mq.receive(FakeIPCBroker._get_message("candidate", session_id, {"candidate": ""}))
+
+    def _get_message(sdp_type: str, session_id: str, msg: dict[str, Any]) -> dict[str, Any]:
+        return {"protocol": 302, "data": {"header": {"type": sdp_type, "sessionid": session_id}, "msg": msg}}
+
+
+class FakeIPCMQ:
+    """Stands in for XTIOTOpenMQIPC, the client publishes to the fake broker."""
+
+    broker_options: dict[str, Any] = {}
+
+    def __init__(self, api: Any) -> None:
+        self.api = api
+        self.mq_config = SimpleNamespace(username="cloud_benchuser", sink_topic={"ipc": SINK_TOPIC})
+        self.client = FakeIPCBroker(self, **FakeIPCMQ.broker_options)
+        self.message_listeners: list[Callable[[dict], None]] = []
+        self.publish_acks: dict[int, float] = {}
+        self.publish_acks_lock = threading.Lock()
+
+    def start(self) -> None:
+        pass
+
+    def add_message_listener(self, listener: Callable[[dict], None]) -> None:
+        self.message_listeners.append(listener)
+
+    def receive(self, msg: dict[str, Any]) -> None:
+        for listener in self.message_listeners:
+            listener(msg)
+
+    def on_publish(self, mid: int) -> None:
+        with self.publish_acks_lock:
+            self.publish_acks[mid] = time.monotonic()
+
+    def pop_publish_ack(self, mid: int) -> float | None:
+        with self.publish_acks_lock:
+            return self.publish_acks.pop(mid, None)
+
+
+class FakeOpenAPI:
+    def __init__(self, latency: float) -> None:
+        self.latency = latency
+        self.calls: int = 0
+
+    def get(self, path: str, params: dict[str, Any] | None = None) -> dict[str, Any]:
+        self.calls += 1
+        time.sleep(self.latency)
+        return {
+            "success": True,
+            "result": {
+                "auth": "benchauth",
+                "moto_id": "moto_bench",
+                "p2p_config": {
+                    "ices": [
+                        {"urls": "stun:stun.example.com:3478"},
+                        {"urls": "turn:turn.example.com:3478", "username": "user", "credential": "secret", "ttl": 3600},
+                    ],
+                },
+            },
+        }
+
+
+def make_offer(session_id: str) -> str:
+    return (
+        f"v=0\r\no=- {session_id} 2 IN IP4 127.0.0.1\r\ns=-\r\n"
+        "a=candidate:1 1 udp 2122260223 198.51.100.1 40000 typ host\r\n"
+        "a=candidate:2 1 udp 1686052607 203.0.113.1 40000 typ srflx\r\n"
+        f"{END_OF_CANDIDATES}"
+    )
+
+
+async def run(args: argparse.Namespace) -> bool:
+    loop = asyncio.get_running_loop()
+    hass = SimpleNamespace(loop=loop)
+
+    async def async_add_executor_job(target: Callable, *target_args: Any) -> Any:
+        return await loop.run_in_executor(None, target, *target_args)
+
+    hass.async_add_executor_job = async_add_executor_job
+    FakeIPCMQ.broker_options = {
+        "ack_latency": args.ack_latency,
+        "answer_latency": tuple(args.answer_latency),
+        "answer_candidates": args.answer_candidates,
+        "seed": args.seed,
+    }
+    ipc_manager_module.XTIOTOpenMQIPC = FakeIPCMQ
+    api = FakeOpenAPI(args.api_latency)
+    ipc_manager = XTIOTIPCManager(api, SimpleNamespace(hass=hass))
+    webrtc_manager = ipc_manager.webrtc_manager
+    #Below the negotiations in flight, the session store has to evict
+    webrtc_manager.sdp_exchange.max_sessions = args.max_sessions
+
+    negotiations = [
+        (f"bench_camera_{index % args.cameras}", f"bench_session_{index}")
+        for index in range(args.negotiations)
+    ]
+    start = time.perf_counter()
+    answers = await asyncio.gather(*(
+        webrtc_manager.async_get_sdp_answer(hass, device_id, session_id, make_offer(session_id), args.timeout)
+        for device_id, session_id in negotiations
+    ))
+    duration = time.perf_counter() - start
+    await hass.async_add_executor_job(ipc_manager.ipc_mq.client.join)
+
+    failed = [
+        session_id
+        for (_, session_id), answer in zip(negotiations, answers)
+        if not answer or session_id not in answer or not answer.endswith(END_OF_CANDIDATES)
+        or answer.count("a=candidate:") != args.answer_candidates
+    ]
+    print(
+        f"{args.negotiations} negotiations on {args.cameras} cameras: {duration * 1000:.1f} ms, "
+        f"{args.negotiations - len(failed)} answered, {api.calls} configuration fetches"
+    )
+    print(f"  {webrtc_manager.get_diagnostics()}")
+    if failed:
+        print(f"  Incomplete answers: {failed}")
+    return not failed
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--negotiations", type=int, default=DEFAULT_NEGOTIATIONS, help="concurrent negotiations")
+    parser.add_argument("--cameras", type=int, default=DEFAULT_NEGOTIATIONS, help="distinct cameras of the negotiations")
+    parser.add_argument("--answer-candidates", type=int, default=DEFAULT_ANSWER_CANDIDATES, help="candidates sent with each answer")
+    parser.add_argument("--ack-latency", type=float, default=0.02, help="delay of the publish acknowledgements in seconds")
+    parser.add_argument("--answer-latency", type=float, nargs=2, default=[0.05, 0.3], help="range of the answer delays in seconds")
+    parser.add_argument("--api-latency", type=float, default=0.05, help="delay of the configuration requests in seconds")
+    parser.add_argument("--timeout", type=int, default=5, help="seconds each negotiation waits for the answer")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the answer delays")
+    parser.add_argument("--max-sessions", type=int, default=WEBRTC_MAX_SESSIONS, help="sessions kept by the session store")
+    args = parser.parse_args()
+    args.cameras = max(1, min(args.cameras, args.negotiations))
+    if not asyncio.run(run(args)):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,184 @@
+"""Check of the asyncio OpenAPI client against a local aiohttp test server.
+
+Serves the login, token refresh, device and property issuing endpoints of the
+Tuya cloud from an aiohttp test server, then checks that:
+
+- concurrent requests of the async client share a single token refresh with
+  the sync client requesting at the same time,
+- a rejected token is replaced by a single reconnection,
+- the requests handed to the event loop from worker threads with
+  get_threadsafe and post_threadsafe are sent by aiohttp.
+
+The integration requirements and homeassistant still need to be importable.
+
+Usage:
+    python benchmarks/check_async_openapi.py
+    python benchmarks/check_async_openapi.py --requests 64 --threads 8
+
+Exits with code 1 when a check fails.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+import aiohttp
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tuya_iot.tuya_enums import AuthType  # noqa: E402
+
+from custom_components.xtend_tuya.multi_manager.tuya_iot.xt_tuya_iot_openapi import (  # noqa: E402
+    XTIOTOpenAPI,
+    TUYA_ERROR_CODE_TOKEN_INVALID,
+)
+from custom_components.xtend_tuya.multi_manager.tuya_iot.xt_tuya_iot_openapi_async import (  # noqa: E402
+    XTIOTOpenAPIAsync,
+)
+
+DEFAULT_REQUESTS = 32
+DEFAULT_THREADS = 4
+LOGIN_PATH = "/v1.0/iot-01/associated-users/actions/authorized-login"
+
+
+class FakeTuyaCloud:
+    """Issues numbered tokens and counts the calls of each endpoint."""
+
+    def __init__(self, latency: float) -> None:
+        self.latency = latency
+        self.calls: Counter[str] = Counter()
+        self.user_agents: Counter[str] = Counter()
+        self.tokens = 0
+        self.revoked: set[str] = set()
+        self.lock = threading.Lock()
+
+    def get_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post(LOGIN_PATH, self.login)
+        app.router.add_get("/v1.0/token/{refresh_token}", self.refresh)
+        app.router.add_get("/v1.0/devices/{device_id}", self.device)
+        app.router.add_post("/v2.0/cloud/thing/{device_id}/shadow/properties/issue", self.issue)
+        return app
+
+    def _count(self, name: str, request: web.Request) -> None:
+        with self.lock:
+            self.calls[name] += 1
+            self.user_agents[request.headers.get("User-Agent", "").split("/")[0]] += 1
+
+    def _token_response(self) -> web.Response:
+        with self.lock:
+            self.tokens += 1
+            token = self.tokens
+        return web.json_response({
+            "success": True,
+            "t": int(time.time() * 1000),
+            "result": {"access_token": f"access_{token}", "refresh_token": f"refresh_{token}", "expire_time": 7200, "uid": "bench_uid"},
+        })
+
+    async def login(self, request: web.Request) -> web.Response:
+        self._count("login", request)
+        return self._token_response()
+
+    async def refresh(self, request: web.Request) -> web.Response:
+        self._count("refresh", request)
+        return self._token_response()
+
+    async def device(self, request: web.Request) -> web.Response:
+        self._count("device", request)
+        await asyncio.sleep(self.latency)
+        if request.headers.get("access_token") in self.revoked:
+            return web.json_response({"success": False, "code": TUYA_ERROR_CODE_TOKEN_INVALID, "msg": "token invalid"})
+        return web.json_response({"success": True, "result": {"id": request.match_info["device_id"]}})
+
+    async def issue(self, request: web.Request) -> web.Response:
+        self._count("issue", request)
+        await asyncio.sleep(self.latency)
+        return web.json_response({"success": True, "result": await request.json()})
+
+
+def check(name: str, passed: bool, details: Any) -> bool:
+    print(f"  {'OK  ' if passed else 'FAIL'} {name}: {details}")
+    return passed
+
+
+async def run(args: argparse.Namespace) -> bool:
+    loop = asyncio.get_running_loop()
+    cloud = FakeTuyaCloud(args.latency)
+    server = TestServer(cloud.get_app())
+    await server.start_server()
+    session = aiohttp.ClientSession()
+    api = XTIOTOpenAPI(str(server.make_url("")).rstrip("/"), "bench_id", "bench_secret", AuthType.SMART_HOME)
+    async_api = XTIOTOpenAPIAsync(api, session, pool_size=args.pool_size, loop=loop)
+    results: list[bool] = []
+    try:
+        await loop.run_in_executor(None, api.connect, "bench_user", "bench_password", "1", "smartlife")
+        paths = [f"/v1.0/devices/bench_device_{index}" for index in range(args.requests)]
+
+        #The token is about to expire, the async and the sync clients both need a refresh
+        api.token_info.expire_time = int(time.time() * 1000)
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.threads) as executor:
+            sync_responses = [loop.run_in_executor(executor, api.get, path) for path in paths]
+            responses = await asyncio.gather(*(async_api.get(path) for path in paths), *sync_responses)
+        duration = time.perf_counter() - start
+        results.append(check(
+            f"{len(responses)} requests with an expiring token in {duration * 1000:.1f} ms",
+            all(response.get("success") for response in responses) and cloud.calls["refresh"] == 1,
+            f"{cloud.calls['refresh']} refresh",
+        ))
+
+        #The cloud revokes the current token, every request sees it rejected once
+        cloud.revoked.add(api.token_info.access_token)
+        logins = cloud.calls["login"]
+        responses = await asyncio.gather(*(async_api.get(path) for path in paths))
+        results.append(check(
+            "requests with a revoked token",
+            all(response.get("success") for response in responses) and cloud.calls["login"] - logins == 1,
+            f"{cloud.calls['login'] - logins} reconnection",
+        ))
+
+        #Worker threads hand their requests to the event loop
+        cloud.user_agents.clear()
+        with ThreadPoolExecutor(max_workers=args.threads) as executor:
+            threaded = [loop.run_in_executor(executor, async_api.get_threadsafe, path) for path in paths]
+            threaded.append(loop.run_in_executor(
+                executor, async_api.post_threadsafe, "/v2.0/cloud/thing/bench_device_0/shadow/properties/issue", {"properties": "{}"}
+            ))
+            responses = await asyncio.gather(*threaded)
+        results.append(check(
+            "requests from worker threads",
+            all(response.get("success") for response in responses) and set(cloud.user_agents) == {"Python"},
+            dict(cloud.user_agents),
+        ))
+    finally:
+        api.stop_token_refresh()
+        async_api.shutdown()
+        await session.close()
+        await server.close()
+    print(f"  calls: {dict(cloud.calls)}")
+    return all(results)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=DEFAULT_REQUESTS, help="requests of each client in each check")
+    parser.add_argument("--threads", type=int, default=DEFAULT_THREADS, help="worker threads of the sync requests")
+    parser.add_argument("--pool-size", type=int, default=8, help="requests of the async client in flight")
+    parser.add_argument("--latency", type=float, default=0.02, help="delay of the device requests in seconds")
+    args = parser.parse_args()
+    if not asyncio.run(run(args)):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,232 @@
+"""Equivalence check of the device registry cleanup on a synthetic large registry.
+
+Builds a registry of devices owned by the Tuya integration, by this one, by
+both of them or by unrelated integrations, along with the config entries of
+both domains and their device maps, then compares cleanup_device_registry
+with the previous implementation (which rebuilt the device map of every
+domain for each registry identifier):
+
+- get_domain_device_ids must hold the devices of the previous domain maps,
+- is_device_in_domain_device_ids must answer like the previous
+  is_device_in_domain_device_maps for every registry identifier,
+- both must remove the same devices.
+
+Both cleanups are timed. The check is self-contained: the cleanup functions
+are loaded from the integration sources with a stub device registry and
+stub config entries, neither Home Assistant nor the integration requirements
+need to be installed.
+
+Usage:
+    python benchmarks/check_device_registry_cleanup.py
+    python benchmarks/check_device_registry_cleanup.py --devices 20000 --entries 3 --seed 1
+
+Exits with code 1 when the results differ.
+"""
+from __future__ import annotations
+
+import __future__
+import argparse
+import ast
+import asyncio
+import os
+import random
+import sys
+import time
+from types import SimpleNamespace
+from typing import Any
+
+INTEGRATION_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "custom_components", "xtend_tuya"
+)
+CLEANUP_FUNCTIONS = (
+    "cleanup_device_registry",
+    "are_all_domain_config_loaded",
+    "get_domain_device_ids",
+    "is_device_in_domain_device_ids",
+)
+
+DEFAULT_DEVICES = 5000
+DEFAULT_ENTRIES = 2
+OTHER_DOMAIN = "other_integration"
+ENTRY_LOADED = "loaded"
+
+#Share of the registry devices still known by a device map
+KNOWN_RATIO = 0.7
+
+
+def read_constants(path: str, names: tuple[str, ...]) -> dict[str, Any]:
+    with open(path, encoding="utf-8") as file:
+        tree = ast.parse(file.read(), path)
+    constants: dict[str, Any] = {}
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and len(node.targets) == 1 and isinstance(node.targets[0], ast.Name):
+            if node.targets[0].id in names:
+                constants[node.targets[0].id] = ast.literal_eval(node.value)
+    return constants
+
+
+CONSTANTS = read_constants(os.path.join(INTEGRATION_PATH, "const.py"), ("DOMAIN", "DOMAIN_ORIG"))
+DOMAIN = CONSTANTS["DOMAIN"]
+DOMAIN_ORIG = CONSTANTS["DOMAIN_ORIG"]
+
+
+class StubDeviceRegistry:
+    def __init__(self, devices: dict[str, SimpleNamespace]) -> None:
+        self.devices = dict(devices)
+        self.removed: list[str] = []
+
+    def async_remove_device(self, device_id: str) -> None:
+        self.removed.append(device_id)
+
+
+def load_cleanup_functions(device_registry_holder: SimpleNamespace) -> SimpleNamespace:
+    """Compiles the cleanup functions of the integration with stubs for their dependencies."""
+    path = os.path.join(INTEGRATION_PATH, "__init__.py")
+    with open(path, encoding="utf-8") as file:
+        tree = ast.parse(file.read(), path)
+    functions = [
+        node for node in tree.body
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) and node.name in CLEANUP_FUNCTIONS
+    ]
+    missing = set(CLEANUP_FUNCTIONS) - {function.name for function in functions}
+    if missing:
+        raise RuntimeError(f"Functions not found in {path}: {sorted(missing)}")
+    namespace: dict[str, Any] = {
+        "DOMAIN": DOMAIN,
+        "DOMAIN_ORIG": DOMAIN_ORIG,
+        "ConfigEntryState": SimpleNamespace(LOADED=ENTRY_LOADED),
+        "dr": SimpleNamespace(async_get=lambda hass: device_registry_holder.registry),
+        "get_config_entry_runtime_data": lambda hass, config_entry, domain: config_entry.runtime_data,
+    }
+    #The annotations are never evaluated, their types don't need to exist here
+    module = ast.Module(body=functions, type_ignores=[])
+    exec(compile(module, path, "exec", flags=__future__.annotations.compiler_flag, dont_inherit=True), namespace)
+    return SimpleNamespace(**{name: namespace[name] for name in CLEANUP_FUNCTIONS})
+
+
+def make_fleet(device_count: int, entry_count: int, seed: int) -> tuple[dict[str, list[SimpleNamespace]], dict[str, SimpleNamespace]]:
+    rng = random.Random(seed)
+    entries: dict[str, list[SimpleNamespace]] = {}
+    for domain in (DOMAIN_ORIG, DOMAIN):
+        entries[domain] = [
+            SimpleNamespace(
+                entry_id=f"{domain}_{index}",
+                state=ENTRY_LOADED,
+                runtime_data=SimpleNamespace(device_manager=SimpleNamespace(device_map={})),
+            )
+            for index in range(entry_count)
+        ]
+    registry_devices: dict[str, SimpleNamespace] = {}
+    for index in range(device_count):
+        device_id = f"bf{index:020x}"
+        domains = rng.choice(((DOMAIN_ORIG,), (DOMAIN,), (DOMAIN_ORIG, DOMAIN), (OTHER_DOMAIN,)))
+        if rng.random() < KNOWN_RATIO:
+            #Known by a single entry of a single domain, the other identifiers rely on it
+            domain = rng.choice((DOMAIN_ORIG, DOMAIN))
+            rng.choice(entries[domain]).runtime_data.device_manager.device_map[device_id] = object()
+        registry_devices[f"registry_{index}"] = SimpleNamespace(
+            identifiers={(domain, device_id) for domain in domains}
+        )
+    return entries, registry_devices
+
+
+def legacy_get_domain_device_map(hass: Any, domain: str) -> dict[str, Any]:
+    device_map = {}
+    for config_entry in hass.config_entries.async_entries(domain, False, False):
+        runtime_data = config_entry.runtime_data
+        for device_id in runtime_data.device_manager.device_map:
+            if device_id not in device_map:
+                device_map[device_id] = runtime_data.device_manager.device_map[device_id]
+    return device_map
+
+
+def legacy_is_device_in_domain_device_maps(
+    hass: Any, domains: list[str], device_entry_identifiers: tuple[str, str], get_domain_device_map: Any = legacy_get_domain_device_map
+) -> bool:
+    if device_entry_identifiers[0] in domains:
+        for domain in domains:
+            if device_entry_identifiers[1] in get_domain_device_map(hass, domain):
+                return True
+    else:
+        return True
+    return False
+
+
+def legacy_cleanup_device_registry(hass: Any, device_registry: StubDeviceRegistry) -> None:
+    for dev_id, device_entry in list(device_registry.devices.items()):
+        for item in device_entry.identifiers:
+            if not legacy_is_device_in_domain_device_maps(hass, [DOMAIN_ORIG, DOMAIN], item):
+                device_registry.async_remove_device(dev_id)
+                break
+
+
+def run(device_count: int, entry_count: int, seed: int) -> bool:
+    entries, registry_devices = make_fleet(device_count, entry_count, seed)
+    hass = SimpleNamespace(
+        config_entries=SimpleNamespace(async_entries=lambda domain, *args: entries.get(domain, []))
+    )
+    current_entry = SimpleNamespace(entry_id=entries[DOMAIN][0].entry_id)
+    device_registry_holder = SimpleNamespace(registry=None)
+    cleanup = load_cleanup_functions(device_registry_holder)
+    domains = [DOMAIN_ORIG, DOMAIN]
+    passed = True
+
+    domain_device_ids = cleanup.get_domain_device_ids(hass, domains)
+    legacy_device_ids: set[str] = set()
+    for domain in domains:
+        legacy_device_ids.update(legacy_get_domain_device_map(hass, domain))
+    if domain_device_ids != legacy_device_ids:
+        print(f"  get_domain_device_ids differs: {len(domain_device_ids)} devices vs {len(legacy_device_ids)} before")
+        passed = False
+
+    #The maps don't change during the check, the previous answers are computed on them once built
+    legacy_maps = {domain: legacy_get_domain_device_map(hass, domain) for domain in domains}
+    identifiers = [item for device_entry in registry_devices.values() for item in device_entry.identifiers]
+    differing = [
+        item for item in identifiers
+        if cleanup.is_device_in_domain_device_ids(domains, domain_device_ids, item)
+        != legacy_is_device_in_domain_device_maps(hass, domains, item, lambda hass, domain: legacy_maps[domain])
+    ]
+    if differing:
+        print(f"  is_device_in_domain_device_ids differs for {len(differing)} identifiers: {sorted(differing)[:10]}")
+        passed = False
+
+    new_registry = StubDeviceRegistry(registry_devices)
+    device_registry_holder.registry = new_registry
+    start = time.perf_counter()
+    asyncio.run(cleanup.cleanup_device_registry(hass, None, current_entry))
+    new_duration = time.perf_counter() - start
+
+    legacy_registry = StubDeviceRegistry(registry_devices)
+    start = time.perf_counter()
+    legacy_cleanup_device_registry(hass, legacy_registry)
+    legacy_duration = time.perf_counter() - start
+
+    new_removed = set(new_registry.removed)
+    legacy_removed = set(legacy_registry.removed)
+    print(
+        f"{device_count} registry devices ({len(identifiers)} identifiers), {entry_count} entries per domain: "
+        f"{len(new_removed)} removed in {new_duration * 1000:.1f} ms, "
+        f"previous implementation {len(legacy_removed)} removed in {legacy_duration * 1000:.1f} ms"
+    )
+    if new_removed != legacy_removed:
+        print(f"  Only removed now: {sorted(new_removed - legacy_removed)[:10]}")
+        print(f"  Only removed before: {sorted(legacy_removed - new_removed)[:10]}")
+        passed = False
+    return passed
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--devices", type=int, default=DEFAULT_DEVICES, help="devices of the synthetic registry")
+    parser.add_argument("--entries", type=int, default=DEFAULT_ENTRIES, help="config entries of each domain")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the synthetic registry")
+    args = parser.parse_args()
+    if not run(args.devices, args.entries, args.seed):
+        print("The cleanup results differ")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
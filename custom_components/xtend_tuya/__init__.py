@@ -1,6 +1,7 @@
 """Support for Tuya Smart devices."""
 
 from __future__ import annotations
+import asyncio
 import logging
 
 from homeassistant.config_entries import ConfigEntry, ConfigEntryState
@@ -25,6 +26,9 @@ from .multi_manager.shared.shared_classes import (
 from .util import (
     get_config_entry_runtime_data
 )
+from .multi_manager.shared.product_cache import (
+    XTProductCache,
+)
 from .multi_manager.shared.services.services import (
     ServiceManager,
 )
@@ -39,44 +43,79 @@ async def update_listener(hass: HomeAssistant, entry: XTConfigEntry):
 async def async_setup_entry(hass: HomeAssistant, entry: XTConfigEntry) -> bool:
     """Async setup hass config entry.""" 
     multi_manager = MultiManager(hass)
+    profiler = multi_manager.startup_profiler
     service_manager = ServiceManager(multi_manager=multi_manager)
-    await multi_manager.setup_entry(hass, entry)
+    try:
+        await _async_setup_entry(hass, entry, multi_manager, service_manager)
+    finally:
+        #The profile of a failed setup tells where it stopped
+        profiler.finish()
+
+    # Specifications loaded from the local cache are checked against the cloud
+    # once everything is up
+    entry.async_create_background_task(
+        hass, multi_manager.async_revalidate_product_cache(), "xtend_tuya_revalidate_product_cache"
+    )
+    return True
+
+
+async def _async_setup_entry(hass: HomeAssistant, entry: XTConfigEntry, multi_manager: MultiManager, service_manager: ServiceManager) -> None:
+    profiler = multi_manager.startup_profiler
+    with profiler.phase("setup_entry"):
+        await multi_manager.setup_entry(hass, entry)
 
     # Get all devices from Tuya
-    await hass.async_add_executor_job(multi_manager.update_device_cache)
+    with profiler.phase("update_device_cache"):
+        await hass.async_add_executor_job(multi_manager.update_device_cache)
 
     # Connection is successful, store the manager & listener
     entry.runtime_data = HomeAssistantXTData(multi_manager=multi_manager, listener=multi_manager.multi_device_listener, service_manager=service_manager)
 
     # Cleanup device registry
-    await cleanup_device_registry(hass, multi_manager, entry)
+    with profiler.phase("cleanup_device_registry"):
+        await cleanup_device_registry(hass, multi_manager, entry)
 
     # Register known device IDs
     device_registry = dr.async_get(hass)
     aggregated_device_map = multi_manager.device_map
-    for device in aggregated_device_map.values():
-        domain_identifiers:list = multi_manager.get_domain_identifiers_of_device(device.id)
-        identifiers: set[tuple[str, str]] = set()
-        for domain_identifier in domain_identifiers:
-            identifiers.add((domain_identifier, device.id))
-        device_registry.async_get_or_create(
-            config_entry_id=entry.entry_id,
-            identifiers=identifiers,
-            manufacturer="Tuya",
-            name=device.name,
-            model=f"{device.product_name} (unsupported)",
-        )
-
-    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
-
-    for device in aggregated_device_map.values():
-        multi_manager.virtual_state_handler.apply_init_virtual_states(device)
+    with profiler.phase("device_registry"):
+        for device in aggregated_device_map.values():
+            domain_identifiers:list = multi_manager.get_domain_identifiers_of_device(device.id)
+            identifiers: set[tuple[str, str]] = set()
+            for domain_identifier in domain_identifiers:
+                identifiers.add((domain_identifier, device.id))
+            device_registry.async_get_or_create(
+                config_entry_id=entry.entry_id,
+                identifiers=identifiers,
+                manufacturer="Tuya",
+                name=device.name,
+                model=f"{device.product_name} (unsupported)",
+            )
+
+    with profiler.phase("forward_entry_setups"):
+        if profiler.enabled:
+            #Forwarded one by one to time each platform, they still set up concurrently
+            await asyncio.gather(*(
+                _async_forward_platform_setup(hass, entry, multi_manager, platform)
+                for platform in PLATFORMS
+            ))
+        else:
+            await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+
+    with profiler.phase("apply_init_virtual_states"):
+        for device in aggregated_device_map.values():
+            multi_manager.virtual_state_handler.apply_init_virtual_states(device)
         
     # If the device does not register any entities, the device does not need to subscribe
     # So the subscription is here
-    await hass.async_add_executor_job(multi_manager.refresh_mq)
+    with profiler.phase("refresh_mq"):
+        await hass.async_add_executor_job(multi_manager.refresh_mq)
     service_manager.register_services()
-    return True
+
+
+async def _async_forward_platform_setup(hass: HomeAssistant, entry: XTConfigEntry, multi_manager: MultiManager, platform: str) -> None:
+    with multi_manager.startup_profiler.phase(f"platform.{platform}"):
+        await hass.config_entries.async_forward_entry_setups(entry, [platform])
 
 
 async def cleanup_device_registry(hass: HomeAssistant, multi_manager: MultiManager, current_entry: ConfigEntry) -> None:
@@ -85,10 +124,13 @@ async def cleanup_device_registry(hass: HomeAssistant, multi_manager: MultiManag
         return
     if not are_all_domain_config_loaded(hass, DOMAIN_ORIG, current_entry):
         return
+    domains = [DOMAIN_ORIG, DOMAIN]
+    #Built once, the registry can hold thousands of entries
+    domain_device_ids = get_domain_device_ids(hass, domains)
     device_registry = dr.async_get(hass)
     for dev_id, device_entry in list(device_registry.devices.items()):
         for item in device_entry.identifiers:
-            if not is_device_in_domain_device_maps(hass, [DOMAIN_ORIG, DOMAIN],item):
+            if not is_device_in_domain_device_ids(domains, domain_device_ids, item):
                 device_registry.async_remove_device(dev_id)
                 break
 
@@ -101,28 +143,20 @@ def are_all_domain_config_loaded(hass: HomeAssistant, domain: str, current_entry
             return False
     return True
 
-def get_domain_device_map(hass: HomeAssistant, domain: str) -> dict[str, any]:
-    device_map = {}
-    config_entries: XTConfigEntry = hass.config_entries.async_entries(domain, False, False)
-    for config_entry in config_entries:
-        runtime_data = get_config_entry_runtime_data(hass, config_entry, domain)
-        for device_id in runtime_data.device_manager.device_map:
-            if device_id not in device_map:
-                device_map[device_id] = runtime_data.device_manager.device_map[device_id]
-    return device_map
+def get_domain_device_ids(hass: HomeAssistant, domains: list[str]) -> set[str]:
+    device_ids: set[str] = set()
+    for domain in domains:
+        config_entries: XTConfigEntry = hass.config_entries.async_entries(domain, False, False)
+        for config_entry in config_entries:
+            runtime_data = get_config_entry_runtime_data(hass, config_entry, domain)
+            device_ids.update(runtime_data.device_manager.device_map)
+    return device_ids
 
-def is_device_in_domain_device_maps(hass: HomeAssistant, domains: list[str], device_entry_identifiers: list[str]):
+def is_device_in_domain_device_ids(domains: list[str], domain_device_ids: set[str], device_entry_identifiers: list[str]) -> bool:
     device_domain = device_entry_identifiers[0]
     if device_domain in domains:
-        for domain in domains:
-            device_map = get_domain_device_map(hass, domain)
-            device_id = device_entry_identifiers[1]
-            if device_id in device_map:
-                return True
-    else:
-        return True
-    
-    return False
+        return device_entry_identifiers[1] in domain_device_ids
+    return True
 
 async def async_unload_entry(hass: HomeAssistant, entry: XTConfigEntry) -> bool:
     """Unloading the Tuya platforms."""
@@ -131,6 +165,7 @@ async def async_unload_entry(hass: HomeAssistant, entry: XTConfigEntry) -> bool:
         if tuya.manager.mq is not None:
             tuya.manager.mq.stop()
         tuya.manager.remove_device_listeners()
+        await tuya.manager.async_unload()
     return unload_ok
 
 
@@ -139,4 +174,5 @@ async def async_remove_entry(hass: HomeAssistant, entry: XTConfigEntry) -> None:
 
     This will revoke the credentials from Tuya.
     """
-    await hass.async_add_executor_job(entry.runtime_data.multi_manager.unload)
\ No newline at end of file
+    await hass.async_add_executor_job(entry.runtime_data.multi_manager.unload)
+    await XTProductCache(hass, entry.entry_id).async_remove()
\ No newline at end of file
@@ -8,6 +8,7 @@ import json
 import struct
 from typing import Any, Literal, Self, overload
 
+from homeassistant.core import callback
 from homeassistant.helpers.device_registry import DeviceInfo
 from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity import Entity
@@ -157,6 +158,8 @@ class TuyaEntity(Entity):
         device.set_up = True
         self.device = device
         self.device_manager = device_manager
+        #Parsed type data by (dpcode, source, type data class), along with the values they were parsed from
+        self._type_data_cache: dict[tuple[DPCode, str, type], tuple[Any, EnumTypeData | IntegerTypeData | None]] = {}
 
     @property
     def device_info(self) -> DeviceInfo:
@@ -236,8 +239,8 @@ class TuyaEntity(Entity):
                     and getattr(self.device, key)[dpcode].type == DPType.ENUM
                 ):
                     if not (
-                        enum_type := EnumTypeData.from_json(
-                            dpcode, getattr(self.device, key)[dpcode].values
+                        enum_type := self._get_type_data(
+                            EnumTypeData, dpcode, key, getattr(self.device, key)[dpcode].values
                         )
                     ):
                         continue
@@ -249,8 +252,8 @@ class TuyaEntity(Entity):
                 ):
                     try:
                         if not (
-                            integer_type := IntegerTypeData.from_json(
-                                dpcode, getattr(self.device, key)[dpcode].values
+                            integer_type := self._get_type_data(
+                                IntegerTypeData, dpcode, key, getattr(self.device, key)[dpcode].values
                             )
                         ):
                             continue
@@ -265,6 +268,23 @@ class TuyaEntity(Entity):
 
         return None
 
+    def _get_type_data(
+        self,
+        type_data_class: type[EnumTypeData] | type[IntegerTypeData],
+        dpcode: DPCode,
+        key: str,
+        values: Any,
+    ) -> EnumTypeData | IntegerTypeData | None:
+        """Return the parsed type data, parsing the values only when they changed."""
+        cache_key = (dpcode, key, type_data_class)
+        if (cached := self._type_data_cache.get(cache_key)) is not None and (
+            cached[0] is values or cached[0] == values
+        ):
+            return cached[1]
+        type_data = type_data_class.from_json(dpcode, values)
+        self._type_data_cache[cache_key] = (values, type_data)
+        return type_data
+
     def get_dptype(
         self, dpcode: DPCode | None, prefer_function: bool = False
     ) -> DPType | None:
@@ -300,10 +320,37 @@ class TuyaEntity(Entity):
             async_dispatcher_connect(
                 self.hass,
                 f"{TUYA_HA_SIGNAL_UPDATE_ENTITY}_{self.device.id}",
-                self.async_write_ha_state,
+                self._handle_state_update,
             )
         )
 
-    def _send_command(self, commands: list[dict[str, Any]]) -> None:
-        """Send command to the device."""
-        self.device_manager.send_commands(self.device.id, commands)
+    @callback
+    def _handle_state_update(self, updated_status_codes: set[str] | None = None) -> None:
+        """Write the state unless the update doesn't concern this entity."""
+        if updated_status_codes is not None and not self._is_affected_by_status_update(updated_status_codes):
+            return
+        self.async_write_ha_state()
+
+    def _is_affected_by_status_update(self, updated_status_codes: set[str]) -> bool:
+        """Return if the updated status codes are used by this entity.
+
+        Entities reading more than their own DP code must always be updated,
+        only the ones that only depend on their key override this.
+        """
+        return True
+
+    def _is_code_in_status_update(self, code: str, updated_status_codes: set[str]) -> bool:
+        """Return if the code, or another code of the same DP, was updated."""
+        if code in updated_status_codes:
+            return True
+        if (dpId := self.device.get_dpId_from_code(code)) is None:
+            return False
+        return any(self.device.get_dpId_from_code(updated_code) == dpId for updated_code in updated_status_codes)
+
+    def _send_command(self, commands: list[dict[str, Any]], coalesce: bool = False) -> None:
+        """Send command to the device.
+
+        Slider entities set coalesce so that only the latest of the values
+        sent in quick succession reach the device.
+        """
+        self.device_manager.send_commands(self.device.id, commands, coalesce)
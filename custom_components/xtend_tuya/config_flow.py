@@ -41,6 +41,12 @@ from .const import (
     CONF_COUNTRY_CODE,
     CONF_PASSWORD,
     CONF_USERNAME,
+    CONF_API_CALL_MONTHLY_BUDGET,
+    API_CALL_DEFAULT_MONTHLY_BUDGET,
+    CONF_DEVICE_COMMAND_COALESCING_WINDOW,
+    DEVICE_COMMAND_COALESCING_WINDOW,
+    CONF_DEVICE_UPDATE_COALESCING_WINDOW,
+    DEVICE_UPDATE_COALESCING_WINDOW,
     SMARTLIFE_APP,
     TUYA_COUNTRIES,
     TUYA_SMART_APP,
@@ -78,6 +84,9 @@ class TuyaOptionFlow(OptionsFlow):
             CONF_PASSWORD: user_input[CONF_PASSWORD],
             CONF_COUNTRY_CODE: country.country_code,
             CONF_USE_OPEN_API: user_input[CONF_USE_OPEN_API],
+            CONF_API_CALL_MONTHLY_BUDGET: user_input.get(CONF_API_CALL_MONTHLY_BUDGET, API_CALL_DEFAULT_MONTHLY_BUDGET),
+            CONF_DEVICE_COMMAND_COALESCING_WINDOW: user_input.get(CONF_DEVICE_COMMAND_COALESCING_WINDOW, DEVICE_COMMAND_COALESCING_WINDOW),
+            CONF_DEVICE_UPDATE_COALESCING_WINDOW: user_input.get(CONF_DEVICE_UPDATE_COALESCING_WINDOW, DEVICE_UPDATE_COALESCING_WINDOW),
         }
         if (
                not data[CONF_USE_OPEN_API]
@@ -188,6 +197,18 @@ class TuyaOptionFlow(OptionsFlow):
                         CONF_PASSWORD, 
                         default=user_input.get(CONF_PASSWORD, self.options.get(CONF_PASSWORD, ""))
                     ): str,
+                    vol.Optional(
+                        CONF_API_CALL_MONTHLY_BUDGET,
+                        default=user_input.get(CONF_API_CALL_MONTHLY_BUDGET, self.options.get(CONF_API_CALL_MONTHLY_BUDGET, API_CALL_DEFAULT_MONTHLY_BUDGET))
+                    ): vol.All(vol.Coerce(int), vol.Range(min=0)),
+                    vol.Optional(
+                        CONF_DEVICE_COMMAND_COALESCING_WINDOW,
+                        default=user_input.get(CONF_DEVICE_COMMAND_COALESCING_WINDOW, self.options.get(CONF_DEVICE_COMMAND_COALESCING_WINDOW, DEVICE_COMMAND_COALESCING_WINDOW))
+                    ): vol.All(vol.Coerce(float), vol.Range(min=0, max=5)),
+                    vol.Optional(
+                        CONF_DEVICE_UPDATE_COALESCING_WINDOW,
+                        default=user_input.get(CONF_DEVICE_UPDATE_COALESCING_WINDOW, self.options.get(CONF_DEVICE_UPDATE_COALESCING_WINDOW, DEVICE_UPDATE_COALESCING_WINDOW))
+                    ): vol.All(vol.Coerce(float), vol.Range(min=0, max=5)),
                 }
             ),
             errors=errors,
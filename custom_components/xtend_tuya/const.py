@@ -49,6 +49,9 @@ CONF_USERNAME = "username"
 CONF_PASSWORD = "password"
 CONF_COUNTRY_CODE = "country_code"
 CONF_APP_TYPE = "tuya_app_type"
+CONF_API_CALL_MONTHLY_BUDGET = "api_call_monthly_budget"
+CONF_DEVICE_COMMAND_COALESCING_WINDOW = "device_command_coalescing_window"
+CONF_DEVICE_UPDATE_COALESCING_WINDOW = "device_update_coalescing_window"
 
 TUYA_CLIENT_ID = "HA_3y9q4ak7g4ephrvke"
 TUYA_SCHEMA = "haauthorize"
@@ -71,6 +74,21 @@ SMARTLIFE_APP = "smartlife"
 MESSAGE_SOURCE_TUYA_IOT = "tuya_iot"
 MESSAGE_SOURCE_TUYA_SHARING = "tuya_sharing"
 
+#Seconds during which the updates of a device are coalesced
+#into a single entity update, 0 disables the coalescing
+DEVICE_UPDATE_COALESCING_WINDOW = 0
+#Seconds during which the slider commands of a device are coalesced,
+#only the latest value of each DP is sent, 0 disables the coalescing
+DEVICE_COMMAND_COALESCING_WINDOW = 0.3
+
+#Monthly cloud API call budget, 0 only counts the calls
+API_CALL_DEFAULT_MONTHLY_BUDGET = 0
+#Share of the budget after which the low priority calls are deferred
+API_CALL_LOW_PRIORITY_RATIO = 0.8
+#Seconds of observation before the usage is projected to the end of the month
+API_CALL_PROJECTION_MIN_WINDOW = 3600
+API_CALL_DIAGNOSTICS_TOP_DEVICES = 20
+
 PLATFORMS = [
     Platform.ALARM_CONTROL_PANEL,
     Platform.BINARY_SENSOR,
@@ -302,7 +302,8 @@ class TuyaCoverEntity(TuyaEntity, CoverEntity):
                         )
                     ),
                 }
-            ]
+            ],
+            coalesce=True,
         )
 
     def stop_cover(self, **kwargs: Any) -> None:
@@ -333,5 +334,6 @@ class TuyaCoverEntity(TuyaEntity, CoverEntity):
                         )
                     ),
                 }
-            ]
+            ],
+            coalesce=True,
         )
@@ -52,6 +52,20 @@ def _async_get_diagnostics(
         "mqtt_connected": mqtt_connected,
         "disabled_by": entry.disabled_by,
         "disabled_polling": entry.pref_disable_polling,
+        "pending_messages": hass_data.manager.pending_messages.get_diagnostics(),
+        "startup_profile": hass_data.manager.startup_profiler.get_diagnostics(),
+        "command_coalescing": hass_data.manager.command_coalescer.get_diagnostics(),
+        "view_caches": hass_data.service_manager.get_view_cache_diagnostics(),
+        "webrtc_sessions": {
+            name: webrtc_diagnostics
+            for name, account in hass_data.manager.accounts.items()
+            if (webrtc_diagnostics := account.get_webrtc_diagnostics()) is not None
+        },
+        "cloud_api": {
+            name: cloud_api_diagnostics
+            for name, account in hass_data.manager.accounts.items()
+            if (cloud_api_diagnostics := account.get_cloud_api_diagnostics()) is not None
+        },
     }
 
     if device:
@@ -327,7 +327,8 @@ class TuyaLightEntity(TuyaEntity, LightEntity):
                 },
             ]
 
-        self._send_command(commands)
+        #Brightness and colour temperature sliders send a value per step
+        self._send_command(commands, coalesce=ATTR_BRIGHTNESS in kwargs or ATTR_COLOR_TEMP in kwargs)
 
     def turn_off(self, **kwargs: Any) -> None:
         """Instruct the light to turn off."""
@@ -1,6 +1,5 @@
 from __future__ import annotations
 from functools import partial
-import copy
 import importlib
 import os
 from typing import Any, Literal, Optional
@@ -16,6 +15,10 @@ from tuya_iot.device import (
 from ..const import (
     LOGGER,
     AllowedPlugins,
+    CONF_DEVICE_COMMAND_COALESCING_WINDOW,
+    DEVICE_COMMAND_COALESCING_WINDOW,
+    CONF_DEVICE_UPDATE_COALESCING_WINDOW,
+    DEVICE_UPDATE_COALESCING_WINDOW,
 )
 
 from .shared.import_stub import (
@@ -61,6 +64,24 @@ from .shared.multi_virtual_function_handler import (
     XTVirtualFunctionHandler,
 )
 
+from .shared.product_cache import (
+    XTProductCache,
+)
+
+from .shared.product_registry import (
+    XTProductSpecRegistry,
+)
+
+from .shared.pending_messages import (
+    XTPendingMessageBuffer,
+)
+from .shared.startup_profiler import (
+    XTStartupProfiler,
+)
+from .shared.command_coalescer import (
+    XTCommandCoalescer,
+)
+
 from ..util import (
     append_lists,
 )
@@ -81,8 +102,13 @@ class MultiManager:  # noqa: F811
         self.accounts: dict[str, XTDeviceManagerInterface] = {}
         self.master_device_map: dict[str, XTDevice] = {}
         self.is_ready_for_messages = False
-        self.pending_messages: list[tuple[str, str]] = []
+        self.pending_messages = XTPendingMessageBuffer()
         self.devices_shared: dict[str, XTDevice] = {}
+        self.config_entry: XTConfigEntry = None
+        self.product_cache: XTProductCache = None
+        self.product_registry = XTProductSpecRegistry()
+        self.startup_profiler = XTStartupProfiler()
+        self.command_coalescer = XTCommandCoalescer(hass, self._send_commands_now)
 
     @property
     def device_map(self):
@@ -98,6 +124,17 @@ class MultiManager:  # noqa: F811
         return None
 
     async def setup_entry(self, hass: HomeAssistant, config_entry: XTConfigEntry) -> None:
+        self.config_entry = config_entry
+        self.command_coalescer.window = config_entry.options.get(
+            CONF_DEVICE_COMMAND_COALESCING_WINDOW, DEVICE_COMMAND_COALESCING_WINDOW
+        )
+        self.multi_device_listener.update_coalescing_window = config_entry.options.get(
+            CONF_DEVICE_UPDATE_COALESCING_WINDOW, DEVICE_UPDATE_COALESCING_WINDOW
+        )
+        self.product_cache = XTProductCache(hass, config_entry.entry_id)
+        with self.startup_profiler.phase("product_cache.load"):
+            await self.product_cache.async_load()
+
         #Load all the plugins
         #subdirs = await self.hass.async_add_executor_job(os.listdir, os.path.dirname(__file__))
         subdirs = AllowedPlugins.get_plugins_to_load()
@@ -105,16 +142,20 @@ class MultiManager:  # noqa: F811
             if os.path.isdir(os.path.dirname(__file__) + os.sep + directory):
                 load_path = f".{directory}.init"
                 try:
-                    plugin = await self.hass.async_add_executor_job(partial(importlib.import_module, name=load_path, package=__package__))
+                    with self.startup_profiler.phase(f"plugin.{directory}.import"):
+                        plugin = await self.hass.async_add_executor_job(partial(importlib.import_module, name=load_path, package=__package__))
                     LOGGER.debug(f"Plugin {load_path} loaded")
                     instance: XTDeviceManagerInterface = plugin.get_plugin_instance()
-                    if await instance.setup_from_entry(hass, config_entry, self):
+                    with self.startup_profiler.phase(f"plugin.{directory}.setup"):
+                        is_set_up = await instance.setup_from_entry(hass, config_entry, self)
+                    if is_set_up:
                         self.accounts[instance.get_type_name()] = instance
                 except ModuleNotFoundError as e:
                     LOGGER.error(f"Loading module failed: {e}")
 
-        for account in self.accounts.values():
-            await self.hass.async_add_executor_job(account.on_post_setup)
+        for key, account in self.accounts.items():
+            with self.startup_profiler.phase(f"account.{key}.post_setup"):
+                await self.hass.async_add_executor_job(account.on_post_setup)
     
     def get_domain_identifiers_of_device(self, device_id: str) -> list:
         return_list: list = []
@@ -132,7 +173,8 @@ class MultiManager:  # noqa: F811
     def update_device_cache(self):
         self.is_ready_for_messages = False
         for key, manager in self.accounts.items():
-            manager.update_device_cache()
+            with self.startup_profiler.phase(f"account.{key}.update_device_cache"):
+                manager.update_device_cache()
 
             #New devices have been created in their own device maps
             #let's convert them to XTDevice
@@ -140,21 +182,34 @@ class MultiManager:  # noqa: F811
                 for device_id in device_map:
                     device_map[device_id] = manager.convert_to_xt_device(device_map[device_id])
         
-        #Register all devices in the master device map
-        self._update_master_device_map()
-
-        #Now let's aggregate all of these devices into a single
-        #"All functionnality" device
-        self._merge_devices_from_multiple_sources()
-        for device in self.device_map.values():
-            CloudFixes.apply_fixes(device)
+        with self.startup_profiler.phase("update_device_cache.merge"):
+            #Register all devices in the master device map
+            self._update_master_device_map()
+
+            #Now let's aggregate all of these devices into a single
+            #"All functionnality" device
+            self._merge_devices_from_multiple_sources()
+            for device in self.device_map.values():
+                CloudFixes.apply_fixes(device)
+
+        #Fixes and merging mutate the shared local_strategy in place,
+        #make sure every device of every account rebuilds its index
+        for device_map in self.__get_available_device_maps():
+            for device in device_map.values():
+                if isinstance(device, XTDevice):
+                    device.invalidate_local_strategy_index()
         self._process_pending_messages()
 
+    async def async_revalidate_product_cache(self) -> None:
+        if await self.hass.async_add_executor_job(self.product_cache.revalidate):
+            LOGGER.info("Cached product specifications changed in the cloud, reloading")
+            self.hass.config_entries.async_schedule_reload(self.config_entry.entry_id)
+
     def _process_pending_messages(self):
         self.is_ready_for_messages = True
-        for messages in self.pending_messages:
-            self.on_message(messages[0], messages[1])
-        self.pending_messages.clear()
+        LOGGER.debug(f"Replaying pending messages: {self.pending_messages.get_diagnostics()}")
+        for source, msg in self.pending_messages.pop_all():
+            self.on_message(source, msg)
 
     def _update_master_device_map(self):
         for manager in self.accounts.values():
@@ -183,6 +238,11 @@ class MultiManager:  # noqa: F811
     def unload(self):
         for manager in self.accounts.values():
             manager.unload()
+
+    async def async_unload(self):
+        await self.command_coalescer.async_stop()
+        for manager in self.accounts.values():
+            await manager.async_unload()
     
     def refresh_mq(self):
         for manager in self.accounts.values():
@@ -199,6 +259,10 @@ class MultiManager:  # noqa: F811
     def _read_dpId_from_code(self, code: str, device: XTDevice) -> int | None:
         if not hasattr(device, "local_strategy"):
             return None
+        if isinstance(device, XTDevice):
+            return device.get_dpId_from_code(code)
+
+        #Devices that are not yet converted to XTDevice don't have an index
         for dpId in device.local_strategy:
             if device.local_strategy[dpId]["status_code"] == code:
                 return dpId
@@ -209,6 +273,8 @@ class MultiManager:  # noqa: F811
         return None
     
     def _read_code_from_dpId(self, dpId: int, device: XTDevice) -> str | None:
+        if isinstance(device, XTDevice):
+            return device.get_code_from_dpId(dpId)
         if dp_id_item := device.local_strategy.get(dpId, None):
             return dp_id_item["status_code"]
         return None
@@ -266,22 +332,42 @@ class MultiManager:  # noqa: F811
         return code, dpId, value, True
 
     def convert_device_report_status_list(self, device_id: str, status_in: list) -> list:
-        status = copy.deepcopy(status_in)
-        for item in status:
+        #Copy-on-write: the incoming items are never modified, a new item is
+        #only allocated when the normalized item differs from the incoming one
+        status: list = []
+        for item in status_in:
             code, dpId, value, result_ok = self._read_code_dpid_value_from_state(device_id, item)
             if result_ok:
-                item["code"] = code
-                item["dpId"] = dpId
-                item["value"] = value
+                if (
+                    item.get("code") != code
+                    or item.get("dpId") != dpId
+                    or "value" not in item
+                    or item["value"] is not value
+                ):
+                    item = dict(item)
+                    item["code"] = code
+                    item["dpId"] = dpId
+                    item["value"] = value
             else:
                 LOGGER.warning(f"convert_device_report_status_list code retrieval failed => {item} <=>{device_id}")
+            status.append(item)
+        return status
+
+    def process_device_report(self, device: XTDevice, source: str, status_in: list) -> list:
+        #Report pipeline: normalize -> source filter -> virtual states
+        #The normalization allocates the only list of the pipeline,
+        #the following stages work in place on it
+        status = self.convert_device_report_status_list(device.id, status_in)
+        self.multi_source_handler.filter_status_list(device.id, source, status)
+        self.virtual_state_handler.apply_virtual_states_to_status_list(device, status)
+        self.multi_device_listener.register_reported_status(device.id, status)
         return status
 
     def on_message(self, source: str, msg: str):
+        dev_id = self._get_device_id_from_message(msg)
         if not self.is_ready_for_messages:
-            self.pending_messages.append((source, msg))
+            self.pending_messages.append(source, dev_id, msg)
             return
-        dev_id = self._get_device_id_from_message(msg)
         if not dev_id:
             LOGGER.warning(f"dev_id {dev_id} not found!")
             return
@@ -336,27 +422,27 @@ class MultiManager:  # noqa: F811
         return return_list
 
     def send_commands(
+            self, device_id: str, commands: list[dict[str, Any]], coalesce: bool = False
+    ):
+        #Slider drags send a command per intermediate value, when the entity
+        #opts in with coalesce only the latest ones reach the cloud
+        self.command_coalescer.send_commands(device_id, commands, coalesce)
+
+    def _send_commands_now(
             self, device_id: str, commands: list[dict[str, Any]]
     ):
         virtual_function_commands: list[dict[str, Any]] = []
         regular_commands: list[dict[str, Any]] = []
         if device := self.device_map.get(device_id, None):
-            virtual_function_list = self.virtual_function_handler.get_category_virtual_functions(device.category)
+            code_virtual_functions = self.virtual_function_handler.get_category_code_virtual_functions(device.category)
             for command in commands:
                 command_code  = command["code"]
                 command_value = command["value"]
                 LOGGER.debug(f"Base command : {command}")
-                vf_found = False
-                for virtual_function in virtual_function_list:
-                    if (
-                        command_code == virtual_function.key or
-                        command_code in virtual_function.vf_reset_state
-                    ):
-                        command_dict = {"code": command_code, "value": command_value, "virtual_function": virtual_function}
-                        virtual_function_commands.append(command_dict)
-                        vf_found = True
-                        break
-                if not vf_found:
+                if virtual_function := code_virtual_functions.get(command_code):
+                    command_dict = {"code": command_code, "value": command_value, "virtual_function": virtual_function}
+                    virtual_function_commands.append(command_dict)
+                else:
                     regular_commands.append(command)
         
         if virtual_function_commands:
@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+from collections import Counter
+from datetime import datetime, timezone
+import re
+from threading import Lock
+import time
+from typing import Any
+
+from ...const import (
+    LOGGER,
+    API_CALL_LOW_PRIORITY_RATIO,
+    API_CALL_PROJECTION_MIN_WINDOW,
+    API_CALL_DIAGNOSTICS_TOP_DEVICES,
+)
+
+#Code of the error response of a deferred low priority call
+XT_ERROR_CODE_QUOTA_DEFERRED = "xt_quota_deferred"
+
+#Path segments holding an ID (device, ticket, token...) rather than a resource name
+ENDPOINT_ID_SEGMENT = re.compile(r"^(?=.*\d)[^.]{10,}$|^\d+$")
+
+#Path segments followed by the ID of the device the call is made for
+ENDPOINT_DEVICE_SEGMENTS = ("devices", "device", "thing")
+
+
+def get_error_response(code: str, msg: str, http_status: int | None = None) -> dict[str, Any]:
+    """Error response shaped like the ones of the cloud so callers only check "success"."""
+    response: dict[str, Any] = {
+        "success": False,
+        "code": code,
+        "msg": msg,
+        "t": int(time.time() * 1000),
+    }
+    if http_status is not None:
+        response["http_status"] = http_status
+    return response
+
+def get_endpoint_key(method: str, path: str) -> str:
+    segments = [
+        "{id}" if ENDPOINT_ID_SEGMENT.match(segment) else segment
+        for segment in path.split("?", 1)[0].split("/")
+    ]
+    return f"{method} {'/'.join(segments)}"
+
+def get_endpoint_device_id(path: str) -> str | None:
+    segments = path.split("?", 1)[0].split("/")
+    for previous, segment in zip(segments, segments[1:]):
+        if previous in ENDPOINT_DEVICE_SEGMENTS and ENDPOINT_ID_SEGMENT.match(segment):
+            return segment
+    return None
+
+def get_month_start(now: datetime) -> datetime:
+    return now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+def get_next_month_start(now: datetime) -> datetime:
+    month_start = get_month_start(now)
+    if month_start.month == 12:
+        return month_start.replace(year=month_start.year + 1, month=1)
+    return month_start.replace(month=month_start.month + 1)
+
+
+class XTAPICallAccounting:
+    """Counts the cloud API calls per endpoint and per device.
+
+    Tuya cloud projects have a monthly call quota. The calls of the current
+    month are projected to its end from the pace observed since the count
+    started (the integration start or the month start). Once a budget is set,
+    low priority calls (background revalidations) are deferred when the usage
+    reaches its low priority share or when the projection exceeds it, the
+    other calls are only counted.
+    """
+
+    def __init__(self, name: str, monthly_budget: int = 0) -> None:
+        self.name = name
+        self.monthly_budget = monthly_budget
+        self.lock = Lock()
+        self.warned_over_budget: bool = False
+        self._reset(datetime.now(timezone.utc))
+
+    def _reset(self, now: datetime) -> None:
+        self.tracking_start = now
+        self.period_end = get_next_month_start(now)
+        self.total: int = 0
+        self.by_endpoint: Counter[str] = Counter()
+        self.by_device: Counter[str] = Counter()
+        self.deferred: Counter[str] = Counter()
+
+    def _roll_period_if_needed(self, now: datetime) -> None:
+        if now >= self.period_end:
+            self._reset(get_month_start(now))
+            self.warned_over_budget = False
+
+    def record_call(self, method: str, path: str) -> None:
+        endpoint = get_endpoint_key(method, path)
+        device_id = get_endpoint_device_id(path)
+        now = datetime.now(timezone.utc)
+        with self.lock:
+            self._roll_period_if_needed(now)
+            self.total += 1
+            self.by_endpoint[endpoint] += 1
+            if device_id is not None:
+                self.by_device[device_id] += 1
+            if (
+                not self.warned_over_budget
+                and self.monthly_budget > 0
+                and self._get_projected_usage(now) > self.monthly_budget
+            ):
+                self.warned_over_budget = True
+                LOGGER.warning(
+                    f"{self.name}: projected API calls this month exceed the budget of {self.monthly_budget}, "
+                    "background refreshes are deferred"
+                )
+
+    def allow_low_priority_call(self, method: str, path: str) -> bool:
+        if self.monthly_budget <= 0:
+            return True
+        now = datetime.now(timezone.utc)
+        with self.lock:
+            self._roll_period_if_needed(now)
+            if (
+                self.total < self.monthly_budget * API_CALL_LOW_PRIORITY_RATIO
+                and self._get_projected_usage(now) <= self.monthly_budget * API_CALL_LOW_PRIORITY_RATIO
+            ):
+                return True
+            self.deferred[get_endpoint_key(method, path)] += 1
+            return False
+
+    def _get_projected_usage(self, now: datetime) -> int:
+        elapsed = (now - self.tracking_start).total_seconds()
+        #The startup burst alone would project far beyond any budget
+        if elapsed < API_CALL_PROJECTION_MIN_WINDOW:
+            return self.total
+        remaining = (self.period_end - now).total_seconds()
+        return int(self.total + self.total / elapsed * remaining)
+
+    def get_diagnostics(self) -> dict[str, Any]:
+        now = datetime.now(timezone.utc)
+        with self.lock:
+            self._roll_period_if_needed(now)
+            return {
+                "since": self.tracking_start.isoformat(),
+                "total": self.total,
+                "monthly_budget": self.monthly_budget,
+                "projected_month_usage": self._get_projected_usage(now),
+                "by_endpoint": dict(self.by_endpoint.most_common()),
+                "device_count": len(self.by_device),
+                "top_devices": dict(self.by_device.most_common(API_CALL_DIAGNOSTICS_TOP_DEVICES)),
+                "deferred": dict(self.deferred),
+            }
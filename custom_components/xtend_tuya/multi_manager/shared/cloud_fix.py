@@ -1,12 +1,13 @@
 from __future__ import annotations
 
-import json
-
 from .device import (
     XTDevice,
     XTDeviceFunction,
     XTDeviceStatusRange,
 )
+from .value_descriptor import (
+    XTValueDescriptor,
+)
 from ...const import (
     LOGGER,  # noqa: F401
 )
@@ -27,6 +28,8 @@ class CloudFixes:
         CloudFixes._fix_missing_range_values_using_local_strategy(device)
         CloudFixes._fix_missing_aliases_using_status_format(device)
         CloudFixes._remove_status_that_are_local_strategy_aliases(device)
+        if isinstance(device, XTDevice):
+            device.invalidate_local_strategy_index()
 
     def _unify_added_attributes(device: XTDevice):
         for dpId in device.local_strategy:
@@ -115,7 +118,7 @@ class CloudFixes:
             try:
                 if code in device.status_range:
                     dp_id = device.status_range[code].dp_id
-                    value_dict = json.loads(device.status_range[code].values)
+                    value_dict = XTValueDescriptor.view(device.status_range[code].values)
                     iter(value_dict)
                     correct_value = device.status_range[code].values
             except Exception:
@@ -124,7 +127,7 @@ class CloudFixes:
             try:
                 if code in device.function:
                     dp_id = device.function[code].dp_id
-                    value_dict = json.loads(device.function[code].values)
+                    value_dict = XTValueDescriptor.view(device.function[code].values)
                     iter(value_dict)
                     correct_value = device.function[code].values
             except Exception:
@@ -135,7 +138,7 @@ class CloudFixes:
                     if dp_item := device.local_strategy.get(dp_id):
                         if config_item := dp_item.get("config_item"):
                             if value_descr := config_item.get("valueDesc"):
-                                value_dict = json.loads(value_descr)
+                                value_dict = XTValueDescriptor.view(value_descr)
                                 iter(value_dict)
                                 correct_value = value_descr
                 except Exception:
@@ -183,30 +186,23 @@ class CloudFixes:
             ls_value = None
             dp_id = None
             if code in device.status_range:
-                sr_value = json.loads(device.status_range[code].values)
+                sr_value = XTValueDescriptor.view(device.status_range[code].values)
                 dp_id = device.status_range[code].dp_id
             if code in device.function:
-                fn_value = json.loads(device.function[code].values)
+                fn_value = XTValueDescriptor.view(device.function[code].values)
                 dp_id = device.function[code].dp_id
             if dp_id is not None:
                 if dp_item := device.local_strategy.get(dp_id):
                     if config_item := dp_item.get("config_item"):
                         if value_descr := config_item.get("valueDesc"):
-                            ls_value = json.loads(value_descr)
+                            ls_value = XTValueDescriptor.view(value_descr)
             fix_dict = CloudFixes.compute_aligned_valuedescr(ls_value, sr_value, fn_value)
-            for fix_code in fix_dict:
-                if sr_value:
-                    sr_value[fix_code] = fix_dict[fix_code]
-                if fn_value:
-                    fn_value[fix_code] = fix_dict[fix_code]
-                if ls_value:
-                    ls_value[fix_code] = fix_dict[fix_code]
             if sr_value:
-                device.status_range[code].values = json.dumps(sr_value)
+                device.status_range[code].values = XTValueDescriptor.updated(device.status_range[code].values, fix_dict)
             if fn_value:
-                device.function[code].values = json.dumps(fn_value)
+                device.function[code].values = XTValueDescriptor.updated(device.function[code].values, fix_dict)
             if ls_value:
-                config_item["valueDesc"] = json.dumps(ls_value)
+                config_item["valueDesc"] = XTValueDescriptor.updated(value_descr, fix_dict)
 
     
     def compute_aligned_valuedescr(value1: dict, value2: dict, value3: dict) -> dict:
@@ -253,7 +249,8 @@ class CloudFixes:
             return_dict["step"] = step_cur
         range_list: list = CloudFixes._get_field_of_valuedescr(value1, value2, value3, "range")
         if len(range_list) > 1:
-            range_ref:list = range_list[0]
+            #Copy as the descriptors are shared
+            range_ref:list = list(range_list[0])
             for range in range_list[1:]:
                 #Determine if the range should be merged or not
 
@@ -293,7 +290,7 @@ class CloudFixes:
     def _fix_incorrect_percentage_scale(device: XTDevice):
         supported_units: list = ["%"]
         for code in device.status_range:
-            value = json.loads(device.status_range[code].values)
+            value = XTValueDescriptor.view(device.status_range[code].values)
             if "unit" in value and "min" in value and "max" in value and "scale" in value:
                 unit = value["unit"]
                 min = value["min"]
@@ -304,10 +301,9 @@ class CloudFixes:
                     continue
                 if min not in (0, 1):
                     continue
-                value["scale"] = int(max / 100) - 1
-                device.status_range[code].values = json.dumps(value)
+                device.status_range[code].values = XTValueDescriptor.updated(device.status_range[code].values, {"scale": int(max / 100) - 1})
         for code in device.function:
-            value = json.loads(device.function[code].values)
+            value = XTValueDescriptor.view(device.function[code].values)
             if "unit" in value and "min" in value and "max" in value and "scale" in value:
                 unit = value["unit"]
                 min = value["min"]
@@ -318,12 +314,11 @@ class CloudFixes:
                     continue
                 if min not in (0, 1):
                     continue
-                value["scale"] = int(max / 100) - 1
-                device.function[code].values = json.dumps(value)
+                device.function[code].values = XTValueDescriptor.updated(device.function[code].values, {"scale": int(max / 100) - 1})
         for dpId in device.local_strategy:
             if config_item := device.local_strategy[dpId].get("config_item"):
                 if value_descr := config_item.get("valueDesc"):
-                    value = json.loads(value_descr)
+                    value = XTValueDescriptor.view(value_descr)
                     if "unit" in value and "min" in value and "max" in value and "scale" in value:
                         unit = value["unit"]
                         min = value["min"]
@@ -334,8 +329,7 @@ class CloudFixes:
                             continue
                         if min not in (0, 1):
                             continue
-                        value["scale"] = int(max / 100) - 1
-                        config_item["valueDesc"] = json.dumps(value)
+                        config_item["valueDesc"] = XTValueDescriptor.updated(value_descr, {"scale": int(max / 100) - 1})
 
     def determine_most_plausible(value1: dict, value2: dict, key: str, state_value: any = None) -> int | None:
         if key in value1 and key in value2:
@@ -383,10 +377,10 @@ class CloudFixes:
                 if config_item.get("valueType", None) != "Enum":
                     continue
                 if valueDesc := config_item.get("valueDesc", None):
-                    value_dict = json.loads(valueDesc)
+                    value_dict = XTValueDescriptor.view(valueDesc)
                     if valueDescr_range := value_dict.get("range", {}):
                         if status_range := device.status_range.get(status_code, None):
-                            if status_range_values := json.loads(status_range.values):
+                            if status_range_values := XTValueDescriptor.view(status_range.values):
                                 status_range_range_dict: list = status_range_values.get("range")
                                 new_range_list: list = []
                                 for new_range_value in valueDescr_range:
@@ -394,10 +388,9 @@ class CloudFixes:
                                 for new_range_value in status_range_range_dict:
                                     if new_range_value not in new_range_list:
                                         new_range_list.append(new_range_value)
-                                status_range_values["range"] = new_range_list
-                                status_range.values = json.dumps(status_range_values)
+                                status_range.values = XTValueDescriptor.updated(status_range.values, {"range": new_range_list})
                         if function := device.function.get(status_code, None):
-                            if function_values := json.loads(function.values):
+                            if function_values := XTValueDescriptor.view(function.values):
                                 function_range_dict: list = function_values.get("range")
                                 new_range_list: list = []
                                 for new_range_value in valueDescr_range:
@@ -405,8 +398,7 @@ class CloudFixes:
                                 for new_range_value in function_range_dict:
                                     if new_range_value not in new_range_list:
                                         new_range_list.append(new_range_value)
-                                function_values["range"] = new_range_list
-                                function.values = json.dumps(function_values)
+                                function.values = XTValueDescriptor.updated(function.values, {"range": new_range_list})
 
 
     def _fix_missing_aliases_using_status_format(device: XTDevice):
@@ -414,15 +406,16 @@ class CloudFixes:
             status_code = local_strategy.get("status_code", None)
             if config_item := local_strategy.get("config_item", None):
                 if status_formats := config_item.get("statusFormat", None):
-                    status_formats_dict: dict = json.loads(status_formats)
+                    status_formats_dict: dict = XTValueDescriptor.view(status_formats)
                     pop_list: list[str] = []
                     for status in status_formats_dict:
                         if status != status_code and status not in local_strategy["status_code_alias"]:
                             pop_list.append(status)
                             local_strategy["status_code_alias"].append(status)
-                    for status in pop_list:
-                        status_formats_dict.pop(status)
-                    config_item["statusFormat"] = json.dumps(status_formats_dict)
+                    if pop_list:
+                        config_item["statusFormat"] = XTValueDescriptor.dump(
+                            {status: value for status, value in status_formats_dict.items() if status not in pop_list}
+                        )
     
     def _remove_status_that_are_local_strategy_aliases(device: XTDevice):
         for local_strategy in device.local_strategy.values():
@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime
+from functools import partial
+from threading import Lock
+from typing import Any, Callable
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+
+from ...const import (
+    LOGGER,  # noqa: F401
+    DEVICE_COMMAND_COALESCING_WINDOW,
+)
+
+
+class XTDeviceCommandWindow:
+    def __init__(self) -> None:
+        #Latest command of each DP, in the order of their last update
+        self.pending: dict[str, dict[str, Any]] = {}
+        #Last value sent for each DP while the window is open
+        self.sent: dict[str, Any] = {}
+        #Held while sending, the commands of a device are sent one call at a time, in order
+        self.send_lock = Lock()
+        self.cancel_flush: Callable[[], None] | None = None
+
+
+class XTCommandCoalescer:
+    """Latest-wins coalescing of the commands sent while dragging a slider.
+
+    Only the calls of the entities that opt in (light brightness and colour
+    temperature, cover position, number sliders) are coalesced. The first one
+    of a device is sent right away and opens a window. During the window the
+    numeric values of the opted-in calls only keep the latest value of each DP
+    and are sent as a single call when the window ends, which opens a new one.
+    Their other commands (switch, work mode...) are dropped when they repeat
+    the last value sent during the window, otherwise they are sent right away
+    along with the pending values. Calls that didn't opt in are never delayed.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        send_commands: Callable[[str, list[dict[str, Any]]], None],
+        window: float = DEVICE_COMMAND_COALESCING_WINDOW,
+    ) -> None:
+        self.hass = hass
+        self.send_commands_func = send_commands
+        #Seconds, 0 disables the coalescing
+        self.window = window
+        self.devices: dict[str, XTDeviceCommandWindow] = {}
+        self.lock = Lock()
+        self.sent_calls: int = 0
+        self.coalesced_commands: int = 0
+
+    def send_commands(self, device_id: str, commands: list[dict[str, Any]], coalesce: bool = False) -> None:
+        if self.window <= 0:
+            self.send_commands_func(device_id, commands)
+            return
+        with self.lock:
+            device_window = self.devices.get(device_id)
+            if device_window is None and coalesce:
+                #Leading edge, nobody else can hold the lock of a new window
+                device_window = XTDeviceCommandWindow()
+                device_window.send_lock.acquire()
+                self.devices[device_id] = device_window
+                leading_edge = True
+            elif device_window is not None:
+                leading_edge = False
+                if coalesce:
+                    commands = self._drop_repeated_commands(device_window, commands)
+                    if all(XTCommandCoalescer._is_numeric(command) for command in commands):
+                        self._merge_commands(device_window.pending, commands)
+                        return
+        if device_window is None:
+            #No window is open for the device, nothing to keep the order with
+            self._send(device_id, None, commands)
+            return
+        if leading_edge:
+            try:
+                self._send(device_id, device_window, commands)
+            finally:
+                device_window.send_lock.release()
+                self._schedule_flush(device_id)
+            return
+        with device_window.send_lock:
+            with self.lock:
+                to_send = device_window.pending
+                device_window.pending = {}
+                #The counters of the coalescer are only updated under its lock
+                self._merge_commands(to_send, commands)
+            self._send(device_id, device_window, list(to_send.values()))
+
+    def _is_numeric(command: dict[str, Any]) -> bool:
+        value = command.get("value")
+        return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+    def _drop_repeated_commands(self, device_window: XTDeviceCommandWindow, commands: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        #A slider drag repeats the switch and mode of every step
+        kept: list[dict[str, Any]] = []
+        for command in commands:
+            if (
+                not XTCommandCoalescer._is_numeric(command)
+                and command["code"] in device_window.sent
+                and device_window.sent[command["code"]] == command["value"]
+            ):
+                self.coalesced_commands += 1
+                continue
+            kept.append(command)
+        return kept
+
+    def _merge_commands(self, pending: dict[str, dict[str, Any]], commands: list[dict[str, Any]]) -> None:
+        for command in commands:
+            if pending.pop(command["code"], None) is not None:
+                self.coalesced_commands += 1
+            pending[command["code"]] = command
+
+    def _send(self, device_id: str, device_window: XTDeviceCommandWindow | None, commands: list[dict[str, Any]]) -> None:
+        with self.lock:
+            self.sent_calls += 1
+            if device_window is not None:
+                for command in commands:
+                    device_window.sent[command["code"]] = command["value"]
+        self.send_commands_func(device_id, commands)
+
+    def _schedule_flush(self, device_id: str) -> None:
+        self.hass.loop.call_soon_threadsafe(self._async_schedule_flush, device_id)
+
+    @callback
+    def _async_schedule_flush(self, device_id: str) -> None:
+        if (device_window := self.devices.get(device_id)) is None:
+            return
+        device_window.cancel_flush = async_call_later(self.hass, self.window, partial(self._async_flush, device_id))
+
+    @callback
+    def _async_flush(self, device_id: str, _now: datetime) -> None:
+        with self.lock:
+            if (device_window := self.devices.get(device_id)) is None:
+                return
+            device_window.cancel_flush = None
+            if device_window.pending:
+                self.hass.async_add_executor_job(self._flush, device_id, device_window)
+            elif device_window.send_lock.locked():
+                #A command is being sent, the window stays open until it is done
+                self._async_schedule_flush(device_id)
+            else:
+                self.devices.pop(device_id)
+
+    def _flush(self, device_id: str, device_window: XTDeviceCommandWindow) -> None:
+        try:
+            self._send_pending(device_id, device_window)
+        finally:
+            self._schedule_flush(device_id)
+
+    def _send_pending(self, device_id: str, device_window: XTDeviceCommandWindow) -> None:
+        with device_window.send_lock:
+            with self.lock:
+                commands = list(device_window.pending.values())
+                device_window.pending = {}
+            if commands:
+                self._send(device_id, device_window, commands)
+
+    async def async_stop(self) -> None:
+        #The pending values are sent instead of being dropped
+        with self.lock:
+            device_windows = dict(self.devices)
+            self.devices.clear()
+            for device_window in device_windows.values():
+                if device_window.cancel_flush is not None:
+                    device_window.cancel_flush()
+                    device_window.cancel_flush = None
+        await asyncio.gather(*(
+            self.hass.async_add_executor_job(self._send_pending, device_id, device_window)
+            for device_id, device_window in device_windows.items()
+            if device_window.pending
+        ))
+
+    def get_diagnostics(self) -> dict[str, Any]:
+        with self.lock:
+            return {
+                "window": self.window,
+                "sent_calls": self.sent_calls,
+                "coalesced_commands": self.coalesced_commands,
+                "open_windows": len(self.devices),
+            }
@@ -5,6 +5,10 @@ from types import SimpleNamespace
 from dataclasses import dataclass, field
 import copy
 
+from ...const import (
+    LOGGER,  # noqa: F401
+)
+
 @dataclass
 class XTDeviceStatusRange:
     code: str
@@ -107,6 +111,9 @@ class XTDevice(SimpleNamespace):
         self.status = {}
         self.function = {}
         self.status_range = {}
+        self._code_to_dpId: dict[str, int] = {}
+        self._dpId_to_code: dict[int, str] = {}
+        self._local_strategy_index_key: tuple[int, int] | None = None
         super().__init__(**kwargs)
 
     def __eq__(self, other):
@@ -129,6 +136,47 @@ class XTDevice(SimpleNamespace):
         
         return f"Device {self.name}:\r\n{function_str}{status_range_str}{status_str}{local_strategy_str}"
 
+    def invalidate_local_strategy_index(self) -> None:
+        #Must be called whenever local_strategy is mutated in place
+        #(status_code or status_code_alias changed), adding or removing
+        #dpIds or replacing the dict is detected automatically
+        self._local_strategy_index_key = None
+
+    def _get_local_strategy_index_key(self) -> tuple[int, int]:
+        return (id(self.local_strategy), len(self.local_strategy))
+
+    def _build_local_strategy_index(self) -> None:
+        code_to_dpId: dict[str, int] = {}
+        dpId_to_code: dict[int, str] = {}
+        for dpId, dp_item in self.local_strategy.items():
+            code = dp_item.get("status_code")
+            dpId_to_code[dpId] = code
+
+            #Keep the first match to stay consistent with a sequential lookup
+            if code is not None and code not in code_to_dpId:
+                code_to_dpId[code] = dpId
+            if "status_code_alias" in dp_item:
+                for alias in dp_item["status_code_alias"]:
+                    if alias not in code_to_dpId:
+                        code_to_dpId[alias] = dpId
+            else:
+                LOGGER.warning(f"Device {self.name} ({self.id}) has no status_code_alias dict for dpId {dpId}, please contact the developer about this")
+        self._code_to_dpId = code_to_dpId
+        self._dpId_to_code = dpId_to_code
+        self._local_strategy_index_key = self._get_local_strategy_index_key()
+
+    def _ensure_local_strategy_index(self) -> None:
+        if self._local_strategy_index_key != self._get_local_strategy_index_key():
+            self._build_local_strategy_index()
+
+    def get_dpId_from_code(self, code: str) -> int | None:
+        self._ensure_local_strategy_index()
+        return self._code_to_dpId.get(code)
+
+    def get_code_from_dpId(self, dpId: int) -> str | None:
+        self._ensure_local_strategy_index()
+        return self._dpId_to_code.get(dpId)
+
     def from_compatible_device(device: Any):
         new_device = XTDevice(**(device.__dict__))
         
@@ -42,6 +42,9 @@ class XTDeviceManagerInterface(ABC):
 
     def unload(self):
         pass
+
+    async def async_unload(self):
+        pass
     
     @abstractmethod
     def on_message(self, msg: str):
@@ -106,10 +109,13 @@ class XTDeviceManagerInterface(ABC):
     def call_api(self, method: str, url: str, payload: str) -> str | None:
         pass
 
+    async def async_call_api(self, hass: HomeAssistant, method: str, url: str, payload: str) -> str | None:
+        return await hass.async_add_executor_job(self.call_api, method, url, payload)
+
     def trigger_scene(self, home_id: str, scene_id: str) -> False:
         return False
     
-    def get_webrtc_sdp_answer(self, device_id: str, session_id: str, sdp_offer: str) -> str | None:
+    async def async_get_webrtc_sdp_answer(self, hass: HomeAssistant, device_id: str, session_id: str, sdp_offer: str) -> str | None:
         return None
     
     def get_webrtc_ice_servers(self, device_id: str, session_id: str, format: str) -> str | None:
@@ -122,4 +128,10 @@ class XTDeviceManagerInterface(ABC):
         return None
     
     def send_webrtc_trickle_ice(self, device_id: str, session_id: str, candidate: str) -> str | None:
+        return None
+
+    def get_webrtc_diagnostics(self) -> dict[str, int] | None:
+        return None
+
+    def get_cloud_api_diagnostics(self) -> dict[str, Any] | None:
         return None
\ No newline at end of file
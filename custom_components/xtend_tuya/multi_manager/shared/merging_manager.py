@@ -1,6 +1,5 @@
 from __future__ import annotations
 
-import json
 import copy
 
 from .device import (
@@ -11,6 +10,9 @@ from .device import (
 from .cloud_fix import (
     CloudFixes,
 )
+from .value_descriptor import (
+    XTValueDescriptor,
+)
 
 from ...const import (
     LOGGER,  # noqa: F401
@@ -56,12 +58,14 @@ class XTMergingManager:
             device2.set_up = device1.set_up
         elif device2.set_up:
             device1.set_up = device2.set_up
+        device1.invalidate_local_strategy_index()
+        device2.invalidate_local_strategy_index()
 
     def _fix_incorrect_valuedescr(device1: XTDevice, device2: XTDevice):
         for code in device1.function:
             need_fixing = False
             try:
-                value_dict: dict = json.loads(device1.function[code].values)
+                value_dict: dict = XTValueDescriptor.view(device1.function[code].values)
                 if value_dict.get("ErrorValue1"):
                     need_fixing = True
                 iter(value_dict)
@@ -71,18 +75,18 @@ class XTMergingManager:
             if need_fixing:
                 if code in device2.function:
                     try:
-                        value_dict: dict = json.loads(device2.function[code].values)
+                        value_dict: dict = XTValueDescriptor.view(device2.function[code].values)
                         iter(value_dict)
                         device1.function[code].values = device2.function[code].values
                     except Exception:
                         LOGGER.debug("Fix unsuccessful, clearing values")
                         new_descriptor: dict = {"ErrorValue1": device1.function[code].values, "ErrorValue2": device2.function[code].values}
-                        device1.function[code].values = json.dumps(new_descriptor)
+                        device1.function[code].values = XTValueDescriptor.dump(new_descriptor)
                         device2.function[code].values = device1.function[code].values
         for code in device1.status_range:
             need_fixing = False
             try:
-                value_dict: dict = json.loads(device1.status_range[code].values)
+                value_dict: dict = XTValueDescriptor.view(device1.status_range[code].values)
                 if value_dict.get("ErrorValue1"):
                     need_fixing = True
                 iter(value_dict)
@@ -92,7 +96,7 @@ class XTMergingManager:
             if need_fixing:
                 if code in device2.status_range:
                     try:
-                        value_dict: dict = json.loads(device2.status_range[code].values)
+                        value_dict: dict = XTValueDescriptor.view(device2.status_range[code].values)
                         iter(value_dict)
                         device1.status_range[code].values = device2.status_range[code].values
                     except Exception:
@@ -102,7 +106,7 @@ class XTMergingManager:
             if config_item := device1.local_strategy[dpId].get("config_item"):
                 if value_descr := config_item.get("valueDesc"):
                     try:
-                        value_dict: dict = json.loads(value_descr)
+                        value_dict: dict = XTValueDescriptor.view(value_descr)
                         if value_dict.get("ErrorValue1"):
                             need_fixing = True
                         iter(value_dict)
@@ -116,37 +120,31 @@ class XTMergingManager:
                     if config_item2 := device1.local_strategy[dpId].get("config_item"):
                         if value_descr2 := config_item2.get("valueDesc"):
                             try:
-                                value_dict: dict = json.loads(value_descr)
+                                value_dict: dict = XTValueDescriptor.view(value_descr)
                                 iter(value_dict)
                                 config_item["valueDesc"] = config_item2["valueDesc"]
                                 LOGGER.debug("Fix was successful")
                             except Exception:
                                 LOGGER.debug("Fix unsuccessful, clearing values")
                                 new_descriptor: dict = {"ErrorValue1": value_descr, "ErrorValue2": value_descr2}
-                                config_item["valueDesc"] = json.dumps(new_descriptor)
+                                config_item["valueDesc"] = XTValueDescriptor.dump(new_descriptor)
                                 config_item2["valueDesc"] = config_item["valueDesc"]
 
     def _align_valuedescr(device1: XTDevice, device2: XTDevice):
         for code in device1.status_range:
             if code in device2.status_range and device1.status_range[code].values != device2.status_range[code].values:
-                value1 = json.loads(device1.status_range[code].values)
-                value2 = json.loads(device2.status_range[code].values)
+                value1 = XTValueDescriptor.view(device1.status_range[code].values)
+                value2 = XTValueDescriptor.view(device2.status_range[code].values)
                 computed_diff = CloudFixes.compute_aligned_valuedescr(value1, value2, None)
-                for fix_code in computed_diff:
-                    value1[fix_code] = computed_diff[fix_code]
-                    value2[fix_code] = computed_diff[fix_code]
-                device1.status_range[code].values = json.dumps(value1)
-                device2.status_range[code].values = json.dumps(value2)
+                device1.status_range[code].values = XTValueDescriptor.updated(device1.status_range[code].values, computed_diff)
+                device2.status_range[code].values = XTValueDescriptor.updated(device2.status_range[code].values, computed_diff)
         for code in device1.function:
             if code in device2.function and device1.function[code].values != device2.function[code].values:
-                value1 = json.loads(device1.function[code].values)
-                value2 = json.loads(device2.function[code].values)
+                value1 = XTValueDescriptor.view(device1.function[code].values)
+                value2 = XTValueDescriptor.view(device2.function[code].values)
                 computed_diff = CloudFixes.compute_aligned_valuedescr(value1, value2, None)
-                for fix_code in computed_diff:
-                    value1[fix_code] = computed_diff[fix_code]
-                    value2[fix_code] = computed_diff[fix_code]
-                device1.function[code].values = json.dumps(value1)
-                device2.function[code].values = json.dumps(value2)
+                device1.function[code].values = XTValueDescriptor.updated(device1.function[code].values, computed_diff)
+                device2.function[code].values = XTValueDescriptor.updated(device2.function[code].values, computed_diff)
         for dp_id in device1.local_strategy:
             if dp_id in device2.local_strategy:
                 config_item1 = device1.local_strategy[dp_id].get("config_item")
@@ -155,14 +153,11 @@ class XTMergingManager:
                     value_descr1 = config_item1.get("valueDesc")
                     value_descr2 = config_item2.get("valueDesc")
                     if value_descr1 is not None and value_descr2 is not None:
-                        value1 = json.loads(value_descr1)
-                        value2 = json.loads(value_descr2)
+                        value1 = XTValueDescriptor.view(value_descr1)
+                        value2 = XTValueDescriptor.view(value_descr2)
                         computed_diff = CloudFixes.compute_aligned_valuedescr(value1, value2, None)
-                        for fix_code in computed_diff:
-                            value1[fix_code] = computed_diff[fix_code]
-                            value2[fix_code] = computed_diff[fix_code]
-                        config_item1["valueDesc"] = json.dumps(value1)
-                        config_item2["valueDesc"] = json.dumps(value2)
+                        config_item1["valueDesc"] = XTValueDescriptor.updated(value_descr1, computed_diff)
+                        config_item2["valueDesc"] = XTValueDescriptor.updated(value_descr2, computed_diff)
 
     def _align_api_usage(device1: XTDevice, device2: XTDevice):
         for dpId in device1.local_strategy:
@@ -306,20 +301,17 @@ class XTMergingManager:
             return left.update(right)
         elif isinstance(left, str):
             #Strings could be strings or represent a json subtree
-            try:
-                left_json = json.loads(left)
-            except Exception:
-                left_json = None
-            try:
-                right_json = json.loads(right)
-            except Exception:
-                right_json = None
+            left_json = XTValueDescriptor.load_or_none(left)
+            right_json = XTValueDescriptor.load_or_none(right)
             if left_json is not None and right_json is not None:
-                return json.dumps(XTMergingManager.smart_merge(left_json, right_json, msg_queue, f"{path}.@JS@"))
+                if left == right:
+                    return left
+                #The merge modifies both sides in place, they are copies of the parsed descriptors
+                return XTValueDescriptor.dump(XTMergingManager.smart_merge(left_json, right_json, msg_queue, f"{path}.@JS@"))
             elif left_json is not None:
-                return json.dumps(left_json)
+                return left
             elif right_json is not None:
-                return json.dumps(right_json)
+                return right
             else:
                 if left != right and msg_queue is not None:
                     msg_queue.append(f"Merging {type(left)} that are different: |{left}| <=> |{right}|, using left ({path})")
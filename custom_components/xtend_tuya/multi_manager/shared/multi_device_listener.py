@@ -1,13 +1,21 @@
 from __future__ import annotations
 
+from datetime import datetime
+from functools import partial
+from threading import Lock
+from typing import Any
+
 from homeassistant.core import HomeAssistant, callback
-from homeassistant.helpers.dispatcher import dispatcher_send
+from homeassistant.helpers.dispatcher import async_dispatcher_send, dispatcher_send
+from homeassistant.helpers.event import async_call_later
 from homeassistant.helpers import device_registry as dr
 
 from ...const import (
     LOGGER,  # noqa: F401
     DOMAIN,
     DOMAIN_ORIG,
+    TUYA_HA_SIGNAL_UPDATE_ENTITY,
+    DEVICE_UPDATE_COALESCING_WINDOW,
 )
 
 from ..multi_manager import (
@@ -24,13 +32,81 @@ class MultiDeviceListener:
     def __init__(self, hass: HomeAssistant, multi_manager: MultiManager) -> None:
         self.multi_manager = multi_manager
         self.hass = hass
+        self.update_coalescing_window: float = DEVICE_UPDATE_COALESCING_WINDOW
+        #None means that the updated status codes are unknown
+        self.reported_status_codes: dict[str, set[str] | None] = {}
+        #Reports whose device update didn't come yet
+        self.reported_status_pending: dict[str, int] = {}
+        self.pending_updates: dict[str, set[str] | None] = {}
+        self.pending_signals: dict[str, list[str]] = {}
+        self.lock = Lock()
+
+    def register_reported_status(self, device_id: str, status: list[dict[str, Any]]):
+        #Called with the processed report right before the SDK updates the device
+        codes: set[str] | None = set()
+        for item in status:
+            if "code" not in item:
+                codes = None
+                break
+            codes.add(item["code"])
+        with self.lock:
+            self.reported_status_codes[device_id] = MultiDeviceListener._merge_status_codes(self.reported_status_codes.get(device_id, set()), codes)
+            self.reported_status_pending[device_id] = self.reported_status_pending.get(device_id, 0) + 1
+
+    def _pop_reported_status_codes(self, device_id: str) -> set[str] | None:
+        #When several accounts report the same device before their updates come,
+        #each of these updates carries the union of their codes
+        pending = self.reported_status_pending.pop(device_id, 0)
+        if pending > 1:
+            self.reported_status_pending[device_id] = pending - 1
+            return self.reported_status_codes.get(device_id)
+        return self.reported_status_codes.pop(device_id, None)
+
+    def _merge_status_codes(codes1: set[str] | None, codes2: set[str] | None) -> set[str] | None:
+        if codes1 is None or codes2 is None:
+            return None
+        return codes1 | codes2
 
     def update_device(self, device: XTDevice):
+        #The accounts apply their side effects (like copying the statuses to the
+        #Tuya integration devices) right away, only the dispatch is coalesced
         signal_list: list[str] = []
         for account in self.multi_manager.accounts.values():
             signal_list = append_lists(signal_list, account.on_update_device(device))
+        with self.lock:
+            updated_status_codes = self._pop_reported_status_codes(device.id)
+            if self.update_coalescing_window > 0:
+                if device.id in self.pending_updates:
+                    #An update is already scheduled, it will carry these codes and signals too
+                    self.pending_updates[device.id] = MultiDeviceListener._merge_status_codes(self.pending_updates[device.id], updated_status_codes)
+                    self.pending_signals[device.id] = append_lists(self.pending_signals[device.id], signal_list)
+                    return
+                self.pending_updates[device.id] = updated_status_codes
+                self.pending_signals[device.id] = signal_list
+        if self.update_coalescing_window > 0:
+            self.hass.loop.call_soon_threadsafe(self._async_schedule_device_update, device)
+            return
+        if TUYA_HA_SIGNAL_UPDATE_ENTITY in signal_list:
+            #Only our own entities know about the updated status codes
+            signal_list = [signal for signal in signal_list if signal != TUYA_HA_SIGNAL_UPDATE_ENTITY]
+            dispatcher_send(self.hass, f"{TUYA_HA_SIGNAL_UPDATE_ENTITY}_{device.id}", updated_status_codes)
         self.trigger_device_discovery(device, signal_list)
 
+    @callback
+    def _async_schedule_device_update(self, device: XTDevice) -> None:
+        async_call_later(self.hass, self.update_coalescing_window, partial(self._async_send_device_update, device))
+
+    @callback
+    def _async_send_device_update(self, device: XTDevice, _now: datetime) -> None:
+        with self.lock:
+            updated_status_codes = self.pending_updates.pop(device.id, None)
+            signal_list = self.pending_signals.pop(device.id, [])
+        for signal in signal_list:
+            if signal == TUYA_HA_SIGNAL_UPDATE_ENTITY:
+                async_dispatcher_send(self.hass, f"{signal}_{device.id}", updated_status_codes)
+            else:
+                async_dispatcher_send(self.hass, f"{signal}_{device.id}")
+
     def trigger_device_discovery(self, device: XTDevice, signal_list: list[str]):
         for signal in signal_list:
             dispatcher_send(self.hass, f"{signal}_{device.id}")
@@ -1,5 +1,4 @@
 from __future__ import annotations
-import copy
 
 from ..multi_manager import MultiManager
 from ...const import LOGGER  # noqa: F401
@@ -57,8 +56,8 @@ class MultiSourceHandler:
         if not device:
             return
         
-        virtual_states = self.multi_manager.virtual_state_handler.get_category_virtual_states(device.category)
-        if not virtual_states:
+        code_virtual_states = self.multi_manager.virtual_state_handler.get_category_code_virtual_states(device.category)
+        if not code_virtual_states:
             return
         
         for item in status_in:
@@ -66,36 +65,33 @@ class MultiSourceHandler:
             if not result_ok:
                 continue
 
-            for virtual_state in virtual_states:
-                if code == virtual_state.key:
-                    self._prepare_structure_for_code(dev_id, code)
-                    self.device_map[dev_id][code].register_source_message(source)
+            for virtual_state in code_virtual_states.get(code, ()):
+                self._prepare_structure_for_code(dev_id, code)
+                self.device_map[dev_id][code].register_source_message(source)
 
-    def filter_status_list(self, dev_id: str, original_source: str, status_in) -> str:
-        status_list = copy.deepcopy(status_in)
+    def filter_status_list(self, dev_id: str, original_source: str, status_list: list) -> list:
+        #Filters status_list in place and returns it
         device = self.multi_manager.device_map.get(dev_id, None)
         if not device:
             return status_list
         
         #Only filter for devices that have a VirtualState in their status_list
-        virtual_states = self.multi_manager.virtual_state_handler.get_category_virtual_states(device.category)
-        if not virtual_states:
+        code_virtual_states = self.multi_manager.virtual_state_handler.get_category_code_virtual_states(device.category)
+        if not code_virtual_states:
             return status_list
         
-        i = 0
+        kept = 0
         for item in status_list:
             code, dpId, value, result_ok = self.multi_manager._read_code_dpid_value_from_state(dev_id, item, False, True)
-            if not result_ok:
-                continue
-
-            for virtual_state in virtual_states:
-                if code == virtual_state.key:
-                    self._prepare_structure_for_code(dev_id, code)
-                    if not self._is_allowed_source_for_code(dev_id, code, original_source):
-                        status_list.pop(i)
-                        i -= 1
-                        break
-            i += 1
+            allowed = True
+            if result_ok and code in code_virtual_states:
+                self._prepare_structure_for_code(dev_id, code)
+                if not self._is_allowed_source_for_code(dev_id, code, original_source):
+                    allowed = False
+            if allowed:
+                status_list[kept] = item
+                kept += 1
+        del status_list[kept:]
         
         return status_list
     
@@ -21,6 +21,8 @@ class XTVirtualFunctionHandler:
     def __init__(self, multi_manager: MultiManager) -> None:
         self.descriptors_with_virtual_function = {}
         self.multi_manager = multi_manager
+        self.category_virtual_functions: dict[str, tuple[DescriptionVirtualFunction, ...]] = {}
+        self.category_code_virtual_functions: dict[str, dict[str, DescriptionVirtualFunction]] = {}
     
     def register_device_descriptors(self, name: str, descriptors):
         descriptors_with_vf = {}
@@ -42,18 +44,37 @@ class XTVirtualFunctionHandler:
 
         if len(descriptors_with_vf) > 0:
             self.descriptors_with_virtual_function[name] = descriptors_with_vf
+            self._compile_virtual_functions()
     
-    def get_category_virtual_functions(self,category: str) -> list[DescriptionVirtualFunction]:
-        to_return = []
+    def _compile_virtual_functions(self) -> None:
+        category_virtual_functions: dict[str, list[DescriptionVirtualFunction]] = {}
         for virtual_function in VirtualFunctions:
             for descriptor in self.descriptors_with_virtual_function.values():
-                if (descriptions := descriptor.get(category)):
+                for category, descriptions in descriptor.items():
                     for description in descriptions:
                         if description.virtual_function is not None and description.virtual_function & virtual_function.value:
                             # This virtual_state is applied to this key, let's return it
                             found_virtual_function = DescriptionVirtualFunction(description.key, virtual_function.name, virtual_function.value, description.vf_reset_state)
-                            to_return.append(found_virtual_function)
-        return to_return
+                            category_virtual_functions.setdefault(category, []).append(found_virtual_function)
+
+        category_code_virtual_functions: dict[str, dict[str, DescriptionVirtualFunction]] = {}
+        for category, virtual_functions in category_virtual_functions.items():
+            code_virtual_functions: dict[str, DescriptionVirtualFunction] = {}
+            for virtual_function in virtual_functions:
+                #A command matches a virtual function either by its key or
+                #by one of the states it resets, the first match wins
+                code_virtual_functions.setdefault(virtual_function.key, virtual_function)
+                for reset_state in virtual_function.vf_reset_state or []:
+                    code_virtual_functions.setdefault(reset_state, virtual_function)
+            category_code_virtual_functions[category] = code_virtual_functions
+        self.category_virtual_functions = {category: tuple(vf_list) for category, vf_list in category_virtual_functions.items()}
+        self.category_code_virtual_functions = category_code_virtual_functions
+
+    def get_category_virtual_functions(self,category: str) -> tuple[DescriptionVirtualFunction, ...]:
+        return self.category_virtual_functions.get(category, ())
+
+    def get_category_code_virtual_functions(self, category: str) -> dict[str, DescriptionVirtualFunction]:
+        return self.category_code_virtual_functions.get(category, {})
     
     def process_virtual_function(self, device_id: str, commands: list[dict[str, Any]]):
         device: XTDevice = self.multi_manager.device_map.get(device_id, None)
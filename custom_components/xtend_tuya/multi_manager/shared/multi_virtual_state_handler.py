@@ -21,6 +21,8 @@ class XTVirtualStateHandler:
     def __init__(self, multi_manager: MultiManager) -> None:
         self.descriptors_with_virtual_state = {}
         self.multi_manager = multi_manager
+        self.category_virtual_states: dict[str, tuple[DescriptionVirtualState, ...]] = {}
+        self.category_code_virtual_states: dict[str, dict[str, tuple[DescriptionVirtualState, ...]]] = {}
 
     def register_device_descriptors(self, name: str, descriptors):
         descriptors_with_vs = {}
@@ -41,20 +43,35 @@ class XTVirtualStateHandler:
                     descriptors_with_vs[category] = tuple(description_list_vs)
         if len(descriptors_with_vs) > 0:
             self.descriptors_with_virtual_state[name] = descriptors_with_vs
+            self._compile_virtual_states()
             for device in self.multi_manager.device_map.values():
                 self.apply_init_virtual_states(device)
 
-    def get_category_virtual_states(self,category: str) -> list[DescriptionVirtualState]:
-        to_return = []
+    def _compile_virtual_states(self) -> None:
+        category_virtual_states: dict[str, list[DescriptionVirtualState]] = {}
         for virtual_state in VirtualStates:
             for descriptor in self.descriptors_with_virtual_state.values():
-                if (descriptions := descriptor.get(category)):
+                for category, descriptions in descriptor.items():
                     for description in descriptions:
                         if description.virtual_state is not None and description.virtual_state & virtual_state.value:
                             # This virtual_state is applied to this key, let's return it
                             found_virtual_state = DescriptionVirtualState(description.key, virtual_state.name, virtual_state.value, description.vs_copy_to_state, description.vs_copy_delta_to_state)
-                            to_return.append(found_virtual_state)
-        return to_return
+                            category_virtual_states.setdefault(category, []).append(found_virtual_state)
+        
+        category_code_virtual_states: dict[str, dict[str, tuple[DescriptionVirtualState, ...]]] = {}
+        for category, virtual_states in category_virtual_states.items():
+            code_virtual_states: dict[str, list[DescriptionVirtualState]] = {}
+            for virtual_state in virtual_states:
+                code_virtual_states.setdefault(virtual_state.key, []).append(virtual_state)
+            category_code_virtual_states[category] = {code: tuple(code_list) for code, code_list in code_virtual_states.items()}
+        self.category_virtual_states = {category: tuple(vs_list) for category, vs_list in category_virtual_states.items()}
+        self.category_code_virtual_states = category_code_virtual_states
+
+    def get_category_virtual_states(self,category: str) -> tuple[DescriptionVirtualState, ...]:
+        return self.category_virtual_states.get(category, ())
+
+    def get_category_code_virtual_states(self, category: str) -> dict[str, tuple[DescriptionVirtualState, ...]]:
+        return self.category_code_virtual_states.get(category, {})
 
     def apply_init_virtual_states(self, device: XTDevice):
         #WARNING, this method might be called multiple times for the same device, make sure it doesn't
@@ -110,8 +127,9 @@ class XTVirtualStateHandler:
                                         new_local_strategy["status_code"] = new_code
                                         device.local_strategy[new_dp_id] = new_local_strategy
 
-    def apply_virtual_states_to_status_list(self, device: XTDevice, status_in: list) -> list:
-        status = copy.deepcopy(status_in)
+    def apply_virtual_states_to_status_list(self, device: XTDevice, status: list) -> list:
+        #Applies the virtual states in place on status and returns it,
+        #items are replaced rather than modified as they may be shared
         virtual_states = self.get_category_virtual_states(device.category)
         for virtual_state in virtual_states:
             if virtual_state.virtual_state_value == VirtualStates.STATE_COPY_TO_MULTIPLE_STATE_NAME:
@@ -124,7 +142,7 @@ class XTVirtualStateHandler:
                         for state_name in virtual_state.vs_copy_to_state:
                             code, dpId, new_key_value, result_ok = self.multi_manager._read_code_dpid_value_from_state(device.id, {"code": str(state_name), "value": new_key_value})
                             if result_ok:
-                                new_status = {"code": code, "value": copy.copy(new_key_value), "dpId": dpId}
+                                new_status = {"code": code, "value": new_key_value, "dpId": dpId}
                                 status.append(new_status)
                         for state_name in virtual_state.vs_copy_delta_to_state:
                             code, dpId, new_key_value, result_ok = self.multi_manager._read_code_dpid_value_from_state(device.id, {"code": str(state_name), "value": new_key_value})
@@ -132,7 +150,7 @@ class XTVirtualStateHandler:
                             if code in device.status:
                                 current_value = device.status[code]
                             if result_ok and current_value is not None:
-                                new_status = {"code": code, "value": copy.copy(new_key_value - cur_key_value), "dpId": dpId}
+                                new_status = {"code": code, "value": new_key_value - cur_key_value, "dpId": dpId}
                                 status.append(new_status)
             
             if virtual_state.virtual_state_value == VirtualStates.STATE_SUMMED_IN_REPORTING_PAYLOAD:
@@ -141,11 +159,11 @@ class XTVirtualStateHandler:
                 if device.status[virtual_state.key] is None:
                     device.status[virtual_state.key] = 0
                 if virtual_state.key in device.status:
-                    for item in status:
+                    for i, item in enumerate(status):
                         code, dpId, new_key_value, result_ok = self.multi_manager._read_code_dpid_value_from_state(device.id, item, False, True)
                         if result_ok and code == virtual_state.key:
-                            item["value"] += device.status[virtual_state.key]
-                            continue
+                            status[i] = dict(item)
+                            status[i]["value"] = item["value"] + device.status[virtual_state.key]
         return status
     
     def _get_empty_local_strategy_dp_id(self, device: XTDevice) -> int | None:
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+from itertools import count
+from threading import Lock
+from typing import Any
+
+from tuya_iot.device import (
+    PROTOCOL_DEVICE_REPORT,
+)
+
+from ...const import (
+    LOGGER,  # noqa: F401
+)
+
+PENDING_MESSAGES_MAX_PER_DEVICE = 32
+
+class XTPendingStatusReport:
+    def __init__(self, sequence: int, source: str, msg: dict[str, Any]) -> None:
+        self.sequence = sequence
+        self.source = source
+        self.msg = msg
+        self.status: dict[Any, dict[str, Any]] = {}
+
+    def get_status_key(item: dict[str, Any]) -> Any:
+        if "code" in item:
+            return item["code"]
+        if "dpId" in item:
+            return item["dpId"]
+        #Raw dpId reports ({"17": 4})
+        return tuple(sorted(key for key in item if key != "t"))
+
+    def add_status(self, msg: dict[str, Any]) -> int:
+        #Returns the number of coalesced status values
+        coalesced = 0
+        self.msg = msg
+        for item in msg["data"]["status"]:
+            key = XTPendingStatusReport.get_status_key(item)
+            if key in self.status:
+                coalesced += 1
+            self.status[key] = item
+        return coalesced
+
+    def get_message(self) -> dict[str, Any]:
+        msg = dict(self.msg)
+        msg["data"] = dict(self.msg["data"])
+        msg["data"]["status"] = list(self.status.values())
+        return msg
+
+class XTPendingMessageBuffer:
+    """Buffer of the messages received before the devices are ready.
+
+    Status reports of a device are coalesced by DP code (last value wins)
+    while the other messages are kept in order, each device keeps at most
+    max_per_device entries and drops its oldest ones past that.
+    """
+
+    def __init__(self, max_per_device: int = PENDING_MESSAGES_MAX_PER_DEVICE) -> None:
+        self.max_per_device = max_per_device
+        self.device_messages: dict[str | None, list[XTPendingStatusReport | tuple[int, str, dict[str, Any]]]] = {}
+        self.sequence = count()
+        self.dropped: int = 0
+        self.coalesced: int = 0
+        self.lock = Lock()
+
+    def __len__(self) -> int:
+        with self.lock:
+            return sum(len(entries) for entries in self.device_messages.values())
+
+    def append(self, source: str, dev_id: str | None, msg: dict[str, Any]) -> None:
+        with self.lock:
+            entries = self.device_messages.setdefault(dev_id, [])
+            if XTPendingMessageBuffer._is_status_report(msg):
+                #Only merge into the last entry to keep the order relative
+                #to the other messages of the device
+                if entries and isinstance(entries[-1], XTPendingStatusReport) and entries[-1].source == source:
+                    self.coalesced += entries[-1].add_status(msg)
+                    return
+                report = XTPendingStatusReport(next(self.sequence), source, msg)
+                report.add_status(msg)
+                entries.append(report)
+            else:
+                entries.append((next(self.sequence), source, msg))
+            if len(entries) > self.max_per_device:
+                del entries[0]
+                self.dropped += 1
+
+    def pop_all(self) -> list[tuple[str, dict[str, Any]]]:
+        #Returns the buffered messages in their arrival order
+        with self.lock:
+            device_messages = self.device_messages
+            self.device_messages = {}
+        ordered: list[tuple[int, str, dict[str, Any]]] = []
+        for entries in device_messages.values():
+            for entry in entries:
+                if isinstance(entry, XTPendingStatusReport):
+                    ordered.append((entry.sequence, entry.source, entry.get_message()))
+                else:
+                    ordered.append(entry)
+        ordered.sort(key=lambda entry: entry[0])
+        return [(source, msg) for _, source, msg in ordered]
+
+    def get_diagnostics(self) -> dict[str, int]:
+        return {
+            "pending": len(self),
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+        }
+
+    def _is_status_report(msg: dict[str, Any]) -> bool:
+        return (
+            msg.get("protocol", 0) == PROTOCOL_DEVICE_REPORT
+            and isinstance(msg.get("data", {}).get("status"), list)
+        )
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+from datetime import datetime
+from threading import Lock
+from typing import Any, Callable
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from ...const import (
+    DOMAIN,
+    LOGGER,  # noqa: F401
+)
+
+PRODUCT_CACHE_STORAGE_VERSION = 1
+PRODUCT_CACHE_SAVE_DELAY = 30
+
+class XTProductCache:
+    """Persistent cache of the per-product cloud specifications.
+
+    Thing models and strategies are identical for every device of a product,
+    they are stored by kind and product_id so that a restart doesn't have to
+    download them again. Entries served from the cache are revalidated in the
+    background once the integration is up.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        self.hass = hass
+        self.store: Store = Store(hass, PRODUCT_CACHE_STORAGE_VERSION, f"{DOMAIN}.product_cache.{entry_id}")
+        self.products: dict[str, dict[str, dict[str, Any]]] = {}
+        self.revalidators: dict[str, Callable[[str], Any | None]] = {}
+        self.served_from_cache: dict[tuple[str, str], str] = {}
+        self.lock = Lock()
+
+    async def async_load(self) -> None:
+        if data := await self.store.async_load():
+            self.products = data.get("products", {})
+
+    async def async_remove(self) -> None:
+        await self.store.async_remove()
+
+    def register_revalidator(self, kind: str, fetcher: Callable[[str], Any | None]) -> None:
+        #fetcher is called in an executor with a device_id of the product
+        #and must return the fresh value or None if it can't be fetched
+        self.revalidators[kind] = fetcher
+
+    def get(self, kind: str, product_id: str, device_id: str) -> Any | None:
+        if not product_id:
+            return None
+        with self.lock:
+            if entry := self.products.get(kind, {}).get(product_id):
+                self.served_from_cache[(kind, product_id)] = device_id
+                return entry["value"]
+        return None
+
+    def set(self, kind: str, product_id: str, value: Any) -> None:
+        if not product_id or value is None:
+            return
+        with self.lock:
+            self.products.setdefault(kind, {})[product_id] = {
+                "value": value,
+                "fetched_at": datetime.now().isoformat(),
+            }
+        self.hass.add_job(self._async_schedule_save)
+
+    def _async_schedule_save(self) -> None:
+        self.store.async_delay_save(self._data_to_save, PRODUCT_CACHE_SAVE_DELAY)
+
+    def _data_to_save(self) -> dict[str, Any]:
+        #Serialized in an executor while set() may still run, entries are
+        #replaced and never modified so copying the mappings is enough
+        with self.lock:
+            return {"products": {kind: dict(entries) for kind, entries in self.products.items()}}
+
+    def revalidate(self) -> bool:
+        #Refetch every product that was served from the cache,
+        #returns True if at least one of them changed in the cloud
+        with self.lock:
+            to_revalidate = dict(self.served_from_cache)
+            self.served_from_cache.clear()
+        changed = False
+        for (kind, product_id), device_id in to_revalidate.items():
+            if (fetcher := self.revalidators.get(kind)) is None:
+                continue
+            try:
+                value = fetcher(device_id)
+            except Exception as e:
+                LOGGER.debug(f"Revalidation of {kind} for product {product_id} failed: {e}")
+                continue
+            if value is None:
+                continue
+            with self.lock:
+                cached = self.products.get(kind, {}).get(product_id, {}).get("value")
+            if value != cached:
+                LOGGER.debug(f"Cached {kind} of product {product_id} is outdated")
+                changed = True
+            self.set(kind, product_id, value)
+        return changed
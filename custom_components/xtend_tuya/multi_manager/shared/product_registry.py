@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+from threading import Lock
+from typing import Any, Callable
+
+from ...const import (
+    LOGGER,  # noqa: F401
+)
+
+class XTProductSpecRegistry:
+    """In-memory registry of the parsed per-product specifications.
+
+    Devices of the same product share one parsed specification, the first
+    device of a product builds it while the other ones wait for the result
+    instead of downloading and parsing it again.
+    """
+
+    def __init__(self) -> None:
+        self.specs: dict[tuple[str, str], Any] = {}
+        self.product_locks: dict[tuple[str, str], Lock] = {}
+        self.lock = Lock()
+
+    def get_or_build(self, kind: str, product_id: str | None, builder: Callable[[], Any | None]) -> Any | None:
+        if not product_id:
+            return builder()
+        key = (kind, product_id)
+        with self.lock:
+            if key in self.specs:
+                return self.specs[key]
+            product_lock = self.product_locks.setdefault(key, Lock())
+        with product_lock:
+            with self.lock:
+                if key in self.specs:
+                    return self.specs[key]
+            spec = builder()
+            if spec is not None:
+                with self.lock:
+                    self.specs[key] = spec
+            return spec
+
+    def clear(self) -> None:
+        with self.lock:
+            self.specs.clear()
+            self.product_locks.clear()
+
+    def instantiate_local_strategy(template: dict[int, dict[str, Any]]) -> dict[int, dict[str, Any]]:
+        #The local strategy of a device is modified in place by the merging and
+        #the cloud fixes, give each device its own containers while sharing the
+        #parsed values (strings and enum mappings) of the product
+        local_strategy: dict[int, dict[str, Any]] = {}
+        for dpId, strategy in template.items():
+            device_strategy = dict(strategy)
+            if config_item := strategy.get("config_item"):
+                device_strategy["config_item"] = dict(config_item)
+            device_strategy["status_code_alias"] = list(strategy.get("status_code_alias", []))
+            local_strategy[dpId] = device_strategy
+        return local_strategy
@@ -84,6 +84,7 @@ class ServiceManager:
     def __init__(self, multi_manager: MultiManager) -> None:
         self.multi_manager = multi_manager
         self.hass = multi_manager.hass
+        self.views: dict[str, XTGeneralView] = {}
         
     def register_services(self):
         self._register_service(
@@ -137,7 +138,12 @@ class ServiceManager:
             domain, name, callback, schema=schema
         )
         if allow_from_api:
-            self.hass.http.register_view(XTGeneralView(name, callback, requires_auth, use_cache))
+            view = XTGeneralView(name, callback, requires_auth, use_cache)
+            self.views[name] = view
+            self.hass.http.register_view(view)
+
+    def get_view_cache_diagnostics(self) -> dict[str, dict[str, int]]:
+        return {name: view.cache.get_diagnostics() for name, view in self.views.items()}
     
     def _get_correct_multi_manager(self, source: str, device_id: str) -> MultiManager | None:
         multi_manager_list = get_all_multi_managers(self.hass)
@@ -166,7 +172,7 @@ class ServiceManager:
         payload = event.data.get(CONF_PAYLOAD, None)
         if account := self.multi_manager.get_account_by_name(source):
             try:
-                if response := await self.hass.async_add_executor_job(account.call_api, method, url, payload):
+                if response := await account.async_call_api(self.hass, method, url, payload):
                     LOGGER.warning(f"API call response: {response}")
                     return response
             except Exception as e:
@@ -215,7 +221,7 @@ class ServiceManager:
                 match event.content_type:
                     case "application/sdp":
                         if account := multi_manager.get_account_by_name(source):
-                            sdp_answer = await self.hass.async_add_executor_job(account.get_webrtc_sdp_answer, device_id, session_id, event.payload)
+                            sdp_answer = await account.async_get_webrtc_sdp_answer(self.hass, device_id, session_id, event.payload)
                             if sdp_answer is not None:
                                 response = web.Response(status=201, text=sdp_answer, content_type="application/sdp", charset="utf-8")
                                 response.headers["ETag"] = session_id
@@ -1,6 +1,8 @@
 from __future__ import annotations
 
-from datetime import datetime, timedelta
+from collections import OrderedDict
+import time
+from typing import Any
 
 from multidict import (
     MultiMapping,
@@ -18,32 +20,70 @@ from ....const import (
     DOMAIN,
 )
 
+VIEW_CACHE_MAX_ENTRIES = 256
+
 class XTEventDataResultCache:
     def __init__(self, event_data, result, ttl: int = 60) -> None:
         self.event_data = event_data
         self.result = result
-        self.valid_until = datetime.now() + timedelta(0, ttl)
+        self.valid_until = time.monotonic() + ttl
 
 class XTRequestCacheResult:
-    def __init__(self, service_name: str) -> None:
+    """TTL cache of the results of a view, keyed by XTEventData.get_cache_key().
+
+    Least recently used entries are evicted past max_size.
+    """
+
+    def __init__(self, service_name: str, max_size: int = VIEW_CACHE_MAX_ENTRIES) -> None:
         self.service_name = service_name
-        self.cached_result: list[XTEventDataResultCache] = []
+        self.max_size = max_size
+        self.cached_result: OrderedDict[tuple, XTEventDataResultCache] = OrderedDict()
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+        self.expirations: int = 0
     
     def _clean_cache(self):
-        current_time = datetime.now()
-        for cache_entry in self.cached_result:
+        current_time = time.monotonic()
+        for key, cache_entry in list(self.cached_result.items()):
             if cache_entry.valid_until < current_time:
-                self.cached_result.remove(cache_entry)
-
-    def find_in_cache(self, event_data) -> any | None:
-        self._clean_cache()
-        for cache_entry in self.cached_result:
-            if cache_entry.event_data == event_data:
-                return cache_entry.result
-        return None
+                del self.cached_result[key]
+                self.expirations += 1
+
+    def find_in_cache(self, event_data: XTEventData) -> any | None:
+        key = event_data.get_cache_key()
+        cache_entry = self.cached_result.get(key)
+        if cache_entry is not None and cache_entry.valid_until < time.monotonic():
+            del self.cached_result[key]
+            self.expirations += 1
+            cache_entry = None
+        if cache_entry is None:
+            self.misses += 1
+            return None
+        self.cached_result.move_to_end(key)
+        self.hits += 1
+        return cache_entry.result
     
-    def append_to_cache(self, event_data, result, ttl: int = 60) -> None:
-        self.cached_result.append(XTEventDataResultCache(event_data, result, ttl))
+    def append_to_cache(self, event_data: XTEventData, result, ttl: int = 60) -> None:
+        key = event_data.get_cache_key()
+        self.cached_result[key] = XTEventDataResultCache(event_data, result, ttl)
+        self.cached_result.move_to_end(key)
+        if len(self.cached_result) > self.max_size:
+            #Drop the expired entries first, then the least recently used ones
+            self._clean_cache()
+            while len(self.cached_result) > self.max_size:
+                self.cached_result.popitem(last=False)
+                self.evictions += 1
+
+    def get_diagnostics(self) -> dict[str, int]:
+        return {
+            "entries": len(self.cached_result),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
 
 class XTEventData:
     @property
@@ -66,6 +106,24 @@ class XTEventData:
     def __eq__(self, other: XTEventData) -> bool:
         return self.query_params == other.query_params and self.method == other.method and self.payload == other.payload
 
+    def __hash__(self) -> int:
+        return hash(self.get_cache_key())
+
+    def get_cache_key(self) -> tuple[str | None, tuple[tuple[str, Any], ...], str | None]:
+        #Canonical form of what __eq__ compares
+        return (
+            self.method,
+            tuple(sorted((key, XTEventData._get_hashable(value)) for key, value in self.query_params.items())),
+            self.payload,
+        )
+
+    def _get_hashable(value: Any) -> Any:
+        if isinstance(value, dict):
+            return tuple(sorted((key, XTEventData._get_hashable(item)) for key, item in value.items()))
+        if isinstance(value, (list, tuple)):
+            return tuple(XTEventData._get_hashable(item) for item in value)
+        return value
+
     def __repr__(self) -> str:
         return f"Method: {self.method} <=> Headers: {self.headers} <=> Content-Type: {self.content_type} <=> Query parameters: {self.query_params} <=> Payload: {self.payload}"
 
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import logging
+from contextlib import contextmanager
+from threading import Lock
+from time import perf_counter, process_time
+from typing import Any, Iterator
+
+from ...const import (
+    LOGGER,
+)
+
+class XTStartupProfiler:
+    """Opt-in timing of the config entry setup.
+
+    Enabled when the debug logs of the integration are enabled, it records the
+    wall and CPU time of each setup phase, account plugin and platform (the
+    platforms are forwarded one by one while profiling). The CPU time is the
+    one of the whole process, phases running concurrently (the platforms) see
+    each other's CPU time.
+    """
+
+    def __init__(self, enabled: bool | None = None) -> None:
+        if enabled is None:
+            enabled = LOGGER.isEnabledFor(logging.DEBUG)
+        self.enabled = enabled
+        self.phases: list[dict[str, Any]] = []
+        self.total: dict[str, Any] | None = None
+        self.started_wall = perf_counter()
+        self.started_cpu = process_time()
+        self.lock = Lock()
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        #Later refreshes reuse the same code paths, only the startup is recorded
+        if not self.enabled or self.total is not None:
+            yield
+            return
+        started_wall = perf_counter()
+        started_cpu = process_time()
+        try:
+            yield
+        finally:
+            self._record(name, started_wall, started_cpu)
+
+    def finish(self) -> None:
+        if not self.enabled or self.total is not None:
+            return
+        self.total = XTStartupProfiler._get_timing("total", self.started_wall, self.started_cpu)
+        LOGGER.debug(f"Startup profile: {self.get_diagnostics()}")
+
+    def get_diagnostics(self) -> dict[str, Any]:
+        with self.lock:
+            phases = list(self.phases)
+        return {
+            "enabled": self.enabled,
+            "total": self.total,
+            "phases": phases,
+        }
+
+    def _record(self, name: str, started_wall: float, started_cpu: float) -> None:
+        timing = XTStartupProfiler._get_timing(name, started_wall, started_cpu)
+        with self.lock:
+            self.phases.append(timing)
+
+    def _get_timing(name: str, started_wall: float, started_cpu: float) -> dict[str, Any]:
+        return {
+            "name": name,
+            "wall_ms": round((perf_counter() - started_wall) * 1000, 3),
+            "cpu_ms": round((process_time() - started_cpu) * 1000, 3),
+        }
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+import json
+from threading import Lock
+from typing import Any
+
+from ...const import (
+    LOGGER,  # noqa: F401
+)
+
+VALUE_DESCRIPTOR_CACHE_MAX_ENTRIES = 4096
+
+class XTValueDescriptor:
+    """Shared parsing of the JSON value descriptors.
+
+    The values of the status ranges and functions and the valueDesc of the
+    local strategies stay JSON strings (that's what Tuya and the entities
+    expect) but each distinct string is only parsed once. The most recently
+    used ones are kept. load gives callers their own copy that they may
+    modify, the read only callers use view which returns the shared object.
+    """
+
+    parsed: OrderedDict[str, Any] = OrderedDict()
+    lock = Lock()
+    _INVALID = object()
+
+    def load(values: str) -> Any:
+        #Raises the same way json.loads does for invalid descriptors
+        return XTValueDescriptor._copy(XTValueDescriptor._get(values))
+
+    def view(values: str) -> Any:
+        #The shared parsed object without copy nor recency update, it must not
+        #be modified. The lookup doesn't need the lock, a single dict access is atomic
+        parsed = XTValueDescriptor.parsed.get(values) if isinstance(values, str) else None
+        if parsed is None or parsed is XTValueDescriptor._INVALID:
+            return XTValueDescriptor._get(values)
+        return parsed
+
+    def load_or_none(values: str) -> Any | None:
+        try:
+            return XTValueDescriptor.load(values)
+        except Exception:
+            return None
+
+    def dump(value: Any) -> str:
+        #A copy of the dumped value becomes the parsed object of its string
+        values = json.dumps(value)
+        XTValueDescriptor._store(values, XTValueDescriptor._copy(value))
+        return values
+
+    def updated(values: str, changes: dict[str, Any]) -> str:
+        #Returns values with changes applied, the same string if nothing changed
+        value: dict = XTValueDescriptor._get(values)
+        if all(key in value and value[key] == changes[key] for key in changes):
+            return values
+        return XTValueDescriptor.dump({**value, **changes})
+
+    def _get(values: str) -> Any:
+        #Returns the cached object, it must not leave this class uncopied
+        if not isinstance(values, str):
+            return json.loads(values)
+        with XTValueDescriptor.lock:
+            parsed = XTValueDescriptor.parsed.get(values)
+            if parsed is not None:
+                XTValueDescriptor.parsed.move_to_end(values)
+        if parsed is None:
+            try:
+                parsed = json.loads(values)
+            except ValueError:
+                parsed = XTValueDescriptor._INVALID
+            XTValueDescriptor._store(values, parsed)
+        if parsed is XTValueDescriptor._INVALID:
+            raise ValueError(f"Invalid value descriptor: {values}")
+        return parsed
+
+    def _store(values: str, parsed: Any) -> None:
+        with XTValueDescriptor.lock:
+            XTValueDescriptor.parsed[values] = parsed
+            XTValueDescriptor.parsed.move_to_end(values)
+            while len(XTValueDescriptor.parsed) > VALUE_DESCRIPTOR_CACHE_MAX_ENTRIES:
+                XTValueDescriptor.parsed.popitem(last=False)
+
+    def _copy(value: Any) -> Any:
+        #Descriptors only hold JSON types, much cheaper than a deepcopy
+        if isinstance(value, dict):
+            return {key: XTValueDescriptor._copy(item) for key, item in value.items()}
+        if isinstance(value, list):
+            return [XTValueDescriptor._copy(item) for item in value]
+        return value
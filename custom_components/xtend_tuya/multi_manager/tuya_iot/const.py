@@ -8,4 +8,38 @@ CONF_ACCESS_SECRET = "access_secret"
 CONF_USERNAME = "username"
 CONF_PASSWORD = "password"
 CONF_COUNTRY_CODE = "country_code"
-CONF_APP_TYPE = "tuya_app_type"
\ No newline at end of file
+CONF_APP_TYPE = "tuya_app_type"
+CONF_API_CALL_MONTHLY_BUDGET = "api_call_monthly_budget"
+
+#Startup fetching of the device models through the OpenAPI
+OPEN_API_FETCH_CONCURRENCY = 8
+
+#Cloud API requests
+OPEN_API_CONNECT_TIMEOUT = 5        #Seconds
+OPEN_API_READ_TIMEOUT = 10          #Seconds
+OPEN_API_MAX_RETRIES = 3            #Only the idempotent GET requests are retried
+OPEN_API_RETRY_BASE_DELAY = 0.5     #Seconds, doubled on each retry and fully jittered
+OPEN_API_RETRY_MAX_DELAY = 8        #Seconds
+OPEN_API_RETRY_BUDGET = 10          #Retries that can be spent in a row while the cloud keeps failing
+OPEN_API_RETRY_BUDGET_REFILL = 0.1  #Retry earned back by each successful request
+OPEN_API_CIRCUIT_FAILURE_THRESHOLD = 5  #Consecutive failures opening the circuit of an endpoint
+OPEN_API_CIRCUIT_OPEN_DURATION = 30     #Seconds before a trial request is let through
+#Tuya answers these with HTTP 200 and success false, they are retried like a 429
+OPEN_API_RETRYABLE_ERROR_CODES = (
+    500,        #System error
+    40000309,   #Request frequency limit exceeded
+)
+
+#Product cache kind of the OpenAPI thing models
+PRODUCT_CACHE_KIND_IOT_MODEL = "iot_thing_model"
+#WebRTC negotiations
+WEBRTC_SESSION_TTL = 600    #Seconds
+WEBRTC_MAX_SESSIONS = 256
+WEBRTC_SESSION_MAX_CANDIDATES = 64
+WEBRTC_CONFIG_DEFAULT_TTL = 300     #Seconds, when the ICE servers don't give their lifetime
+WEBRTC_CONFIG_EXPIRY_MARGIN = 60    #Seconds
+
+#IPC MQTT publishing
+IPC_PUBLISH_TIMEOUT = 10    #Seconds, for all the messages of a publish call
+IPC_PUBLISH_LATENCY_SAMPLES = 256
+IPC_PUBLISH_MAX_TRACKED_ACKS = 1024
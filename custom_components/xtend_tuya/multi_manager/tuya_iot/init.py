@@ -7,6 +7,7 @@ from typing import Optional, Literal, Any, overload
 from homeassistant.const import Platform
 from homeassistant.core import HomeAssistant
 from homeassistant.exceptions import ConfigEntryNotReady
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
 
 from tuya_iot import (
     AuthType,
@@ -15,6 +16,9 @@ from tuya_iot import (
 from .xt_tuya_iot_openapi import (
     XTIOTOpenAPI,
 )
+from .xt_tuya_iot_openapi_async import (
+    XTIOTOpenAPIAsync,
+)
 
 from .xt_tuya_iot_manager import (
     XTIOTDeviceManager,
@@ -28,6 +32,9 @@ from ..shared.shared_classes import (
 from ..shared.device import (
     XTDevice,
 )
+from ..shared.api_call_accounting import (
+    XTAPICallAccounting,
+)
 
 from .const import (
     CONF_ACCESS_ID,
@@ -38,6 +45,7 @@ from .const import (
     CONF_PASSWORD,
     CONF_COUNTRY_CODE,
     CONF_APP_TYPE,
+    CONF_API_CALL_MONTHLY_BUDGET,
 )
 from .util import (
     prepare_value_for_property_update,
@@ -61,6 +69,7 @@ from ...const import (
     LOGGER,
     TUYA_DISCOVERY_NEW,
     TUYA_HA_SIGNAL_UPDATE_ENTITY,
+    API_CALL_DEFAULT_MONTHLY_BUDGET,
 )
 
 def get_plugin_instance() -> XTTuyaIOTDeviceManagerInterface | None:
@@ -102,6 +111,10 @@ class XTTuyaIOTDeviceManagerInterface(XTDeviceManagerInterface):
             access_id=config_entry.options[CONF_ACCESS_ID],
             access_secret=config_entry.options[CONF_ACCESS_SECRET],
             auth_type=auth_type,
+            call_accounting=XTAPICallAccounting(
+                "Tuya IoT",
+                config_entry.options.get(CONF_API_CALL_MONTHLY_BUDGET, API_CALL_DEFAULT_MONTHLY_BUDGET),
+            ),
         )
         api.set_dev_channel("hass")
         try:
@@ -124,7 +137,8 @@ class XTTuyaIOTDeviceManagerInterface(XTDeviceManagerInterface):
             raise ConfigEntryNotReady(response)
         mq = XTIOTOpenMQ(api)
         mq.start()
-        device_manager = XTIOTDeviceManager(self.multi_manager, api, mq)
+        async_api = XTIOTOpenAPIAsync(api, async_get_clientsession(hass), loop=hass.loop)
+        device_manager = XTIOTDeviceManager(self.multi_manager, api, mq, async_api)
         device_ids: list[str] = list()
         home_manager = XTIOTHomeManager(api, mq, device_manager, self.multi_manager)
         device_manager.add_device_listener(self.multi_manager.multi_device_listener)
@@ -132,7 +146,8 @@ class XTTuyaIOTDeviceManagerInterface(XTDeviceManagerInterface):
             device_manager=device_manager,
             mq=mq,
             device_ids=device_ids,
-            home_manager=home_manager)
+            home_manager=home_manager,
+            async_api=async_api)
 
     def update_device_cache(self):
         self.iot_account.home_manager.update_device_cache()
@@ -150,7 +165,12 @@ class XTTuyaIOTDeviceManagerInterface(XTDeviceManagerInterface):
         self.iot_account.device_manager.remove_device_listener(self.multi_manager.multi_device_listener)
     
     def unload(self):
-        pass
+        self.iot_account.device_manager.api.stop_token_refresh()
+        self.iot_account.async_api.shutdown()
+
+    async def async_unload(self):
+        self.iot_account.device_manager.api.stop_token_refresh()
+        self.iot_account.async_api.shutdown()
     
     def on_message(self, msg: str):
         self.iot_account.device_manager.on_message(msg)
@@ -257,9 +277,20 @@ class XTTuyaIOTDeviceManagerInterface(XTDeviceManagerInterface):
             case "POST":
                 return self.iot_account.device_manager.api.post(url, params)
         return None
+
+    async def async_call_api(self, hass: HomeAssistant, method: str, url: str, payload: str) -> str | None:
+        params: dict[str, any] = None
+        if payload:
+            params = json.loads(payload)
+        match method:
+            case "GET":
+                return await self.iot_account.async_api.get(url, params)
+            case "POST":
+                return await self.iot_account.async_api.post(url, params)
+        return None
     
-    def get_webrtc_sdp_answer(self, device_id: str, session_id: str, sdp_offer: str) -> str | None:
-        return self.iot_account.device_manager.ipc_manager.webrtc_manager.get_sdp_answer(device_id, session_id, sdp_offer)
+    async def async_get_webrtc_sdp_answer(self, hass: HomeAssistant, device_id: str, session_id: str, sdp_offer: str) -> str | None:
+        return await self.iot_account.device_manager.ipc_manager.webrtc_manager.async_get_sdp_answer(hass, device_id, session_id, sdp_offer)
     
     def get_webrtc_ice_servers(self, device_id: str, session_id: str, format: str) -> str | None:
         return self.iot_account.device_manager.ipc_manager.webrtc_manager.get_ice_servers(device_id, session_id, format)
@@ -274,4 +305,14 @@ class XTTuyaIOTDeviceManagerInterface(XTDeviceManagerInterface):
         return self.iot_account.device_manager.ipc_manager.webrtc_manager.delete_webrtc_session(device_id, session_id)
     
     def send_webrtc_trickle_ice(self, device_id: str, session_id: str, candidate: str) -> str | None:
-        return self.iot_account.device_manager.ipc_manager.webrtc_manager.send_webrtc_trickle_ice(device_id, session_id, candidate)
\ No newline at end of file
+        return self.iot_account.device_manager.ipc_manager.webrtc_manager.send_webrtc_trickle_ice(device_id, session_id, candidate)
+
+    def get_webrtc_diagnostics(self) -> dict[str, int] | None:
+        return self.iot_account.device_manager.ipc_manager.webrtc_manager.get_diagnostics()
+
+    def get_cloud_api_diagnostics(self) -> dict[str, Any] | None:
+        api = self.iot_account.device_manager.api
+        return {
+            "requests": api.request_guard.get_diagnostics(),
+            "calls": api.call_accounting.get_diagnostics(),
+        }
\ No newline at end of file
@@ -1,15 +1,73 @@
 from __future__ import annotations
 
-from datetime import datetime, timedelta
+import asyncio
+import heapq
+from threading import Lock
 import time
 import json
 
+from homeassistant.core import HomeAssistant
+
 from .....const import (
     LOGGER,  # noqa: F401
 )
 from ..xt_tuya_iot_ipc_manager import (
     XTIOTIPCManager,
 )
+from ...const import (
+    WEBRTC_SESSION_TTL,
+    WEBRTC_MAX_SESSIONS,
+    WEBRTC_SESSION_MAX_CANDIDATES,
+    WEBRTC_CONFIG_DEFAULT_TTL,
+    WEBRTC_CONFIG_EXPIRY_MARGIN,
+)
+
+ENDLINE = "\r\n"
+
+class XTIOTWebRTCConfig:
+    """WebRTC configuration of a device, with its ICE servers formatted once.
+
+    The configuration holds the auth token and TURN credentials, it is reused
+    by the sessions of the device until the shortest ICE server ttl elapses.
+    """
+
+    def __init__(self, config: dict[str, any]) -> None:
+        p2p_config: dict = config.get("p2p_config", {})
+        ice_list = p2p_config.get("ices") or []
+        if isinstance(ice_list, str):
+            ice_list = json.loads(ice_list)
+        #Format ICE Servers so that they can be used by GO2RTC
+        if ice_list:
+            p2p_config["ices"] = json.dumps(ice_list).replace(': ', ':').replace(', ', ',')
+        self.config = config
+        self.go2rtc_ices: str | None = p2p_config.get("ices", None)
+        self.simple_whep_ices: str = XTIOTWebRTCConfig._get_simple_whep_ices(ice_list)
+        self.valid_until = time.monotonic() + XTIOTWebRTCConfig._get_ttl(ice_list)
+
+    def is_valid(self) -> bool:
+        return time.monotonic() < self.valid_until
+
+    def _get_ttl(ice_list: list[dict]) -> float:
+        ttls = [ice["ttl"] for ice in ice_list if isinstance(ice.get("ttl"), (int, float))]
+        if not ttls:
+            return WEBRTC_CONFIG_DEFAULT_TTL
+        return max(0, min(ttls) - WEBRTC_CONFIG_EXPIRY_MARGIN)
+
+    def _get_simple_whep_ices(ice_list: list[dict]) -> str:
+        temp_str: str = ""
+        for ice in ice_list:
+            password: str = ice.get("credential", None)
+            username: str = ice.get("username", None)
+            url: str = ice.get("urls", None)
+            if url is None:
+                continue
+            if username is not None and password is not None:
+                #TURN server
+                temp_str += " -T " + url.replace("turn:", "turn://").replace("turns:", "turns://").replace("://", f"://{username}:{password}@") + "?transport=tcp"
+            else:
+                #STUN server
+                temp_str += " -S " + url.replace("stun:", "stun://")
+        return temp_str.strip()
 
 class XTIOTWebRTCSession:
     webrtc_config: dict[str, any]
@@ -20,15 +78,20 @@ class XTIOTWebRTCSession:
     answer_candidates: list[dict]
     has_all_candidates: bool
 
-    def __init__(self, ttl: int = 600) -> None:
+    def __init__(self, ttl: int = WEBRTC_SESSION_TTL) -> None:
         self.webrtc_config = {}
+        self.device_config: XTIOTWebRTCConfig | None = None
         self.original_offer = None
         self.offer = None
         self.answer = {}
         self.final_answer = None
         self.answer_candidates = []
-        self.valid_until = datetime.now() + timedelta(0, ttl)
+        self.valid_until = time.monotonic() + ttl
         self.has_all_candidates = False
+        #Set in the event loop once has_all_candidates is True
+        self.all_candidates_event: asyncio.Event | None = None
+        #Waited on by a negotiation, the session must not be evicted then
+        self.negotiating: bool = False
     
     def __repr__(self) -> str:
         answer = ""
@@ -45,214 +108,356 @@ class XTIOTWebRTCSession:
             "\r\nEND DEBUG INFO"
             )
 
+class XTIOTWebRTCSessionStore:
+    """WebRTC sessions by session_id, shared by the event loop and the IPC MQTT thread.
+
+    Sessions expire through a min-heap of their deadlines, so lookups don't
+    scan the other sessions. Past max_sessions, the sessions closest to their
+    expiration are dropped first, except the ones being negotiated.
+    """
+
+    def __init__(self, max_sessions: int = WEBRTC_MAX_SESSIONS, max_candidates: int = WEBRTC_SESSION_MAX_CANDIDATES) -> None:
+        self.max_sessions = max_sessions
+        self.max_candidates = max_candidates
+        self.sessions: dict[str, XTIOTWebRTCSession] = {}
+        self.expirations: list[tuple[float, str]] = []
+        self.created: int = 0
+        self.expired: int = 0
+        self.evicted: int = 0
+        self.dropped_candidates: int = 0
+        self.lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self.sessions)
+
+    def get(self, session_id: str) -> XTIOTWebRTCSession | None:
+        with self.lock:
+            self._expire_sessions()
+            return self.sessions.get(session_id)
+
+    def get_or_create(self, session_id: str, negotiating: bool = False) -> XTIOTWebRTCSession:
+        with self.lock:
+            self._expire_sessions()
+            if (session := self.sessions.get(session_id)) is None:
+                session = XTIOTWebRTCSession()
+                self.sessions[session_id] = session
+                heapq.heappush(self.expirations, (session.valid_until, session_id))
+                self.created += 1
+            if negotiating:
+                session.negotiating = True
+            self._evict_sessions()
+            return session
+
+    def end_negotiation(self, session: XTIOTWebRTCSession) -> None:
+        with self.lock:
+            session.negotiating = False
+
+    def add_candidate(self, session: XTIOTWebRTCSession, candidate: dict) -> None:
+        with self.lock:
+            if len(session.answer_candidates) >= self.max_candidates:
+                self.dropped_candidates += 1
+                return
+            session.answer_candidates.append(candidate)
+
+    def get_diagnostics(self) -> dict[str, int]:
+        with self.lock:
+            return {
+                "active": len(self.sessions),
+                "created": self.created,
+                "expired": self.expired,
+                "evicted": self.evicted,
+                "dropped_candidates": self.dropped_candidates,
+            }
+
+    def _expire_sessions(self) -> None:
+        current_time = time.monotonic()
+        while self.expirations and self.expirations[0][0] < current_time:
+            if self._pop_first_expiration():
+                self.expired += 1
+
+    def _evict_sessions(self) -> None:
+        #A negotiation waits on the event of its session, a new session created
+        #by the answer would have none and the negotiation would never be woken up
+        kept: list[tuple[float, str]] = []
+        while len(self.sessions) > self.max_sessions and self.expirations:
+            valid_until, session_id = heapq.heappop(self.expirations)
+            session = self.sessions.get(session_id)
+            if session is None or session.valid_until != valid_until:
+                continue
+            if session.negotiating:
+                kept.append((valid_until, session_id))
+                continue
+            del self.sessions[session_id]
+            self.evicted += 1
+        for expiration in kept:
+            heapq.heappush(self.expirations, expiration)
+
+    def _pop_first_expiration(self) -> bool:
+        #Heap entries of replaced sessions are stale, they are just discarded
+        valid_until, session_id = heapq.heappop(self.expirations)
+        session = self.sessions.get(session_id)
+        if session is None or session.valid_until != valid_until:
+            return False
+        del self.sessions[session_id]
+        return True
+
 class XTIOTWebRTCManager:
     def __init__(self, ipc_manager: XTIOTIPCManager) -> None:
-        self.sdp_exchange: dict[str, XTIOTWebRTCSession] = {}
+        self.sdp_exchange = XTIOTWebRTCSessionStore()
         self.ipc_manager = ipc_manager
+        self.negotiating: int = 0
+        self.answered: int = 0
+        self.timed_out: int = 0
+        self.offers_not_published: int = 0
+        self.device_configs: dict[str, XTIOTWebRTCConfig] = {}
+        self.device_configs_lock = Lock()
+        self.device_config_fetch_locks: dict[str, Lock] = {}
+        self.config_hits: int = 0
+        self.config_fetches: int = 0
     
     def get_webrtc_session(self, session_id: str) -> XTIOTWebRTCSession | None:
-        self._clean_cache()
-        if result := self.sdp_exchange.get(session_id):
-            return result
-        return None
-    
-    def _clean_cache(self) -> None:
-        current_time = datetime.now()
-        to_clean = []
-        for session_id in self.sdp_exchange:
-            if self.sdp_exchange[session_id].valid_until < current_time:
-                to_clean.append(session_id)
-        for session_id in to_clean:
-            self.sdp_exchange.pop(session_id)
+        return self.sdp_exchange.get(session_id)
+
+    def get_diagnostics(self) -> dict[str, int]:
+        return {
+            **self.sdp_exchange.get_diagnostics(),
+            "negotiating": self.negotiating,
+            "answered": self.answered,
+            "timed_out": self.timed_out,
+            "offers_not_published": self.offers_not_published,
+            "config_hits": self.config_hits,
+            "config_fetches": self.config_fetches,
+            "ipc_publish": self.ipc_manager.get_publish_diagnostics(),
+        }
     
     def set_sdp_answer(self, session_id: str, answer: str) -> None:
-        self._create_session_if_necessary(session_id)
-        self.sdp_exchange[session_id].answer = answer
+        self._create_session_if_necessary(session_id).answer = answer
     
     def add_sdp_answer_candidate(self, session_id: str, candidate: dict) -> None:
-        self._create_session_if_necessary(session_id)
-        self.sdp_exchange[session_id].answer_candidates.append(candidate)
+        session = self._create_session_if_necessary(session_id)
+        self.sdp_exchange.add_candidate(session, candidate)
         candidate_str = candidate.get("candidate", None)
-        LOGGER.warning(f"Adding SDP answer candidate {candidate_str}")
+        LOGGER.debug(f"Adding SDP answer candidate {candidate_str}")
         if candidate_str == '':
-            self.sdp_exchange[session_id].has_all_candidates = True
+            session.has_all_candidates = True
+            if session.all_candidates_event is not None:
+                #Called from the IPC MQTT thread
+                self.ipc_manager.multi_manager.hass.loop.call_soon_threadsafe(session.all_candidates_event.set)
 
-    def set_config(self, session_id: str, config: dict[str, any]):
-        self._create_session_if_necessary(session_id)
-
-        #Format ICE Servers so that they can be used by GO2RTC
-        p2p_config: dict = config.get("p2p_config", {})
-        if ices := p2p_config.get("ices"):
-            p2p_config["ices"] = json.dumps(ices).replace(': ', ':').replace(', ', ',')
-        self.sdp_exchange[session_id].webrtc_config = config
+    def set_config(self, session_id: str, device_config: XTIOTWebRTCConfig):
+        session = self._create_session_if_necessary(session_id)
+        session.device_config = device_config
+        session.webrtc_config = device_config.config
 
     def set_sdp_offer(self, session_id: str, offer: str) -> None:
-        self._create_session_if_necessary(session_id)
-        self.sdp_exchange[session_id].offer = offer
+        self._create_session_if_necessary(session_id).offer = offer
     
     def set_original_sdp_offer(self, session_id: str, offer: str) -> None:
-        self._create_session_if_necessary(session_id)
-        self.sdp_exchange[session_id].original_offer = offer
+        self._create_session_if_necessary(session_id).original_offer = offer
 
-    def _create_session_if_necessary(self, session_id: str) -> None:
-        self._clean_cache()
-        if session_id not in self.sdp_exchange:
-            self.sdp_exchange[session_id] = XTIOTWebRTCSession()
+    def _create_session_if_necessary(self, session_id: str) -> XTIOTWebRTCSession:
+        return self.sdp_exchange.get_or_create(session_id)
     
     def get_config(self, device_id: str, session_id: str) -> dict | None:
         if current_exchange := self.get_webrtc_session(session_id):
             if current_exchange.webrtc_config:
                 return current_exchange.webrtc_config
         
-        webrtc_config = self.ipc_manager.api.get(f"/v1.0/devices/{device_id}/webrtc-configs")
-        if webrtc_config.get("success"):
-            result = webrtc_config.get("result")
-            self.set_config(session_id, result)
-            return result
+        if device_config := self._get_device_config(device_id):
+            self.set_config(session_id, device_config)
+            return device_config.config
+        return None
+
+    def _get_device_config(self, device_id: str) -> XTIOTWebRTCConfig | None:
+        if device_config := self._get_cached_device_config(device_id):
+            return device_config
+        with self.device_configs_lock:
+            fetch_lock = self.device_config_fetch_locks.setdefault(device_id, Lock())
+        #Sessions of the same device opened together share a single fetch
+        with fetch_lock:
+            if device_config := self._get_cached_device_config(device_id):
+                return device_config
+            with self.device_configs_lock:
+                self.config_fetches += 1
+            config_path = f"/v1.0/devices/{device_id}/webrtc-configs"
+            if self.ipc_manager.async_api is not None:
+                webrtc_config = self.ipc_manager.async_api.get_threadsafe(config_path)
+            else:
+                webrtc_config = self.ipc_manager.api.get(config_path)
+            if webrtc_config and webrtc_config.get("success"):
+                device_config = XTIOTWebRTCConfig(webrtc_config.get("result"))
+                with self.device_configs_lock:
+                    self.device_configs[device_id] = device_config
+                return device_config
+        return None
+
+    def _get_cached_device_config(self, device_id: str) -> XTIOTWebRTCConfig | None:
+        with self.device_configs_lock:
+            device_config = self.device_configs.get(device_id)
+            if device_config is not None and device_config.is_valid():
+                self.config_hits += 1
+                return device_config
         return None
+
+    def invalidate_config(self, device_id: str) -> None:
+        with self.device_configs_lock:
+            self.device_configs.pop(device_id, None)
     
     def get_ice_servers(self, device_id: str, session_id: str, format: str) -> None:
-        if config := self.get_config(device_id, session_id):
-            p2p_config: dict = config.get("p2p_config", {})
-            ice_str = p2p_config.get("ices", None)
+        if self.get_config(device_id, session_id):
+            if (session := self.get_webrtc_session(session_id)) is None or session.device_config is None:
+                return None
             match format:
                 case "GO2RTC":
-                    return ice_str
+                    return session.device_config.go2rtc_ices
                 case "SimpleWHEP":
-                    temp_str: str = ""
-                    ice_list = json.loads(ice_str)
-                    for ice in ice_list:
-                        password: str = ice.get("credential", None)
-                        username: str = ice.get("username", None)
-                        url: str = ice.get("urls", None)
-                        if url is None:
-                            continue
-                        if username is not None and password is not None:
-                            #TURN server
-                            temp_str += " -T " + url.replace("turn:", "turn://").replace("turns:", "turns://").replace("://", f"://{username}:{password}@") + "?transport=tcp"
-                            pass
-                        else:
-                            #STUN server
-                            temp_str += " -S " + url.replace("stun:", "stun://")
-                            pass
-                    return temp_str.strip()
-
-    def get_sdp_answer(self, device_id: str, session_id: str, sdp_offer: str, wait_for_answers: int = 5) -> str | None:
-        sleep_step = 0.01
-        sleep_count: int = int(wait_for_answers / sleep_step)
-        ENDLINE = "\r\n"
+                    return session.device_config.simple_whep_ices
+
+    async def async_get_sdp_answer(self, hass: HomeAssistant, device_id: str, session_id: str, sdp_offer: str, wait_for_answers: int = 5) -> str | None:
+        #Negotiations of different sessions run concurrently in the event loop
+        self.negotiating += 1
+        session = self.sdp_exchange.get_or_create(session_id, negotiating=True)
+        try:
+            return await self._async_negotiate_sdp_answer(hass, device_id, session_id, sdp_offer, wait_for_answers)
+        finally:
+            self.sdp_exchange.end_negotiation(session)
+            self.negotiating -= 1
+
+    async def _async_negotiate_sdp_answer(self, hass: HomeAssistant, device_id: str, session_id: str, sdp_offer: str, wait_for_answers: int) -> str | None:
+        session = self._create_session_if_necessary(session_id)
+        if session.all_candidates_event is None:
+            session.all_candidates_event = asyncio.Event()
         self.set_original_sdp_offer(session_id, sdp_offer)
-        if webrtc_config := self.get_config(device_id, session_id):
+        if webrtc_config := await hass.async_add_executor_job(self.get_config, device_id, session_id):
             auth_token = webrtc_config.get("auth")
             moto_id =  webrtc_config.get("moto_id")
-            topic: str = None
-            offer_candidates = []
-            candidate_found = True
-            while candidate_found:
-                offset = sdp_offer.find("a=candidate:")
-                if offset == -1:
-                    candidate_found = False
-                    break
-                end_offset = sdp_offer.find(ENDLINE, offset) + len(ENDLINE)
-                if end_offset <= offset:
-                    break
-                candidate_str = sdp_offer[offset:end_offset]
-                if candidate_str not in offer_candidates:
-                    offer_candidates.append(candidate_str)
-                sdp_offer = sdp_offer.replace(candidate_str, "")
-            sdp_offer = sdp_offer.replace("a=end-of-candidates" + ENDLINE, "")
+            sdp_offer, offer_candidates = XTIOTWebRTCManager._split_sdp_offer_candidates(sdp_offer)
             self.set_sdp_offer(session_id, sdp_offer)
+            deadline = hass.loop.time() + wait_for_answers
             for topic in self.ipc_manager.ipc_mq.mq_config.sink_topic.values():
                 topic = topic.replace("{device_id}", device_id)
                 topic = topic.replace("moto_id", moto_id)
-                payload = {
-                    "protocol":302,
-                    "pv":"2.2",
-                    "t":int(time.time()),
-                    "data":{
-                        "header":{
-                            "type":"offer",
-                            "from":f"{self.ipc_manager.get_from()}",
-                            "to":f"{device_id}",
-                            "sub_dev_id":"",
-                            "sessionid":f"{session_id}",
-                            "moto_id":f"{moto_id}",
-                            "tid":""
-                        },
-                        "msg":{
-                            "mode":"webrtc",
-                            "sdp":f"{sdp_offer}",
-                            "stream_type":1,
-                            "auth":f"{auth_token}",
-                        }
-                    },
-                }
-                self.ipc_manager.publish_to_ipc_mqtt(topic, json.dumps(payload))
+                if not await hass.async_add_executor_job(
+                    self._publish_sdp_offer, topic, device_id, session_id, moto_id, auth_token, sdp_offer, offer_candidates
+                ):
+                    #No answer can come, and the configuration isn't the reason
+                    self.offers_not_published += 1
+                    continue
+                if await self._async_wait_for_all_candidates(session, deadline - hass.loop.time()):
+                    self.answered += 1
+                else:
+                    self.timed_out += 1
+                    #The cached configuration may be the reason, fetch it again next time
+                    self.invalidate_config(device_id)
                 if offer_candidates:
-                    for candidate in offer_candidates:
-                        payload = {
-                            "protocol":302,
-                            "pv":"2.2",
-                            "t":int(time.time()),
-                            "data":{
-                                "header":{
-                                    "type":"candidate",
-                                    "from":f"{self.ipc_manager.get_from()}",
-                                    "to":f"{device_id}",
-                                    "sub_dev_id":"",
-                                    "sessionid":f"{session_id}",
-                                    "moto_id":f"{moto_id}",
-                                    "tid":""
-                                },
-                                "msg":{
-                                    "mode":"webrtc",
-                                    "candidate": candidate
-                                }
-                            },
-                        }
-                        self.ipc_manager.publish_to_ipc_mqtt(topic, json.dumps(payload))
-                for _ in range(sleep_count):
-                    if session := self.get_webrtc_session(session_id):
-                        if session.has_all_candidates:
-                            break
-                    time.sleep(sleep_step) #Wait for MQTT responses
-                if offer_candidates:
-                    payload = {
-                        "protocol":302,
-                        "pv":"2.2",
-                        "t":int(time.time()),
-                        "data":{
-                            "header":{
-                                "type":"candidate",
-                                "from":f"{self.ipc_manager.get_from()}",
-                                "to":f"{device_id}",
-                                "sub_dev_id":"",
-                                "sessionid":f"{session_id}",
-                                "moto_id":f"{moto_id}",
-                                "tid":""
-                            },
-                            "msg":{
-                                "mode":"webrtc",
-                                "candidate": ""
-                            }
-                        },
-                    }
-                    self.ipc_manager.publish_to_ipc_mqtt(topic, json.dumps(payload))
-                if session := self.get_webrtc_session(session_id):
-                    #Format SDP answer and send it back
-                    sdp_answer: str = session.answer.get("sdp", "")
-                    candidates: str = ""
-                    if session.answer_candidates:
-                        for candidate in session.answer_candidates:
-                            candidates += candidate.get("candidate", "")
-                        sdp_answer += candidates + "a=end-of-candidates" + ENDLINE
-                    session.final_answer = f"{sdp_answer}"
-                    return sdp_answer
+                    await hass.async_add_executor_job(
+                        self._publish_sdp_candidate, topic, device_id, session_id, moto_id, ""
+                    )
+                if current_session := self.get_webrtc_session(session_id):
+                    return XTIOTWebRTCManager._format_sdp_answer(current_session)
             
             if not auth_token or not moto_id:
                 return None
             
         return None
+
+    async def _async_wait_for_all_candidates(self, session: XTIOTWebRTCSession, timeout: float) -> bool:
+        #Woken up by add_sdp_answer_candidate when the end of candidates arrives
+        if session.has_all_candidates:
+            return True
+        if timeout <= 0:
+            return False
+        try:
+            async with asyncio.timeout(timeout):
+                await session.all_candidates_event.wait()
+        except TimeoutError:
+            LOGGER.debug("Timed out waiting for the SDP answer candidates")
+            return False
+        return True
+
+    def _split_sdp_offer_candidates(sdp_offer: str) -> tuple[str, list[str]]:
+        offer_candidates = []
+        candidate_found = True
+        while candidate_found:
+            offset = sdp_offer.find("a=candidate:")
+            if offset == -1:
+                candidate_found = False
+                break
+            end_offset = sdp_offer.find(ENDLINE, offset) + len(ENDLINE)
+            if end_offset <= offset:
+                break
+            candidate_str = sdp_offer[offset:end_offset]
+            if candidate_str not in offer_candidates:
+                offer_candidates.append(candidate_str)
+            sdp_offer = sdp_offer.replace(candidate_str, "")
+        sdp_offer = sdp_offer.replace("a=end-of-candidates" + ENDLINE, "")
+        return sdp_offer, offer_candidates
+
+    def _format_sdp_answer(session: XTIOTWebRTCSession) -> str:
+        #Format SDP answer and send it back
+        sdp_answer: str = session.answer.get("sdp", "")
+        candidates: str = ""
+        if session.answer_candidates:
+            for candidate in session.answer_candidates:
+                candidates += candidate.get("candidate", "")
+            sdp_answer += candidates + "a=end-of-candidates" + ENDLINE
+        session.final_answer = f"{sdp_answer}"
+        return sdp_answer
+
+    def _publish_sdp_offer(self, topic: str, device_id: str, session_id: str, moto_id: str, auth_token: str, sdp_offer: str, offer_candidates: list[str]) -> bool:
+        payload = {
+            "protocol":302,
+            "pv":"2.2",
+            "t":int(time.time()),
+            "data":{
+                "header":{
+                    "type":"offer",
+                    "from":f"{self.ipc_manager.get_from()}",
+                    "to":f"{device_id}",
+                    "sub_dev_id":"",
+                    "sessionid":f"{session_id}",
+                    "moto_id":f"{moto_id}",
+                    "tid":""
+                },
+                "msg":{
+                    "mode":"webrtc",
+                    "sdp":f"{sdp_offer}",
+                    "stream_type":1,
+                    "auth":f"{auth_token}",
+                }
+            },
+        }
+        #The offer and its candidates are acknowledged together
+        messages = [json.dumps(payload)]
+        for candidate in offer_candidates:
+            messages.append(self._get_sdp_candidate_message(device_id, session_id, moto_id, candidate))
+        return self.ipc_manager.publish_all_to_ipc_mqtt(topic, messages)
+
+    def _publish_sdp_candidate(self, topic: str, device_id: str, session_id: str, moto_id: str, candidate: str) -> None:
+        self.ipc_manager.publish_to_ipc_mqtt(topic, self._get_sdp_candidate_message(device_id, session_id, moto_id, candidate))
+
+    def _get_sdp_candidate_message(self, device_id: str, session_id: str, moto_id: str, candidate: str) -> str:
+        payload = {
+            "protocol":302,
+            "pv":"2.2",
+            "t":int(time.time()),
+            "data":{
+                "header":{
+                    "type":"candidate",
+                    "from":f"{self.ipc_manager.get_from()}",
+                    "to":f"{device_id}",
+                    "sub_dev_id":"",
+                    "sessionid":f"{session_id}",
+                    "moto_id":f"{moto_id}",
+                    "tid":""
+                },
+                "msg":{
+                    "mode":"webrtc",
+                    "candidate": candidate
+                }
+            },
+        }
+        return json.dumps(payload)
     
     def delete_webrtc_session(self, device_id: str, session_id: str) -> str | None:
         if webrtc_config := self.get_config(device_id, session_id):
@@ -1,5 +1,10 @@
 from __future__ import annotations
 
+from collections import deque
+import statistics
+from threading import Lock
+import time
+
 from tuya_iot import (
     TuyaOpenAPI,
 )
@@ -14,6 +19,9 @@ from .xt_tuya_iot_ipc_listener import (
 from .xt_tuya_iot_ipc_mq import (
     XTIOTOpenMQIPC,
 )
+from ..xt_tuya_iot_openapi_async import (
+    XTIOTOpenAPIAsync,
+)
 
 from ...multi_manager import (
     MultiManager,
@@ -24,21 +32,71 @@ from ....const import (
 from .webrtc.xt_tuya_iot_webrtc_manager import (
     XTIOTWebRTCManager,
 )
+from ..const import (
+    IPC_PUBLISH_TIMEOUT,
+    IPC_PUBLISH_LATENCY_SAMPLES,
+)
 
 class XTIOTIPCManager:  # noqa: F811
-    def __init__(self, api: TuyaOpenAPI, multi_manager: MultiManager) -> None:
+    def __init__(self, api: TuyaOpenAPI, multi_manager: MultiManager, async_api: XTIOTOpenAPIAsync | None = None) -> None:
         self.multi_manager = multi_manager
         self.ipc_mq: XTIOTOpenMQIPC = XTIOTOpenMQIPC(api)
         self.ipc_listener: XTIOTIPCListener = XTIOTIPCListener(self)
         self.ipc_mq.start()
         self.ipc_mq.add_message_listener(self.ipc_listener.handle_message)
         self.api = api
+        self.async_api = async_api
         self.webrtc_manager = XTIOTWebRTCManager(self)
+        self.publish_latencies: deque[float] = deque(maxlen=IPC_PUBLISH_LATENCY_SAMPLES)
+        self.published: int = 0
+        self.publish_failures: int = 0
+        self.publish_stats_lock = Lock()
 
     def get_from(self) -> str:
         return self.ipc_mq.mq_config.username.split("cloud_")[1]
 
-    def publish_to_ipc_mqtt(self, topic: str, msg: str):
-        LOGGER.warning(f"Publishing to IPC: {msg}")
-        publish_result = self.ipc_mq.client.publish(topic=topic, payload=msg)
-        publish_result.wait_for_publish(10)
\ No newline at end of file
+    def publish_to_ipc_mqtt(self, topic: str, msg: str) -> bool:
+        return self.publish_all_to_ipc_mqtt(topic, [msg])
+
+    def publish_all_to_ipc_mqtt(self, topic: str, msgs: list[str], timeout: float = IPC_PUBLISH_TIMEOUT) -> bool:
+        #All the messages are sent before waiting, their acknowledgements
+        #share a single deadline. Returns False if any of them wasn't published
+        publish_results: list[tuple[float, int, any]] = []
+        for msg in msgs:
+            LOGGER.debug(f"Publishing to IPC: {msg}")
+            sent_at = time.monotonic()
+            publish_result = self.ipc_mq.client.publish(topic=topic, payload=msg)
+            publish_results.append((sent_at, publish_result.mid, publish_result))
+        deadline = time.monotonic() + timeout
+        latencies: list[float] = []
+        failures: int = 0
+        for sent_at, mid, publish_result in publish_results:
+            try:
+                publish_result.wait_for_publish(max(0, deadline - time.monotonic()))
+            except (RuntimeError, ValueError) as e:
+                LOGGER.warning(f"Publishing to IPC failed: {e}")
+            acknowledged_at = self.ipc_mq.pop_publish_ack(mid)
+            if not publish_result.is_published():
+                failures += 1
+                continue
+            latencies.append((acknowledged_at or time.monotonic()) - sent_at)
+        with self.publish_stats_lock:
+            self.publish_latencies.extend(latencies)
+            self.published += len(latencies)
+            self.publish_failures += failures
+        return failures == 0
+
+    def get_publish_diagnostics(self) -> dict[str, any]:
+        with self.publish_stats_lock:
+            latencies = sorted(self.publish_latencies)
+            published = self.published
+            failures = self.publish_failures
+        diagnostics: dict[str, any] = {
+            "published": published,
+            "failures": failures,
+        }
+        if latencies:
+            diagnostics["latency_p50_ms"] = round(statistics.median(latencies) * 1000, 1)
+            diagnostics["latency_p95_ms"] = round(latencies[int((len(latencies) - 1) * 0.95)] * 1000, 1)
+            diagnostics["latency_max_ms"] = round(latencies[-1] * 1000, 1)
+        return diagnostics
\ No newline at end of file
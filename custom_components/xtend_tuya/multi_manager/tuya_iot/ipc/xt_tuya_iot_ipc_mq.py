@@ -1,5 +1,8 @@
 from __future__ import annotations
 
+from collections import OrderedDict
+from threading import Lock
+import time
 from typing import Optional, Any
 import uuid
 import json
@@ -27,6 +30,9 @@ from ....util import (
 from ....const import (
     LOGGER  # noqa: F401
 )
+from ..const import (
+    IPC_PUBLISH_MAX_TRACKED_ACKS,
+)
 
 class XTIOTIPCTuyaMQConfig(TuyaMQConfig):
     def __init__(self, mqConfigResponse: dict[str, Any] = {}) -> None:
@@ -43,6 +49,9 @@ class XTIOTIPCTuyaMQConfig(TuyaMQConfig):
 class XTIOTOpenMQIPC(XTIOTOpenMQ):
     def __init__(self, api: TuyaOpenAPI) -> None:
         self.mq_config: XTIOTIPCTuyaMQConfig = None
+        #Acknowledgement time of the published messages by mid
+        self.publish_acks: OrderedDict[int, float] = OrderedDict()
+        self.publish_acks_lock = Lock()
         super().__init__(api)
     
     def _get_mqtt_config(self) -> Optional[XTIOTIPCTuyaMQConfig]:
@@ -88,7 +97,14 @@ class XTIOTOpenMQIPC(XTIOTOpenMQ):
     
     def _on_publish(self, mqttc: mqtt.Client, user_data: Any, mid):
         #LOGGER.debug(f"_on_publish: {mid} <=> {user_data}")
-        pass
+        with self.publish_acks_lock:
+            self.publish_acks[mid] = time.monotonic()
+            while len(self.publish_acks) > IPC_PUBLISH_MAX_TRACKED_ACKS:
+                self.publish_acks.popitem(last=False)
+
+    def pop_publish_ack(self, mid: int) -> float | None:
+        with self.publish_acks_lock:
+            return self.publish_acks.pop(mid, None)
 
     def _start(self, mq_config: TuyaMQConfig) -> mqtt.Client:
         mqttc = mqtt.Client(mq_config.client_id)
@@ -1,17 +1,38 @@
 from __future__ import annotations
 
+import json
+from typing import Any
+
 from ...const import (
     DPType,
 )
 
-def prepare_value_for_property_update(dp_item, value) -> str:
+def prepare_value_for_property_update(dp_item, value) -> Any:
+    #Returns the value with the JSON type expected in the "properties" payload
     config_item = dp_item.get("config_item", None)
-    if config_item is not None:
-        value_type = config_item.get("valueType", None)
-        if value_type is not None:
-            if value_type == DPType.BOOLEAN:
-                if bool(value):
-                    return 'true'
-                else:
-                    return 'false'
-    return str(value)
\ No newline at end of file
+    if config_item is None:
+        return value
+    match config_item.get("valueType", None):
+        case DPType.BOOLEAN:
+            if isinstance(value, str):
+                return value.lower() == "true"
+            return bool(value)
+        case DPType.INTEGER:
+            if isinstance(value, float) and value.is_integer():
+                return int(value)
+            if isinstance(value, str):
+                try:
+                    return int(value)
+                except ValueError:
+                    return float(value)
+            return value
+        case DPType.JSON:
+            if isinstance(value, str):
+                try:
+                    return json.loads(value)
+                except ValueError:
+                    return value
+            return value
+        case DPType.ENUM | DPType.STRING | DPType.RAW:
+            return str(value)
+    return value
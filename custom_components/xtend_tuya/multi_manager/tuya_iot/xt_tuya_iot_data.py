@@ -9,9 +9,13 @@ from .xt_tuya_iot_home_manager import (
 from .xt_tuya_iot_manager import (
     XTIOTDeviceManager
 )
+from .xt_tuya_iot_openapi_async import (
+    XTIOTOpenAPIAsync,
+)
 
 class TuyaIOTData(NamedTuple):
     device_manager: XTIOTDeviceManager
     mq: XTIOTOpenMQ
     device_ids: list[str] #List of device IDs that are managed by the manager before the managers device merging process
-    home_manager: XTIOTHomeManager
\ No newline at end of file
+    home_manager: XTIOTHomeManager
+    async_api: XTIOTOpenAPIAsync = None
\ No newline at end of file
@@ -4,6 +4,8 @@ https://github.com/tuya/tuya-iot-python-sdk
 """
 
 from __future__ import annotations
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import partial
 import json
 from tuya_iot import (
     TuyaDeviceManager,
@@ -30,19 +32,44 @@ from ..shared.merging_manager import (
 from ..multi_manager import (
     MultiManager,  # noqa: F811
 )
+from .const import (
+    OPEN_API_FETCH_CONCURRENCY,
+    PRODUCT_CACHE_KIND_IOT_MODEL,
+)
+from ..shared.product_registry import (
+    XTProductSpecRegistry,
+)
+from ..shared.value_descriptor import (
+    XTValueDescriptor,
+)
 from ...base import TuyaEntity
 from .ipc.xt_tuya_iot_ipc_manager import (
     XTIOTIPCManager
 )
+from .xt_tuya_iot_openapi_async import (
+    XTIOTOpenAPIAsync,
+)
 
 
 class XTIOTDeviceManager(TuyaDeviceManager):
-    def __init__(self, multi_manager: MultiManager, api: TuyaOpenAPI, mq: TuyaOpenMQ) -> None:
+    def __init__(
+            self,
+            multi_manager: MultiManager,
+            api: TuyaOpenAPI,
+            mq: TuyaOpenMQ,
+            async_api: XTIOTOpenAPIAsync,
+            open_api_fetch_concurrency: int = OPEN_API_FETCH_CONCURRENCY,
+    ) -> None:
         super().__init__(api, mq)
         mq.remove_message_listener(self.on_message)
         mq.add_message_listener(self.forward_message_to_multi_manager)
         self.multi_manager = multi_manager
-        self.ipc_manager = XTIOTIPCManager(api, multi_manager)
+        #The requests of this manager run on the event loop through the async API
+        self.async_api = async_api
+        self.open_api_fetch_concurrency = open_api_fetch_concurrency
+        self.ipc_manager = XTIOTIPCManager(api, multi_manager, async_api)
+        #Revalidations run in the background and give way when the API call quota runs out
+        self.multi_manager.product_cache.register_revalidator(PRODUCT_CACHE_KIND_IOT_MODEL, partial(self._fetch_device_model, low_priority=True))
 
     def forward_message_to_multi_manager(self, msg:str):
         self.multi_manager.on_message(MESSAGE_SOURCE_TUYA_IOT, msg)
@@ -124,12 +151,24 @@ class XTIOTDeviceManager(TuyaDeviceManager):
     
     def update_device_function_cache(self, devIds: list = []):
         super().update_device_function_cache(devIds)
-        for device_id in self.device_map:
-            device = self.device_map[device_id]
-            device_open_api = self.get_open_api_device(device)
-            self.multi_manager.device_watcher.report_message(device_id, f"About to merge {device} and {device_open_api}", device)
-            XTMergingManager.merge_devices(device, device_open_api)
-            self.multi_manager.virtual_state_handler.apply_init_virtual_states(device)
+
+        #Fetch the OpenAPI models concurrently and merge them as they arrive
+        with ThreadPoolExecutor(max_workers=self.open_api_fetch_concurrency) as executor:
+            futures = {
+                executor.submit(self.get_open_api_device, device): device
+                for device in list(self.device_map.values())
+            }
+            for future in as_completed(futures):
+                device = futures[future]
+                try:
+                    device_open_api = future.result()
+                except Exception as e:
+                    LOGGER.warning(f"Fetching OpenAPI model of {device.name} ({device.id}) failed: {e}")
+                    device_open_api = None
+                self.multi_manager.device_watcher.report_message(device.id, f"About to merge {device} and {device_open_api}", device)
+                if device_open_api is not None:
+                    XTMergingManager.merge_devices(device, device_open_api)
+                self.multi_manager.virtual_state_handler.apply_init_virtual_states(device)
 
     def on_message(self, msg: str):
         super().on_message(msg)
@@ -143,9 +182,7 @@ class XTIOTDeviceManager(TuyaDeviceManager):
         if not device:
             return
         self.multi_manager.device_watcher.report_message(device_id, f"[IOT]On device report: {status}", device)
-        status_new = self.multi_manager.convert_device_report_status_list(device_id, status)
-        status_new = self.multi_manager.multi_source_handler.filter_status_list(device_id, MESSAGE_SOURCE_TUYA_IOT, status_new)
-        status_new = self.multi_manager.virtual_state_handler.apply_virtual_states_to_status_list(device, status_new)
+        status_new = self.multi_manager.process_device_report(device, MESSAGE_SOURCE_TUYA_IOT, status)
         super()._on_device_report(device_id, status_new)
 
     def _update_device_list_info_cache(self, devIds: list[str]):
@@ -155,60 +192,83 @@ class XTIOTDeviceManager(TuyaDeviceManager):
             device_id = item["id"]
             self.device_map[device_id] = XTDevice(**item)
     
+    def _fetch_device_model(self, device_id: str, low_priority: bool = False) -> str | None:
+        response = self.async_api.get_threadsafe(f"/v2.0/cloud/thing/{device_id}/model", low_priority=low_priority)
+        if not response.get("success"):
+            LOGGER.warning(f"Response2: {response}")
+            return None
+        result = response.get("result", {})
+        return result.get("model", "{}")
+
+    def get_device_model(self, device: XTDevice) -> str | None:
+        #Thing models are per product, use the cached one when available
+        product_id = getattr(device, "product_id", None)
+        if (model := self.multi_manager.product_cache.get(PRODUCT_CACHE_KIND_IOT_MODEL, product_id, device.id)) is not None:
+            return model
+        model = self._fetch_device_model(device.id)
+        self.multi_manager.product_cache.set(PRODUCT_CACHE_KIND_IOT_MODEL, product_id, model)
+        return model
+
+    def get_device_model_spec(self, device: XTDevice) -> tuple[dict[str, Any], dict[int, dict[str, Any]]] | None:
+        #Parsed once per product and shared by all its devices
+        return self.multi_manager.product_registry.get_or_build(
+            PRODUCT_CACHE_KIND_IOT_MODEL,
+            getattr(device, "product_id", None),
+            partial(self._build_device_model_spec, device)
+        )
+
+    def _build_device_model_spec(self, device: XTDevice) -> tuple[dict[str, Any], dict[int, dict[str, Any]]] | None:
+        model = self.get_device_model(device)
+        if model is None:
+            return None
+        data_model = json.loads(model)
+        local_strategy: dict[int, dict[str, Any]] = {}
+        for service in data_model["services"]:
+            for property in service["properties"]:
+                if (    "abilityId" in property
+                    and "code" in property
+                    and "accessMode" in property
+                    and "typeSpec" in property
+                    ):
+                    dp_id = int(property["abilityId"])
+                    code  = property["code"]
+                    typeSpec = property["typeSpec"]
+                    real_type = TuyaEntity.determine_dptype(typeSpec["type"])
+                    access_mode = property["accessMode"]
+                    typeSpec.pop("type")
+                    typeSpec_json = XTValueDescriptor.dump(typeSpec)
+                    if dp_id not in local_strategy:
+                        local_strategy[dp_id] = {
+                            "value_convert": "default",
+                            "status_code": code,
+                            "config_item": {
+                                "statusFormat": f'{{"{code}":"$"}}',
+                                "valueDesc": typeSpec_json,
+                                "valueType": real_type,
+                                "pid": device.product_id,
+                            },
+                            "property_update": True,
+                            "use_open_api": True,
+                            "access_mode": access_mode,
+                            "status_code_alias": []
+                        }
+        return data_model, local_strategy
+
     def get_open_api_device(self, device: XTDevice) -> XTDevice | None:
         device_properties = XTDevice.from_compatible_device(device)
         device_properties.function = {}
         device_properties.status_range = {}
         device_properties.status = {}
         device_properties.local_strategy = {}
-        response = self.api.get(f"/v2.0/cloud/thing/{device.id}/shadow/properties")
-        response2 = self.api.get(f"/v2.0/cloud/thing/{device.id}/model")
-        if not response.get("success") or not response2.get("success"):
+        response = self.async_api.get_threadsafe(f"/v2.0/cloud/thing/{device.id}/shadow/properties")
+        spec = self.get_device_model_spec(device)
+        if not response.get("success") or spec is None:
             LOGGER.warning(f"Response1: {response}")
-            LOGGER.warning(f"Response2: {response2}")
             return
         
-        if response2.get("success"):
-            result = response2.get("result", {})
-            data_model = json.loads(result.get("model", "{}"))
-            device_properties.data_model = data_model
-            for service in data_model["services"]:
-                for property in service["properties"]:
-                    if (    "abilityId" in property
-                        and "code" in property
-                        and "accessMode" in property
-                        and "typeSpec" in property
-                        ):
-                        dp_id = int(property["abilityId"])
-                        code  = property["code"]
-                        typeSpec = property["typeSpec"]
-                        real_type = TuyaEntity.determine_dptype(typeSpec["type"])
-                        access_mode = property["accessMode"]
-                        typeSpec.pop("type")
-                        typeSpec_json = json.dumps(typeSpec)
-                        if dp_id not in device_properties.local_strategy:
-                            if code in device_properties.function or code in device_properties.status_range:
-                                property_update = False
-                            else:
-                                property_update = True
-                            device_properties.local_strategy[dp_id] = {
-                                "value_convert": "default",
-                                "status_code": code,
-                                "config_item": {
-                                    "statusFormat": f'{{"{code}":"$"}}',
-                                    "valueDesc": typeSpec_json,
-                                    "valueType": real_type,
-                                    "pid": device.product_id,
-                                },
-                                "property_update": property_update,
-                                "use_open_api": True,
-                                "access_mode": access_mode,
-                                "status_code_alias": []
-                            }
-                            if code in device_properties.status_range:
-                                device_properties.status_range[code].dp_id = dp_id
-                            if code in device_properties.function:
-                                device_properties.function[code].dp_id = dp_id
+        data_model, local_strategy = spec
+        device_properties.data_model = data_model
+        device_properties.local_strategy = XTProductSpecRegistry.instantiate_local_strategy(local_strategy)
 
         if response.get("success"):
             result = response.get("result", {})
@@ -262,11 +322,18 @@ class XTIOTDeviceManager(TuyaDeviceManager):
     def send_property_update(
             self, device_id: str, properties: list[dict[str, Any]]
     ):
+        #All the properties are issued in a single request, the last value of a code wins
+        merged_properties: dict[str, Any] = {}
         for property in properties:
-            for prop_key in property:
-                property_str = f"{{\"{prop_key}\":{property[prop_key]}}}"
-                self.api.post(f"/v2.0/cloud/thing/{device_id}/shadow/properties/issue", {"properties": property_str}
+            merged_properties.update(property)
+        if not merged_properties:
+            return
+        response = self.async_api.post_threadsafe(
+            f"/v2.0/cloud/thing/{device_id}/shadow/properties/issue",
+            {"properties": json.dumps(merged_properties)},
         )
+        if not response.get("success", False):
+            LOGGER.warning(f"Property update of {device_id} failed: {response}")
     
     def send_lock_unlock_command(
             self, device_id: str, lock: bool
@@ -279,7 +346,7 @@ class XTIOTDeviceManager(TuyaDeviceManager):
 
         self.multi_manager.device_watcher.report_message(device_id, f"Sending lock/unlock command open: {open}", self.device_map[device_id])
 
-        remote_unlock_types = self.api.get(f"/v1.0/devices/{device_id}/door-lock/remote-unlocks")
+        remote_unlock_types = self.async_api.get_threadsafe(f"/v1.0/devices/{device_id}/door-lock/remote-unlocks")
         self.multi_manager.device_watcher.report_message(device_id, f"API remote unlock types: {remote_unlock_types}", self.device_map[device_id])
         if remote_unlock_types.get("success", False):
             results = remote_unlock_types.get("result", [])
@@ -288,12 +355,12 @@ class XTIOTDeviceManager(TuyaDeviceManager):
                     if supported_unlock_type := result.get("remote_unlock_type", None):
                         supported_unlock_types.append(supported_unlock_type)
         if "remoteUnlockWithoutPwd" in supported_unlock_types:
-            ticket = self.api.post(f"/v1.0/devices/{device_id}/door-lock/password-ticket")
+            ticket = self.async_api.post_threadsafe(f"/v1.0/devices/{device_id}/door-lock/password-ticket")
             self.multi_manager.device_watcher.report_message(device_id, f"API remote unlock ticket: {ticket}", self.device_map[device_id])
             if ticket.get("success", False):
                 result = ticket.get("result", {})
                 if ticket_id := result.get("ticket_id", None):
-                    lock_operation = self.api.post(f"/v1.0/smart-lock/devices/{device_id}/password-free/door-operate", {"ticket_id": ticket_id, "open": open})
+                    lock_operation = self.async_api.post_threadsafe(f"/v1.0/smart-lock/devices/{device_id}/password-free/door-operate", {"ticket_id": ticket_id, "open": open})
                     self.multi_manager.device_watcher.report_message(device_id, f"API remote unlock operation result: {lock_operation}", self.device_map[device_id])
                     return lock_operation.get("success", False)
         return False
\ No newline at end of file
@@ -4,6 +4,7 @@ from __future__ import annotations
 import hashlib
 import hmac
 import json
+from threading import RLock, Timer
 import time
 from typing import Any
 
@@ -14,6 +15,26 @@ from tuya_iot.version import VERSION
 from ...const import (
     LOGGER,  # noqa: F401
 )
+from .const import (
+    OPEN_API_CONNECT_TIMEOUT,
+    OPEN_API_READ_TIMEOUT,
+)
+from ..shared.api_call_accounting import (
+    XTAPICallAccounting,
+    get_error_response,
+    XT_ERROR_CODE_QUOTA_DEFERRED,
+)
+from .xt_tuya_iot_request_guard import (
+    get_circuit_key,
+    XTIOTRequestGuard,
+    is_retryable_http_status,
+    is_retryable_response,
+    XT_ERROR_CODE_HTTP,
+    XT_ERROR_CODE_TIMEOUT,
+    XT_ERROR_CODE_CONNECTION,
+    XT_ERROR_CODE_INVALID_RESPONSE,
+    XT_ERROR_CODE_CIRCUIT_OPEN,
+)
 
 TUYA_ERROR_CODE_TOKEN_INVALID = 1010
 
@@ -23,6 +44,9 @@ TO_C_SMART_HOME_REFRESH_TOKEN_API = "/v1.0/token/"
 TO_C_CUSTOM_TOKEN_API = "/v1.0/iot-03/users/login"
 TO_C_SMART_HOME_TOKEN_API = "/v1.0/iot-01/associated-users/actions/authorized-login"
 
+TOKEN_REFRESH_AHEAD = 5 * 60    #Seconds before the expiration when the token is refreshed in the background
+TOKEN_REFRESH_MIN_DELAY = 30    #Seconds
+
 
 class TuyaTokenInfo:
     """Tuya token info.
@@ -52,6 +76,11 @@ class TuyaTokenInfo:
 class XTIOTOpenAPI:
     """Open Api.
 
+    Requests never raise nor return None: network failures, timeouts, HTTP
+    errors, endpoints whose circuit is open and low priority calls deferred
+    to save the API call quota all come back as a response with "success"
+    set to False and an "xt_" error code.
+
     Typical usage example:
 
     openapi = TuyaOpenAPI(ENDPOINT, ACCESS_ID, ACCESS_KEY)
@@ -64,9 +93,17 @@ class XTIOTOpenAPI:
         access_secret: str,
         auth_type: AuthType = AuthType.SMART_HOME,
         lang: str = "en",
+        connect_timeout: float = OPEN_API_CONNECT_TIMEOUT,
+        read_timeout: float = OPEN_API_READ_TIMEOUT,
+        request_guard: XTIOTRequestGuard | None = None,
+        call_accounting: XTAPICallAccounting | None = None,
     ) -> None:
         """Init TuyaOpenAPI."""
         self.session = requests.session()
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.request_guard = request_guard if request_guard is not None else XTIOTRequestGuard()
+        self.call_accounting = call_accounting if call_accounting is not None else XTAPICallAccounting("Tuya IoT")
 
         self.endpoint = endpoint
         self.access_id = access_id
@@ -81,6 +118,9 @@ class XTIOTOpenAPI:
             self.__login_path = TO_C_SMART_HOME_TOKEN_API
 
         self.token_info: TuyaTokenInfo = None
+        #Held while connecting or refreshing the token, the other requests wait for it
+        self.token_lock = RLock()
+        self.token_refresh_timer: Timer | None = None
 
         self.dev_channel: str = ""
 
@@ -96,6 +136,7 @@ class XTIOTOpenAPI:
         path: str,
         params: dict[str, Any] | None = None,
         body: dict[str, Any] | None = None,
+        access_token: str | None = None,
     ) -> tuple[str, int]:
 
         # HTTPMethod
@@ -129,7 +170,9 @@ class XTIOTOpenAPI:
         t = int(time.time() * 1000)
 
         message = self.access_id
-        if self.token_info is not None:
+        if access_token is not None:
+            message += access_token
+        elif self.token_info is not None:
             message += self.token_info.access_token
         message += str(t) + str_to_sign
         sign = (
@@ -143,32 +186,96 @@ class XTIOTOpenAPI:
         )
         return sign, t
 
-    def __refresh_access_token_if_need(self, path: str):
-        if self.is_connect() is False:
-            return
-
+    def _need_token_refresh(self, path: str) -> bool:
         if path.startswith(self.__login_path):
-            return
+            return False
 
         # should use refresh token?
         now = int(time.time() * 1000)
         expired_time = self.token_info.expire_time
 
         if expired_time - 60 * 1000 > now:  # 1min
+            return False
+        return True
+
+    def _get_refresh_token_request(self) -> tuple[str, str]:
+        if self.auth_type == AuthType.CUSTOM:
+            return "POST", TO_C_CUSTOM_REFRESH_TOKEN_API + self.token_info.refresh_token
+        return "GET", TO_C_SMART_HOME_REFRESH_TOKEN_API + self.token_info.refresh_token
+
+    def _is_token_path(self, path: str) -> bool:
+        return (
+            path == self.__login_path
+            or path.startswith(TO_C_CUSTOM_REFRESH_TOKEN_API)
+            or path.startswith(TO_C_SMART_HOME_REFRESH_TOKEN_API)
+        )
+
+    def __refresh_access_token_if_need(self, path: str):
+        if self._is_token_path(path):
             return
 
-        self.token_info.access_token = ""
+        if self.is_connect() is False:
+            return
 
-        if self.auth_type == AuthType.CUSTOM:
-            response = self.post(
-                TO_C_CUSTOM_REFRESH_TOKEN_API + self.token_info.refresh_token
-            )
-        else:
-            response = self.get(
-                TO_C_SMART_HOME_REFRESH_TOKEN_API + self.token_info.refresh_token
+        if not self._need_token_refresh(path):
+            return
+
+        self._refresh_access_token(self.token_info)
+
+    def _refresh_access_token(self, stale_token_info: TuyaTokenInfo) -> None:
+        with self.token_lock:
+            #Another thread may have refreshed it while this one was waiting
+            if self.token_info is not stale_token_info or stale_token_info is None:
+                return
+
+            #The refresh request is signed without the access token
+            method, refresh_path = self._get_refresh_token_request()
+            response = self.__request(method, refresh_path, None, None, False, "")
+            if response.get("success", False):
+                self._set_token_info(TuyaTokenInfo(response))
+                return
+            LOGGER.warning(f"Token refresh failed: {response}")
+            self._reconnect(stale_token_info)
+
+    def _reconnect(self, stale_token_info: TuyaTokenInfo | None) -> None:
+        with self.token_lock:
+            #Only the first thread seeing the stale token reconnects
+            if self.token_info is not stale_token_info:
+                return
+            if not self._has_credentials():
+                return
+            self.token_info = None
+            self.connect(
+                self.__username, self.__password, self.__country_code, self.__schema
             )
 
-        self.token_info = TuyaTokenInfo(response)
+    def _set_token_info(self, token_info: TuyaTokenInfo) -> None:
+        with self.token_lock:
+            self.token_info = token_info
+            self._schedule_token_refresh()
+
+    def _schedule_token_refresh(self) -> None:
+        self.stop_token_refresh()
+        if self.token_info is None or not self.token_info.refresh_token:
+            return
+        delay = max(
+            TOKEN_REFRESH_MIN_DELAY,
+            self.token_info.expire_time / 1000 - time.time() - TOKEN_REFRESH_AHEAD,
+        )
+        self.token_refresh_timer = Timer(delay, self._refresh_access_token_in_background, (self.token_info,))
+        self.token_refresh_timer.daemon = True
+        self.token_refresh_timer.start()
+
+    def _refresh_access_token_in_background(self, token_info: TuyaTokenInfo) -> None:
+        try:
+            self._refresh_access_token(token_info)
+        except Exception as e:
+            LOGGER.warning(f"Background token refresh failed: {e}")
+
+    def stop_token_refresh(self) -> None:
+        if self.token_refresh_timer is not None:
+            self.token_refresh_timer.cancel()
+            self.token_refresh_timer = None
 
     def set_dev_channel(self, dev_channel: str):
         """Set dev channel."""
@@ -196,49 +303,79 @@ class XTIOTOpenAPI:
         self.__password = password
         self.__country_code = country_code
         self.__schema = schema
-        self.connecting = True
+        with self.token_lock:
+            self.connecting = True
+            try:
+                path, body = self._get_login_request()
+                response = self.post(path, body)
+            finally:
+                self.connecting = False
+            if not response["success"]:
+                return response
+
+            # Cache token info.
+            self._set_token_info(TuyaTokenInfo(response))
+
+        return response
+
+    def _get_login_request(self) -> tuple[str, dict[str, Any]]:
         if self.auth_type == AuthType.CUSTOM:
-            response = self.post(
+            return (
                 TO_C_CUSTOM_TOKEN_API,
                 {
-                    "username": username,
-                    "password": hashlib.sha256(password.encode("utf8"))
+                    "username": self.__username,
+                    "password": hashlib.sha256(self.__password.encode("utf8"))
                     .hexdigest()
                     .lower(),
                 },
             )
-        else:
-            response = self.post(
-                TO_C_SMART_HOME_TOKEN_API,
-                {
-                    "username": username,
-                    "password": hashlib.md5(password.encode("utf8")).hexdigest(),
-                    "country_code": country_code,
-                    "schema": schema,
-                },
-            )
-        self.connecting = False
-        if not response["success"]:
-            return response
+        return (
+            TO_C_SMART_HOME_TOKEN_API,
+            {
+                "username": self.__username,
+                "password": hashlib.md5(self.__password.encode("utf8")).hexdigest(),
+                "country_code": self.__country_code,
+                "schema": self.__schema,
+            },
+        )
 
-        # Cache token info.
-        self.token_info = TuyaTokenInfo(response)
+    def _has_credentials(self) -> bool:
+        return bool(self.__username and self.__password and self.__country_code)
 
-        return response
+    def _get_request_headers(self, path: str, sign: str, t: int, access_token: str | None = None) -> dict[str, str]:
+        if access_token is None:
+            access_token = self.token_info.access_token if self.token_info else ""
+        headers = {
+            "client_id": self.access_id,
+            "sign": sign,
+            "sign_method": "HMAC-SHA256",
+            "access_token": access_token,
+            "t": str(t),
+            "lang": self.lang,
+        }
+
+        if self._is_token_path(path):
+            headers["dev_lang"] = "python"
+            headers["dev_version"] = VERSION
+            headers["dev_channel"] = self.dev_channel
+        return headers
 
     def is_connect(self) -> bool:
         """Is connect to tuya cloud."""
         if (
             self.token_info is None
-            and not self.connecting
             and self.__username 
             and self.__password
             and self.__country_code
         ):
-            self.connect(
-                self.__username, self.__password, self.__country_code, self.__schema
-            )
-        return self.token_info is not None and len(self.token_info.access_token) > 0
+            #Waits for a connection in progress in another thread
+            with self.token_lock:
+                if self.token_info is None and not self.connecting:
+                    self.connect(
+                        self.__username, self.__password, self.__country_code, self.__schema
+                    )
+        token_info = self.token_info
+        return token_info is not None and len(token_info.access_token) > 0
 
     def __request(
         self,
@@ -246,28 +383,70 @@ class XTIOTOpenAPI:
         path: str,
         params: dict[str, Any] | None = None,
         body: dict[str, Any] | None = None,
-        first_pass: bool = True
+        first_pass: bool = True,
+        access_token: str | None = None,
+        low_priority: bool = False,
     ) -> dict[str, Any]:
 
+        if low_priority and not self.call_accounting.allow_low_priority_call(method, path):
+            return get_error_response(XT_ERROR_CODE_QUOTA_DEFERRED, "Deferred to save the API call quota")
+
         self.__refresh_access_token_if_need(path)
 
-        access_token = self.token_info.access_token if self.token_info else ""
-        sign, t = self._calculate_sign(method, path, params, body)
-        headers = {
-            "client_id": self.access_id,
-            "sign": sign,
-            "sign_method": "HMAC-SHA256",
-            "access_token": access_token,
-            "t": str(t),
-            "lang": self.lang,
-        }
+        token_info = self.token_info
+        if access_token is None:
+            access_token = token_info.access_token if token_info else ""
+        result = self.__send_with_retries(method, path, params, body, access_token)
 
-        if path == self.__login_path or \
-            path.startswith(TO_C_CUSTOM_REFRESH_TOKEN_API) or\
-            path.startswith(TO_C_SMART_HOME_REFRESH_TOKEN_API):
-            headers["dev_lang"] = "python"
-            headers["dev_version"] = VERSION
-            headers["dev_channel"] = self.dev_channel
+        #A rejected refresh is handled by _refresh_access_token
+        if result.get("code", -1) == TUYA_ERROR_CODE_TOKEN_INVALID and not self._is_token_path(path):
+            self._reconnect(token_info)
+            if first_pass:
+                return self.__request(method, path, params, body, False)
+
+        return result
+
+    def __send_with_retries(
+        self,
+        method: str,
+        path: str,
+        params: dict[str, Any] | None,
+        body: dict[str, Any] | None,
+        access_token: str,
+    ) -> dict[str, Any]:
+        endpoint = get_circuit_key(method, path)
+        attempt = 0
+        result: dict[str, Any] | None = None
+        while True:
+            if not self.request_guard.before_request(endpoint):
+                #The circuit may open between two retries, the last failure is more telling then
+                if result is not None:
+                    return result
+                return get_error_response(XT_ERROR_CODE_CIRCUIT_OPEN, f"Circuit open for {endpoint}")
+            self.call_accounting.record_call(method, path)
+            failed = True
+            try:
+                result, failed = self.__send(method, path, params, body, access_token)
+            finally:
+                #A cancelled or crashed attempt must still end a half open trial
+                self.request_guard.after_request(endpoint, failed)
+            if not failed or not self.request_guard.can_retry(method, attempt):
+                return result
+            time.sleep(self.request_guard.get_retry_delay(attempt))
+            attempt += 1
+
+    def __send(
+        self,
+        method: str,
+        path: str,
+        params: dict[str, Any] | None,
+        body: dict[str, Any] | None,
+        access_token: str,
+    ) -> tuple[dict[str, Any], bool]:
+        """Single round-trip, returns the response and whether it is a transient failure."""
+        #Signed on each attempt, the signature embeds the timestamp
+        sign, t = self._calculate_sign(method, path, params, body, access_token)
+        headers = self._get_request_headers(path, sign, t, access_token)
 
         """ LOGGER.debug(
             f"Request: method = {method}, \
@@ -277,33 +456,47 @@ class XTIOTOpenAPI:
                 t = {int(time.time()*1000)}"
         ) """
 
-        response = self.session.request(
-            method, self.endpoint + path, params=params, json=body, headers=headers
-        )
+        try:
+            response = self.session.request(
+                method,
+                self.endpoint + path,
+                params=params,
+                json=body,
+                headers=headers,
+                timeout=(self.connect_timeout, self.read_timeout),
+            )
+        except requests.Timeout as e:
+            LOGGER.warning(f"Request timeout: {method} {path}: {e}")
+            return get_error_response(XT_ERROR_CODE_TIMEOUT, str(e)), True
+        except requests.RequestException as e:
+            LOGGER.warning(f"Request error: {method} {path}: {e}")
+            return get_error_response(XT_ERROR_CODE_CONNECTION, str(e)), True
 
         if response.ok is False:
             LOGGER.error(
-                f"Response error: code={response.status_code}, body={response.body}"
+                f"Response error: code={response.status_code}, body={response.text}"
+            )
+            return (
+                get_error_response(XT_ERROR_CODE_HTTP, response.text, response.status_code),
+                is_retryable_http_status(response.status_code),
             )
-            return None
 
-        result = response.json()
+        try:
+            result = response.json()
+        except ValueError as e:
+            LOGGER.error(f"Invalid response: {method} {path}: {e}")
+            return get_error_response(XT_ERROR_CODE_INVALID_RESPONSE, str(e)), True
 
         """ LOGGER.debug(
             f"Response: {json.dumps(result, ensure_ascii=False, indent=2)}"
         ) """
 
-        if result.get("code", -1) == TUYA_ERROR_CODE_TOKEN_INVALID:
-            self.token_info = None
-            self.connect(
-                self.__username, self.__password, self.__country_code, self.__schema
-            )
-            if first_pass:
-                return self.__request(method, path, params, body, False)
-
-        return result
+        if is_retryable_response(result):
+            LOGGER.debug(f"Transient error response: {method} {path}: {result}")
+            return result, True
+        return result, False
 
-    def get(self, path: str, params: dict[str, Any] | None = None) -> dict[str, Any]:
+    def get(self, path: str, params: dict[str, Any] | None = None, low_priority: bool = False) -> dict[str, Any]:
         """Http Get.
 
         Requests the server to return specified resources.
@@ -311,13 +504,14 @@ class XTIOTOpenAPI:
         Args:
             path (str): api path
             params (map): request parameter
+            low_priority (bool): may be deferred when the API call quota runs out
 
         Returns:
             response: response body
         """
-        return self.__request("GET", path, params, None)
+        return self.__request("GET", path, params, None, low_priority=low_priority)
 
-    def post(self, path: str, body: dict[str, Any] | None = None) -> dict[str, Any]:
+    def post(self, path: str, body: dict[str, Any] | None = None, low_priority: bool = False) -> dict[str, Any]:
         """Http Post.
 
         Requests the server to update specified resources.
@@ -325,13 +519,14 @@ class XTIOTOpenAPI:
         Args:
             path (str): api path
             body (map): request body
+            low_priority (bool): may be deferred when the API call quota runs out
 
         Returns:
             response: response body
         """
-        return self.__request("POST", path, None, body)
+        return self.__request("POST", path, None, body, low_priority=low_priority)
 
-    def put(self, path: str, body: dict[str, Any] | None = None) -> dict[str, Any]:
+    def put(self, path: str, body: dict[str, Any] | None = None, low_priority: bool = False) -> dict[str, Any]:
         """Http Put.
 
         Requires the server to perform specified operations.
@@ -339,13 +534,14 @@ class XTIOTOpenAPI:
         Args:
             path (str): api path
             body (map): request body
+            low_priority (bool): may be deferred when the API call quota runs out
 
         Returns:
             response: response body
         """
-        return self.__request("PUT", path, None, body)
+        return self.__request("PUT", path, None, body, low_priority=low_priority)
 
-    def delete(self, path: str, params: dict[str, Any] | None = None) -> dict[str, Any]:
+    def delete(self, path: str, params: dict[str, Any] | None = None, low_priority: bool = False) -> dict[str, Any]:
         """Http Delete.
 
         Requires the server to delete specified resources.
@@ -353,8 +549,9 @@ class XTIOTOpenAPI:
         Args:
             path (str): api path
             params (map): request param
+            low_priority (bool): may be deferred when the API call quota runs out
 
         Returns:
             response: response body
         """
-        return self.__request("DELETE", path, params, None)
+        return self.__request("DELETE", path, params, None, low_priority=low_priority)
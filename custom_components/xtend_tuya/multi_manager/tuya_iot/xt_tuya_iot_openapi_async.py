@@ -0,0 +1,378 @@
+"""Tuya Open API, asyncio flavour."""
+from __future__ import annotations
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import json
+from typing import Any, Callable
+
+import aiohttp
+
+from .xt_tuya_iot_openapi import (
+    XTIOTOpenAPI,
+    TUYA_ERROR_CODE_TOKEN_INVALID,
+)
+from ..shared.api_call_accounting import (
+    get_error_response,
+    XT_ERROR_CODE_QUOTA_DEFERRED,
+)
+from .xt_tuya_iot_request_guard import (
+    get_circuit_key,
+    is_retryable_http_status,
+    is_retryable_response,
+    XT_ERROR_CODE_HTTP,
+    XT_ERROR_CODE_TIMEOUT,
+    XT_ERROR_CODE_CONNECTION,
+    XT_ERROR_CODE_INVALID_RESPONSE,
+    XT_ERROR_CODE_CIRCUIT_OPEN,
+)
+from ...const import (
+    LOGGER,  # noqa: F401
+)
+
+DEFAULT_POOL_SIZE = 10
+DEFAULT_REQUEST_TIMEOUT = 10
+
+
+class XTIOTOpenAPIAsync:
+    """Async Open Api.
+
+    Shares the credentials, signing and token of an XTIOTOpenAPI instance
+    so that both can be used side by side, but performs the HTTP round-trips
+    on the event loop through the aiohttp session of Home Assistant, with at
+    most pool_size requests in flight. The retry budget and circuit breakers
+    of the sync API are shared as well. The code running in worker threads
+    can hand its requests to the event loop with get_threadsafe and
+    post_threadsafe.
+
+    Typical usage example:
+
+    async_api = XTIOTOpenAPIAsync(openapi, async_get_clientsession(hass))
+    response = await async_api.get(f"/v1.0/devices/{device_id}")
+    """
+
+    def __init__(
+        self,
+        api: XTIOTOpenAPI,
+        session: aiohttp.ClientSession,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        timeout: float = DEFAULT_REQUEST_TIMEOUT,
+        loop: asyncio.AbstractEventLoop | None = None,
+    ) -> None:
+        """Init XTIOTOpenAPIAsync."""
+        self.api = api
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.session = session
+        self.loop = loop
+        self._request_semaphore: asyncio.Semaphore | None = None
+        # The token jobs get their own thread, the worker threads waiting on
+        # requests of this API could otherwise use up the default executor
+        self.token_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="xt_tuya_iot_token")
+
+    @property
+    def request_semaphore(self) -> asyncio.Semaphore:
+        # The session is shared with Home Assistant, the requests of this API
+        # are bounded here rather than by its connector
+        if self._request_semaphore is None:
+            self._request_semaphore = asyncio.Semaphore(self.pool_size)
+        return self._request_semaphore
+
+    async def _run_token_job(self, target: Callable, *args: Any) -> Any:
+        # Connections and refreshes go through the single flight path of the
+        # sync API, shared with its background refresh and executor threads
+        return await asyncio.get_running_loop().run_in_executor(self.token_executor, target, *args)
+
+    async def connect(self) -> bool:
+        """Connect to Tuya Cloud using the credentials of the sync API."""
+        return await self._run_token_job(self.api.is_connect)
+
+    def _is_connect(self) -> bool:
+        token_info = self.api.token_info
+        return token_info is not None and len(token_info.access_token) > 0
+
+    async def _ensure_connected(self) -> None:
+        if self.api.token_info is None and self.api._has_credentials():
+            await self.connect()
+
+    async def _refresh_access_token_if_need(self, path: str) -> None:
+        if self.api._is_token_path(path):
+            return
+        await self._ensure_connected()
+        if not self._is_connect():
+            return
+
+        if not self.api._need_token_refresh(path):
+            return
+
+        await self._run_token_job(self.api._refresh_access_token, self.api.token_info)
+
+    async def _request(
+        self,
+        method: str,
+        path: str,
+        params: dict[str, Any] | None = None,
+        body: dict[str, Any] | None = None,
+        first_pass: bool = True,
+        timeout: float | None = None,
+        access_token: str | None = None,
+    ) -> dict[str, Any]:
+
+        token_info = self.api.token_info
+        if access_token is None:
+            access_token = token_info.access_token if token_info else ""
+        result = await self._send_with_retries(method, path, params, body, timeout, access_token)
+
+        if (
+            result.get("code", -1) == TUYA_ERROR_CODE_TOKEN_INVALID
+            and first_pass
+            and not self.api._is_token_path(path)
+        ):
+            # Only reconnects if no one replaced the rejected token meanwhile
+            await self._run_token_job(self.api._reconnect, token_info)
+            return await self._request(method, path, params, body, False, timeout)
+
+        return result
+
+    async def _send_with_retries(
+        self,
+        method: str,
+        path: str,
+        params: dict[str, Any] | None,
+        body: dict[str, Any] | None,
+        timeout: float | None,
+        access_token: str,
+    ) -> dict[str, Any]:
+        request_guard = self.api.request_guard
+        endpoint = get_circuit_key(method, path)
+        attempt = 0
+        result: dict[str, Any] | None = None
+        while True:
+            if not request_guard.before_request(endpoint):
+                # The circuit may open between two retries, the last failure is more telling then
+                if result is not None:
+                    return result
+                return get_error_response(XT_ERROR_CODE_CIRCUIT_OPEN, f"Circuit open for {endpoint}")
+            self.api.call_accounting.record_call(method, path)
+            failed = True
+            try:
+                result, failed = await self._send(method, path, params, body, timeout, access_token)
+            finally:
+                # A cancelled or crashed attempt must still end a half open trial
+                request_guard.after_request(endpoint, failed)
+            if not failed or not request_guard.can_retry(method, attempt):
+                return result
+            await asyncio.sleep(request_guard.get_retry_delay(attempt))
+            attempt += 1
+
+    async def _send(
+        self,
+        method: str,
+        path: str,
+        params: dict[str, Any] | None,
+        body: dict[str, Any] | None,
+        timeout: float | None,
+        access_token: str,
+    ) -> tuple[dict[str, Any], bool]:
+        """Single round-trip, returns the response and whether it is a transient failure."""
+        # Signed on each attempt, the signature embeds the timestamp
+        sign, t = self.api._calculate_sign(method, path, params, body, access_token)
+        headers = self.api._get_request_headers(path, sign, t, access_token)
+        client_timeout = aiohttp.ClientTimeout(
+            total=timeout if timeout is not None else self.timeout,
+            sock_connect=self.api.connect_timeout,
+        )
+
+        try:
+            async with self.request_semaphore, self.session.request(
+                method,
+                self.api.endpoint + path,
+                params=params,
+                # Serialize the body the same way it is signed
+                data=json.dumps(body) if body is not None else None,
+                headers={**headers, "Content-Type": "application/json"}
+                if body is not None
+                else headers,
+                timeout=client_timeout,
+            ) as response:
+                if not response.ok:
+                    text = await response.text()
+                    LOGGER.error(
+                        f"Response error: code={response.status}, body={text}"
+                    )
+                    return (
+                        get_error_response(XT_ERROR_CODE_HTTP, text, response.status),
+                        is_retryable_http_status(response.status),
+                    )
+                try:
+                    result = await response.json(content_type=None)
+                except ValueError as e:
+                    LOGGER.error(f"Invalid response: {method} {path}: {e}")
+                    return get_error_response(XT_ERROR_CODE_INVALID_RESPONSE, str(e)), True
+                if is_retryable_response(result):
+                    LOGGER.debug(f"Transient error response: {method} {path}: {result}")
+                    return result, True
+                return result, False
+        except asyncio.TimeoutError as e:
+            LOGGER.warning(f"Request timeout: {method} {path}: {e}")
+            return get_error_response(XT_ERROR_CODE_TIMEOUT, str(e)), True
+        except aiohttp.ClientError as e:
+            LOGGER.warning(f"Request error: {method} {path}: {e}")
+            return get_error_response(XT_ERROR_CODE_CONNECTION, str(e)), True
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        params: dict[str, Any] | None = None,
+        body: dict[str, Any] | None = None,
+        timeout: float | None = None,
+        low_priority: bool = False,
+    ) -> dict[str, Any]:
+        """Http request with automatic token handling."""
+        if low_priority and not self.api.call_accounting.allow_low_priority_call(method, path):
+            return get_error_response(XT_ERROR_CODE_QUOTA_DEFERRED, "Deferred to save the API call quota")
+        await self._refresh_access_token_if_need(path)
+        return await self._request(method, path, params, body, True, timeout)
+
+    async def get(
+        self,
+        path: str,
+        params: dict[str, Any] | None = None,
+        timeout: float | None = None,
+        low_priority: bool = False,
+    ) -> dict[str, Any]:
+        """Http Get.
+
+        Args:
+            path (str): api path
+            params (map): request parameter
+            timeout (float): request timeout in seconds
+            low_priority (bool): may be deferred when the API call quota runs out
+
+        Returns:
+            response: response body
+        """
+        return await self.request("GET", path, params, None, timeout, low_priority)
+
+    async def post(
+        self,
+        path: str,
+        body: dict[str, Any] | None = None,
+        timeout: float | None = None,
+        low_priority: bool = False,
+    ) -> dict[str, Any]:
+        """Http Post.
+
+        Args:
+            path (str): api path
+            body (map): request body
+            timeout (float): request timeout in seconds
+            low_priority (bool): may be deferred when the API call quota runs out
+
+        Returns:
+            response: response body
+        """
+        return await self.request("POST", path, None, body, timeout, low_priority)
+
+    async def put(
+        self,
+        path: str,
+        body: dict[str, Any] | None = None,
+        timeout: float | None = None,
+        low_priority: bool = False,
+    ) -> dict[str, Any]:
+        """Http Put.
+
+        Args:
+            path (str): api path
+            body (map): request body
+            timeout (float): request timeout in seconds
+            low_priority (bool): may be deferred when the API call quota runs out
+
+        Returns:
+            response: response body
+        """
+        return await self.request("PUT", path, None, body, timeout, low_priority)
+
+    async def delete(
+        self,
+        path: str,
+        params: dict[str, Any] | None = None,
+        timeout: float | None = None,
+        low_priority: bool = False,
+    ) -> dict[str, Any]:
+        """Http Delete.
+
+        Args:
+            path (str): api path
+            params (map): request param
+            timeout (float): request timeout in seconds
+            low_priority (bool): may be deferred when the API call quota runs out
+
+        Returns:
+            response: response body
+        """
+        return await self.request("DELETE", path, params, None, timeout, low_priority)
+
+    def _can_run_threadsafe(self) -> bool:
+        if self.loop is None or not self.loop.is_running():
+            return False
+        try:
+            # Waiting on the event loop from the event loop would deadlock it
+            return asyncio.get_running_loop() is not self.loop
+        except RuntimeError:
+            return True
+
+    def get_threadsafe(
+        self,
+        path: str,
+        params: dict[str, Any] | None = None,
+        low_priority: bool = False,
+    ) -> dict[str, Any]:
+        """Http Get from a worker thread, performed on the event loop.
+
+        Falls back to the sync API when there is no running event loop to
+        hand the request to, or when called from the event loop itself.
+
+        Args:
+            path (str): api path
+            params (map): request parameter
+            low_priority (bool): may be deferred when the API call quota runs out
+
+        Returns:
+            response: response body
+        """
+        if not self._can_run_threadsafe():
+            return self.api.get(path, params, low_priority)
+        return asyncio.run_coroutine_threadsafe(
+            self.get(path, params, low_priority=low_priority), self.loop
+        ).result()
+
+    def post_threadsafe(
+        self,
+        path: str,
+        body: dict[str, Any] | None = None,
+        low_priority: bool = False,
+    ) -> dict[str, Any]:
+        """Http Post from a worker thread, performed on the event loop.
+
+        Falls back to the sync API like get_threadsafe.
+
+        Args:
+            path (str): api path
+            body (map): request body
+            low_priority (bool): may be deferred when the API call quota runs out
+
+        Returns:
+            response: response body
+        """
+        if not self._can_run_threadsafe():
+            return self.api.post(path, body, low_priority)
+        return asyncio.run_coroutine_threadsafe(
+            self.post(path, body, low_priority=low_priority), self.loop
+        ).result()
+
+    def shutdown(self) -> None:
+        """Stop the thread of the token jobs."""
+        self.token_executor.shutdown(wait=False)
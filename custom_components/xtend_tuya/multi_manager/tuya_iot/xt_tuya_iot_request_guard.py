@@ -0,0 +1,184 @@
+"""Retry budget and circuit breakers of the cloud API requests."""
+from __future__ import annotations
+
+import random
+from threading import Lock
+import time
+from typing import Any
+
+from ..shared.api_call_accounting import (
+    get_endpoint_key,
+    get_endpoint_device_id,
+)
+from .const import (
+    OPEN_API_MAX_RETRIES,
+    OPEN_API_RETRY_BASE_DELAY,
+    OPEN_API_RETRY_MAX_DELAY,
+    OPEN_API_RETRY_BUDGET,
+    OPEN_API_RETRY_BUDGET_REFILL,
+    OPEN_API_CIRCUIT_FAILURE_THRESHOLD,
+    OPEN_API_CIRCUIT_OPEN_DURATION,
+    OPEN_API_RETRYABLE_ERROR_CODES,
+)
+
+#Codes of the error responses built locally, the Tuya ones are integers
+XT_ERROR_CODE_HTTP = "xt_http_error"
+XT_ERROR_CODE_TIMEOUT = "xt_timeout"
+XT_ERROR_CODE_CONNECTION = "xt_connection_error"
+XT_ERROR_CODE_INVALID_RESPONSE = "xt_invalid_response"
+XT_ERROR_CODE_CIRCUIT_OPEN = "xt_circuit_open"
+
+CIRCUIT_CLOSED = "closed"
+CIRCUIT_OPEN = "open"
+CIRCUIT_HALF_OPEN = "half_open"
+
+
+def is_retryable_http_status(status: int) -> bool:
+    return status == 429 or status >= 500
+
+def is_retryable_response(result: dict[str, Any]) -> bool:
+    #Throttling reaches us as a regular response with an error code
+    return not result.get("success", True) and result.get("code") in OPEN_API_RETRYABLE_ERROR_CODES
+
+def get_circuit_key(method: str, path: str) -> str:
+    #An offline device must not open the circuit of the other devices
+    endpoint = get_endpoint_key(method, path)
+    if device_id := get_endpoint_device_id(path):
+        return f"{endpoint} ({device_id})"
+    return endpoint
+
+
+class XTIOTCircuitBreaker:
+    """Fails the requests of an endpoint fast while it keeps failing.
+
+    Opened after a number of consecutive failures, it lets a single trial
+    request through once the open duration is over and closes back when
+    that trial succeeds. A trial that doesn't report back within the open
+    duration is given up and another one is let through.
+    """
+
+    def __init__(self, failure_threshold: int, open_duration: float) -> None:
+        self.failure_threshold = failure_threshold
+        self.open_duration = open_duration
+        self.state = CIRCUIT_CLOSED
+        self.failures: int = 0
+        self.opened_at: float = 0
+        self.trial_in_flight: bool = False
+        self.trial_started_at: float = 0
+        self.open_count: int = 0
+        self.rejected: int = 0
+
+    def allow_request(self, now: float) -> bool:
+        if self.state == CIRCUIT_CLOSED:
+            return True
+        if self.state == CIRCUIT_OPEN and now - self.opened_at >= self.open_duration:
+            self.state = CIRCUIT_HALF_OPEN
+            self.trial_in_flight = False
+        if self.state == CIRCUIT_HALF_OPEN and (
+            not self.trial_in_flight or now - self.trial_started_at >= self.open_duration
+        ):
+            self.trial_in_flight = True
+            self.trial_started_at = now
+            return True
+        self.rejected += 1
+        return False
+
+    def record_success(self) -> None:
+        self.state = CIRCUIT_CLOSED
+        self.failures = 0
+        self.trial_in_flight = False
+
+    def record_failure(self, now: float) -> None:
+        self.failures += 1
+        self.trial_in_flight = False
+        if self.state == CIRCUIT_HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != CIRCUIT_OPEN:
+                self.open_count += 1
+            self.state = CIRCUIT_OPEN
+            self.opened_at = now
+
+    def get_diagnostics(self) -> dict[str, Any]:
+        return {
+            "state": self.state,
+            "failures": self.failures,
+            "open_count": self.open_count,
+            "rejected": self.rejected,
+        }
+
+
+class XTIOTRequestGuard:
+    """Retry policy and per-endpoint circuit breakers shared by the sync and async APIs.
+
+    Retries draw from a budget that successful requests slowly refill, so a
+    degraded cloud sees at most a bounded burst of retries instead of a
+    multiple of the regular traffic.
+    """
+
+    def __init__(
+        self,
+        max_retries: int = OPEN_API_MAX_RETRIES,
+        retry_base_delay: float = OPEN_API_RETRY_BASE_DELAY,
+        retry_max_delay: float = OPEN_API_RETRY_MAX_DELAY,
+        retry_budget: float = OPEN_API_RETRY_BUDGET,
+        retry_budget_refill: float = OPEN_API_RETRY_BUDGET_REFILL,
+        failure_threshold: int = OPEN_API_CIRCUIT_FAILURE_THRESHOLD,
+        open_duration: float = OPEN_API_CIRCUIT_OPEN_DURATION,
+    ) -> None:
+        self.max_retries = max_retries
+        self.retry_base_delay = retry_base_delay
+        self.retry_max_delay = retry_max_delay
+        self.retry_budget_max = retry_budget
+        self.retry_budget = retry_budget
+        self.retry_budget_refill = retry_budget_refill
+        self.failure_threshold = failure_threshold
+        self.open_duration = open_duration
+        self.breakers: dict[str, XTIOTCircuitBreaker] = {}
+        self.lock = Lock()
+        self.retries: int = 0
+        self.retries_denied: int = 0
+
+    def before_request(self, endpoint: str) -> bool:
+        with self.lock:
+            breaker = self.breakers.get(endpoint)
+            if breaker is None:
+                return True
+            return breaker.allow_request(time.monotonic())
+
+    def after_request(self, endpoint: str, failed: bool) -> None:
+        with self.lock:
+            breaker = self.breakers.get(endpoint)
+            if failed:
+                if breaker is None:
+                    breaker = XTIOTCircuitBreaker(self.failure_threshold, self.open_duration)
+                    self.breakers[endpoint] = breaker
+                breaker.record_failure(time.monotonic())
+                return
+            if breaker is not None:
+                breaker.record_success()
+            self.retry_budget = min(self.retry_budget_max, self.retry_budget + self.retry_budget_refill)
+
+    def can_retry(self, method: str, attempt: int) -> bool:
+        if method != "GET" or attempt >= self.max_retries:
+            return False
+        with self.lock:
+            if self.retry_budget < 1:
+                self.retries_denied += 1
+                return False
+            self.retry_budget -= 1
+            self.retries += 1
+            return True
+
+    def get_retry_delay(self, attempt: int) -> float:
+        return random.uniform(0, min(self.retry_max_delay, self.retry_base_delay * 2 ** attempt))
+
+    def get_diagnostics(self) -> dict[str, Any]:
+        with self.lock:
+            return {
+                "retries": self.retries,
+                "retries_denied": self.retries_denied,
+                "retry_budget": round(self.retry_budget, 2),
+                "circuit_breakers": {
+                    endpoint: breaker.get_diagnostics()
+                    for endpoint, breaker in self.breakers.items()
+                },
+            }
@@ -7,4 +7,7 @@ CONF_TERMINAL_ID = "terminal_id"
 CONF_TOKEN_INFO = "token_info"
 CONF_ENDPOINT = "endpoint"
 CONF_USER_CODE = "user_code"
-TUYA_CLIENT_ID = "HA_3y9q4ak7g4ephrvke"
\ No newline at end of file
+TUYA_CLIENT_ID = "HA_3y9q4ak7g4ephrvke"
+
+#Product cache kind of the sharing local strategies
+PRODUCT_CACHE_KIND_SHARING_STRATEGY = "sharing_strategy"
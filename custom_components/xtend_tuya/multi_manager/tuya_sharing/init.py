@@ -45,6 +45,12 @@ from .xt_tuya_sharing_token_listener import (
 from .xt_tuya_sharing_device_repository import (
     XTSharingDeviceRepository,
 )
+from .xt_tuya_sharing_customer_api import (
+    XTSharingCustomerApi,
+)
+from ..shared.api_call_accounting import (
+    XTAPICallAccounting,
+)
 from .ha_tuya_integration.config_entry_handler import (
     XTHATuyaIntegrationConfigEntryManager
 )
@@ -126,6 +132,10 @@ class XTTuyaSharingDeviceManagerInterface(XTDeviceManagerInterface):
                 token_listener,
             )
             sharing_device_manager.mq = None
+        #The sharing API has no published quota, its calls are only counted
+        sharing_device_manager.customer_api = XTSharingCustomerApi(
+            sharing_device_manager.customer_api, XTAPICallAccounting("Tuya Sharing")
+        )
         sharing_device_manager.home_repository = HomeRepository(sharing_device_manager.customer_api)
         sharing_device_manager.device_repository = XTSharingDeviceRepository(sharing_device_manager.customer_api, sharing_device_manager, self.multi_manager)
         sharing_device_manager.scene_repository = SceneRepository(sharing_device_manager.customer_api)
@@ -289,4 +299,9 @@ class XTTuyaSharingDeviceManagerInterface(XTDeviceManagerInterface):
     
     def trigger_scene(self, home_id: str, scene_id: str) -> bool:
         self.sharing_account.device_manager.trigger_scene(home_id, scene_id)
-        return True
\ No newline at end of file
+        return True
+
+    def get_cloud_api_diagnostics(self) -> dict[str, Any] | None:
+        return {
+            "calls": self.sharing_account.device_manager.customer_api.call_accounting.get_diagnostics(),
+        }
\ No newline at end of file
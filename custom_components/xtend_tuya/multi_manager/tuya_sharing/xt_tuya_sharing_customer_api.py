@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+from typing import Any
+
+from tuya_sharing.customerapi import (
+    CustomerApi,
+)
+
+from ..shared.api_call_accounting import (
+    XTAPICallAccounting,
+    get_error_response,
+    XT_ERROR_CODE_QUOTA_DEFERRED,
+)
+
+class XTSharingCustomerApi:
+    """Counts the calls made through a CustomerApi.
+
+    Wraps the instance instead of subclassing it, when overriding the Tuya
+    integration the CustomerApi is the one created by that integration.
+    """
+
+    def __init__(self, customer_api: CustomerApi, call_accounting: XTAPICallAccounting) -> None:
+        self.customer_api = customer_api
+        self.call_accounting = call_accounting
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.customer_api, name)
+
+    def _is_deferred(self, method: str, path: str, low_priority: bool) -> bool:
+        return low_priority and not self.call_accounting.allow_low_priority_call(method, path)
+
+    def get(self, path: str, params: dict[str, Any] | None = None, low_priority: bool = False) -> dict[str, Any] | None:
+        if self._is_deferred("GET", path, low_priority):
+            return get_error_response(XT_ERROR_CODE_QUOTA_DEFERRED, "Deferred to save the API call quota")
+        self.call_accounting.record_call("GET", path)
+        return self.customer_api.get(path, params)
+
+    def post(self, path: str, params: dict[str, Any] | None = None, body: dict[str, Any] | None = None, low_priority: bool = False) -> dict[str, Any] | None:
+        if self._is_deferred("POST", path, low_priority):
+            return get_error_response(XT_ERROR_CODE_QUOTA_DEFERRED, "Deferred to save the API call quota")
+        self.call_accounting.record_call("POST", path)
+        return self.customer_api.post(path, params, body)
+
+    def put(self, path: str, body: dict[str, Any] | None = None, low_priority: bool = False) -> dict[str, Any] | None:
+        if self._is_deferred("PUT", path, low_priority):
+            return get_error_response(XT_ERROR_CODE_QUOTA_DEFERRED, "Deferred to save the API call quota")
+        self.call_accounting.record_call("PUT", path)
+        return self.customer_api.put(path, body)
+
+    def delete(self, path: str, params: dict[str, Any] | None = None, low_priority: bool = False) -> dict[str, Any] | None:
+        if self._is_deferred("DELETE", path, low_priority):
+            return get_error_response(XT_ERROR_CODE_QUOTA_DEFERRED, "Deferred to save the API call quota")
+        self.call_accounting.record_call("DELETE", path)
+        return self.customer_api.delete(path, params)
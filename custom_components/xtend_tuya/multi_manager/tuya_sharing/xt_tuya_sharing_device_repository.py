@@ -1,5 +1,9 @@
 from __future__ import annotations
 
+import copy
+from functools import partial
+from typing import Any
+
 from tuya_sharing.customerapi import (
     CustomerApi,
 )
@@ -14,6 +18,10 @@ from ...const import (
     LOGGER,  # noqa: F401
 )
 
+from .const import (
+    PRODUCT_CACHE_KIND_SHARING_STRATEGY,
+)
+
 from .xt_tuya_sharing_manager import (
     XTSharingDeviceManager,
 )
@@ -21,6 +29,9 @@ from .xt_tuya_sharing_manager import (
 from ..multi_manager import (
     MultiManager,
 )
+from ..shared.product_registry import (
+    XTProductSpecRegistry,
+)
 from ..shared.device import (
     XTDeviceFunction,
     XTDeviceStatusRange,
@@ -31,6 +42,8 @@ class XTSharingDeviceRepository(DeviceRepository):
         super().__init__(customer_api)
         self.manager = manager
         self.multi_manager = multi_manager
+        #Revalidations run in the background and give way when the API call quota runs out
+        self.multi_manager.product_cache.register_revalidator(PRODUCT_CACHE_KIND_SHARING_STRATEGY, partial(self._fetch_device_strategy, low_priority=True))
 
     def update_device_specification(self, device: CustomerDevice):
         super().update_device_specification(device)
@@ -62,35 +75,63 @@ class XTSharingDeviceRepository(DeviceRepository):
                 _devices.append(device)
         return _devices
 
-    def _update_device_strategy_info_mod(self, device: CustomerDevice):
-        device_id = device.id
-        response = self.api.get(f"/v1.0/m/life/devices/{device_id}/status")
-        support_local = True
+    def _fetch_device_strategy(self, device_id: str, low_priority: bool = False) -> dict[str, Any] | None:
+        response = self.api.get(f"/v1.0/m/life/devices/{device_id}/status", low_priority=low_priority)
         if response.get("success"):
-            result = response.get("result", {})
-            pid = result["productKey"]
-            dp_id_map = {}
-            for dp_status_relation in result["dpStatusRelationDTOS"]:
-                if not dp_status_relation["supportLocal"]:
-                    support_local = False
-                    #break                          #REMOVED
-                # statusFormat valueDesc、valueType,enumMappingMap,pid
-                if "dpId" in dp_status_relation:    #ADDED
-                    dp_id_map[dp_status_relation["dpId"]] = {
-                        "value_convert": dp_status_relation["valueConvert"],
-                        "status_code": dp_status_relation["statusCode"],
-                        "config_item": {
-                            "statusFormat": dp_status_relation["statusFormat"],
-                            "valueDesc": dp_status_relation["valueDesc"],
-                            "valueType": dp_status_relation["valueType"],
-                            "enumMappingMap": dp_status_relation["enumMappingMap"],
-                            "pid": pid,
-                        },                              #CHANGED
-                        "status_code_alias": []         #CHANGED
-                    }
+            return response.get("result", {})
+        return None
+
+    def get_device_strategy(self, device: CustomerDevice) -> dict[str, Any] | None:
+        #Strategies are per product, use the cached one when available
+        product_id = getattr(device, "product_id", None)
+        if (result := self.multi_manager.product_cache.get(PRODUCT_CACHE_KIND_SHARING_STRATEGY, product_id, device.id)) is not None:
+            #The local strategy is modified in place later on
+            return copy.deepcopy(result)
+        result = self._fetch_device_strategy(device.id)
+        self.multi_manager.product_cache.set(PRODUCT_CACHE_KIND_SHARING_STRATEGY, product_id, copy.deepcopy(result))
+        return result
+
+    def get_device_strategy_spec(self, device: CustomerDevice) -> tuple[bool, dict[int, dict[str, Any]]] | None:
+        #Parsed once per product and shared by all its devices
+        return self.multi_manager.product_registry.get_or_build(
+            PRODUCT_CACHE_KIND_SHARING_STRATEGY,
+            getattr(device, "product_id", None),
+            partial(self._build_device_strategy_spec, device)
+        )
+
+    def _build_device_strategy_spec(self, device: CustomerDevice) -> tuple[bool, dict[int, dict[str, Any]]] | None:
+        result = self.get_device_strategy(device)
+        support_local = True
+        if result is None:
+            return None
+        pid = result["productKey"]
+        dp_id_map = {}
+        for dp_status_relation in result["dpStatusRelationDTOS"]:
+            if not dp_status_relation["supportLocal"]:
+                support_local = False
+                #break                          #REMOVED
+            # statusFormat valueDesc、valueType,enumMappingMap,pid
+            if "dpId" in dp_status_relation:    #ADDED
+                dp_id_map[dp_status_relation["dpId"]] = {
+                    "value_convert": dp_status_relation["valueConvert"],
+                    "status_code": dp_status_relation["statusCode"],
+                    "config_item": {
+                        "statusFormat": dp_status_relation["statusFormat"],
+                        "valueDesc": dp_status_relation["valueDesc"],
+                        "valueType": dp_status_relation["valueType"],
+                        "enumMappingMap": dp_status_relation["enumMappingMap"],
+                        "pid": pid,
+                    },                              #CHANGED
+                    "status_code_alias": []         #CHANGED
+                }
+        return support_local, dp_id_map
+
+    def _update_device_strategy_info_mod(self, device: CustomerDevice):
+        if spec := self.get_device_strategy_spec(device):
+            support_local, dp_id_map = spec
             device.support_local = support_local
             #if support_local:                      #CHANGED
-            device.local_strategy = dp_id_map       #CHANGED
+            device.local_strategy = XTProductSpecRegistry.instantiate_local_strategy(dp_id_map)   #CHANGED
 
     def update_device_strategy_info(self, device: CustomerDevice):
         #super().update_device_strategy_info(device)
@@ -400,5 +400,6 @@ class TuyaNumberEntity(TuyaEntity, NumberEntity):
                     "code": self.entity_description.key,
                     "value": self._number.scale_value_back(value),
                 }
-            ]
+            ],
+            coalesce=self.mode == NumberMode.SLIDER,
         )
@@ -842,6 +842,10 @@ class TuyaSensorEntity(TuyaEntity, RestoreSensor):
 
         # Valid string or enum value
         return value
+
+    def _is_affected_by_status_update(self, updated_status_codes: set[str]) -> bool:
+        """Return if the updated status codes are used by this entity."""
+        return self._is_code_in_status_update(self.entity_description.key, updated_status_codes)
     
 
     def reset_value(self, _: datetime) -> None:
@@ -304,6 +304,10 @@ class TuyaSwitchEntity(TuyaEntity, SwitchEntity):
         """Return true if switch is on."""
         return self.device.status.get(self.entity_description.key, False)
 
+    def _is_affected_by_status_update(self, updated_status_codes: set[str]) -> bool:
+        """Return if the updated status codes are used by this entity."""
+        return self._is_code_in_status_update(self.entity_description.key, updated_status_codes)
+
     def turn_on(self, **kwargs: Any) -> None:
         """Turn the switch on."""
         self._send_command([{"code": self.entity_description.key, "value": True}])